@@ -0,0 +1,147 @@
+# beam_search.py
+"""
+Beam search for knight paths
+Paths are grown a level (move) at a time, keeping only the best width
+partial paths at each level, so memory and time are bounded by width,
+not by backtracking.  Partial paths are ranked by the Warnsdorff score
+of the last move (its number of onward moves) plus a penalty for each
+neighboring square left with one or no exits, and dropped if the
+region check finds the empty squares can't be covered.
+"""
+from select_trace import SlTrace
+
+class BeamSearch:
+    """ Level by level search keeping the best partial paths
+    """
+    def __init__(self, graph, width=64, closed_tours=False, region_check=None,
+                 connect_weight=2, time_check=None):
+        """ Setup search
+        :graph: KnightGraph of board
+        :width: number of partial paths kept per level default: 64
+        :closed_tours: True - path must end next to its start
+        :region_check: RegionCheck, to drop partial paths which can't
+                be completed default: None - no check
+        :connect_weight: penalty per neighbor square left with one or
+                no exits, in Warnsdorff score units default: 2
+        :time_check: function called each level, which may raise an
+                exception (e.g. SelectTimeout) to stop default: none
+        """
+        self.graph = graph
+        self.width = width
+        self.closed_tours = closed_tours
+        self.region_check = region_check
+        self.connect_weight = connect_weight
+        self.time_check = time_check
+        self.best_chain = None      # Best partial path of deepest level
+        self.nnode = 0              # Number of partial paths scored
+        self.nprune = 0             # Number dropped by region check
+        self.ndepth = 0             # Deepest level reached (path length)
+
+
+    def search(self, occupied, start_sq):
+        """ Search for path from start_sq covering the empty squares
+        :occupied: occupancy bitmask, including start_sq
+        :start_sq: starting square index
+        :returns: list of square indexes after start_sq, None if not found
+                best_path() gives best partial path in any case
+        """
+        graph = self.graph
+        full_mask = graph.full_mask
+        neighbors = graph.neighbors
+        neighbor_masks = graph.neighbor_masks
+        end_mask = neighbor_masks[start_sq] if self.closed_tours else None
+        region_check = self.region_check
+        connect_weight = self.connect_weight
+        nsq_total = graph.nsq
+        depth = bin(occupied).count("1")
+        chain = (start_sq, None)            # Path as linked (sq, previous) pairs
+        beam = [(occupied, start_sq, chain)]
+        children = [(0, 0, occupied, start_sq, chain)]    # Latest level
+        self.best_chain = chain
+        self.ndepth = depth
+        while depth < nsq_total:
+            if self.time_check is not None:
+                self.time_check()
+            children = []
+            seen = set()                    # (occupied, square) states so far
+            for occ, cur_sq, chain in beam:
+                moves = neighbor_masks[cur_sq] & ~occ
+                while moves:
+                    low_bit = moves & -moves
+                    moves ^= low_bit
+                    nsq = low_bit.bit_length() - 1
+                    nocc = occ | low_bit
+                    state = (nocc, nsq)
+                    if state in seen:
+                        continue            # Same future as one kept
+
+                    seen.add(state)
+                    self.nnode += 1
+                    empty = ~nocc & full_mask
+                    if (end_mask is not None and empty
+                            and not end_mask & empty):
+                        continue            # No square left to close from
+
+                    if (region_check is not None
+                            and not region_check.is_feasible(nocc, nsq, prev_sq=cur_sq,
+                                                             start_sq=start_sq)):
+                        self.nprune += 1
+                        continue
+
+                    score = bin(neighbor_masks[nsq] & empty).count("1")
+                    for esq in neighbors[nsq]:
+                        if (empty >> esq) & 1:
+                            nbs = neighbor_masks[esq] & empty
+                            if not nbs & (nbs - 1):
+                                score += connect_weight     # One or no exits
+                    children.append((score, len(children), nocc, nsq, (nsq, chain)))
+            if not children:
+                break
+
+            children.sort()
+            beam = [(nocc, nsq, chain)
+                    for _, _, nocc, nsq, chain in children[:self.width]]
+            depth += 1
+            self.ndepth = depth
+            self.best_chain = beam[0][2]
+            if SlTrace.trace("beam"):
+                SlTrace.lg(f"beam depth {depth}: {len(children)} scored,"
+                           f" best score {children[0][0]}")
+        if depth < nsq_total:
+            return None
+
+        for _, _, _, cur_sq, chain in children:   # All complete paths, not just kept
+            if end_mask is None or (end_mask >> cur_sq) & 1:
+                return self.chain_path(chain)[1:]
+
+        return None
+
+
+    def chain_path(self, chain):
+        """ Convert linked (sq, previous) pairs to list
+        :chain: linked pairs, last square first
+        :returns: list of square indexes, first square first
+        """
+        path = []
+        while chain is not None:
+            path.append(chain[0])
+            chain = chain[1]
+        path.reverse()
+        return path
+
+
+    def best_path(self):
+        """ Best partial path of the deepest level reached
+        :returns: list of square indexes, including start, None if not searched
+        """
+        if self.best_chain is None:
+            return None
+
+        return self.chain_path(self.best_chain)
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"width={self.width} nodes={self.nnode} region_prunes={self.nprune}"
+                f" depth={self.ndepth}")
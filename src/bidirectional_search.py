@@ -0,0 +1,195 @@
+# bidirectional_search.py
+"""
+Closed tour search growing a path from both ends
+A closed tour through the starting square is a path leaving it in two
+directions, which meet.  Both ends are grown, by depth first search,
+always extending the end with fewer empty neighbors (the more
+constrained), with moves in Warnsdorff order.  Once few squares are
+left between the ends, the exact EndgameSolver joins them.
+Positions - occupied squares and the two ends - found to fail are
+remembered in a NogoodCache.
+"""
+from select_trace import SlTrace
+
+from nogood_cache import NogoodCache
+
+class BidirectionalSearch:
+    """ Two ended depth first search for closed tours
+    """
+    def __init__(self, graph, zobrist, endgame, join_size=16,
+                 region_check=None, nogood_cache_size=200000,
+                 time_check=None, check_interval=1024):
+        """ Setup search
+        :graph: KnightGraph of board
+        :zobrist: ZobristKeys of board, for position keys
+        :endgame: EndgameSolver, to join the ends
+        :join_size: number of empty squares at or below which
+                the endgame solver joins the ends default: 16
+        :region_check: RegionCheck, closed tours, to back up when the
+                empty squares can't be covered default: None - no check
+        :nogood_cache_size: maximum number of failed positions remembered,
+                0 - none default: 200000
+        :time_check: function called every check_interval nodes, which
+                may raise an exception (e.g. SelectTimeout) to stop
+                default: no checking
+        :check_interval: nodes between time_check calls default: 1024
+        """
+        self.graph = graph
+        self.zobrist = zobrist
+        self.endgame = endgame
+        self.join_size = join_size
+        self.region_check = region_check
+        self.nogood_cache = None
+        if nogood_cache_size > 0:
+            self.nogood_cache = NogoodCache(max_size=nogood_cache_size)
+        self.time_check = time_check
+        self.check_interval = check_interval
+        self.nnode = 0              # Number of positions searched
+        self.njoin = 0              # Number of endgame joins tried
+        self.nprune = 0             # Number failing degree or region checks
+        self.nback_move = 0         # Number of moves of the second end
+
+
+    def search(self, start_sq):
+        """ Search for closed tour through start_sq
+        :start_sq: starting square index
+        :returns: list of square indexes, starting with start_sq, whose
+                last square is next to start_sq, None if none found
+        """
+        graph = self.graph
+        square_keys = self.zobrist.square_keys
+        current_keys = self.zobrist.current_keys
+        occupied = 1 << start_sq
+        zhash = square_keys[start_sq]
+        fronts = [start_sq]         # Path grown from the start
+        backs = []                  # Path grown from start's other side
+        front = back = start_sq
+        nempty = graph.nsq - 1
+        ncheck_left = self.check_interval
+        stack = []                  # Per level: [moves, index, back moved, key]
+        node = self.expand(occupied, front, back, nempty,
+                           zhash ^ current_keys[front] ^ current_keys[back], fronts)
+        if node is True:
+            return fronts
+
+        if node is None:
+            return None
+
+        stack.append(node)
+        while stack:
+            ncheck_left -= 1
+            if ncheck_left <= 0 and self.time_check is not None:
+                ncheck_left = self.check_interval
+                self.time_check()
+            level = stack[-1]
+            moves, index, is_back = level[0], level[1], level[2]
+            if index > 0:           # Undo previous move
+                if is_back:
+                    sq = backs.pop()
+                    back = backs[-1] if backs else start_sq
+                else:
+                    sq = fronts.pop()
+                    front = fronts[-1]
+                occupied ^= 1 << sq
+                zhash ^= square_keys[sq]
+                nempty += 1
+            if index >= len(moves):
+                stack.pop()
+                if self.nogood_cache is not None:
+                    self.nogood_cache.record(level[3])
+                continue
+
+            level[1] = index + 1
+            sq = moves[index]
+            if is_back:
+                backs.append(sq)
+                back = sq
+                self.nback_move += 1
+            else:
+                fronts.append(sq)
+                front = sq
+            occupied |= 1 << sq
+            zhash ^= square_keys[sq]
+            nempty -= 1
+            node = self.expand(occupied, front, back, nempty,
+                               zhash ^ current_keys[front] ^ current_keys[back], fronts)
+            if node is True:
+                backs.reverse()
+                return fronts + backs
+
+            if node is not None:
+                stack.append(node)
+        return None
+
+
+    def expand(self, occupied, front, back, nempty, key, fronts):
+        """ Check position, choosing the end to grow and its moves
+        :occupied: occupancy bitmask
+        :front: end grown from the start
+        :back: other end, the start if not yet grown
+        :nempty: number of empty squares
+        :key: position key
+        :fronts: path from start, extended by the joining path if joined
+        :returns: True if joined (fronts complete to back)
+                None if position fails
+                else [moves, 0, grows back end, key] search level
+        """
+        self.nnode += 1
+        if self.nogood_cache is not None and self.nogood_cache.is_nogood(key):
+            return None
+
+        graph = self.graph
+        neighbor_masks = graph.neighbor_masks
+        empty = ~occupied & graph.full_mask
+        if nempty <= self.join_size:
+            self.njoin += 1
+            join = self.endgame.solve(empty, front, end_sq=back)
+            if join is None:
+                return None
+
+            fronts.extend(join)
+            return True
+
+        ends = (1 << front) | (1 << back)
+        free = empty | ends
+        rest = empty
+        while rest:
+            low_bit = rest & -rest
+            rest ^= low_bit
+            nbs = neighbor_masks[low_bit.bit_length() - 1] & free
+            if not nbs & (nbs - 1):
+                self.nprune += 1
+                return None             # Can't be passed through
+
+        if (self.region_check is not None
+                and not self.region_check.is_feasible(occupied, front, start_sq=back)):
+            self.nprune += 1
+            return None
+
+        front_moves = neighbor_masks[front] & empty
+        back_moves = neighbor_masks[back] & empty
+        is_back = (bin(back_moves).count("1") < bin(front_moves).count("1"))
+        moves = back_moves if is_back else front_moves
+        scored = []
+        while moves:
+            low_bit = moves & -moves
+            moves ^= low_bit
+            sq = low_bit.bit_length() - 1
+            after = empty ^ low_bit
+            ndeg = bin(neighbor_masks[sq] & after).count("1")
+            scored.append((ndeg, sq))
+        scored.sort()
+        if SlTrace.trace("bidirectional"):
+            SlTrace.lg(f"bidirectional: front={front} back={back} empty={nempty}"
+                       f" grow {'back' if is_back else 'front'}: {scored}")
+        return [[sq for _, sq in scored], 0, is_back, key]
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        desc = (f"join_size={self.join_size} nodes={self.nnode} joins={self.njoin}"
+                f" prunes={self.nprune} back_moves={self.nback_move}")
+        if self.nogood_cache is not None:
+            desc += f" nogood: {self.nogood_cache.stats_desc()}"
+        return desc
@@ -9,7 +9,8 @@ from select_dots import SelectDots
 from select_trace import SlTrace
 from select_error import SelectError
 
-from numpy import rank
+from knight_graph import KnightGraph
+from zobrist_keys import ZobristKeys
 
 
 class Piece(Enum):
@@ -52,10 +53,23 @@ class ChessMove:
 Simple chess board
 display is not present so operations can
 be optimized for speed.
+Occupancy is kept as a bitmask (python int), bit ir*ncol+ic
+set iff square (ic,ir) is occupied, so board copy, set, clear
+and empty tests are O(1).  The string grid (squares) is only
+kept, as a view for display, if keep_squares is set.
+If track_degree is set, each square's number of empty neighbors
+(degree) is kept up to date by set_piece and clear_loc, as is
+low_mask, the bitmask of squares having degree 0 or 1.
+zhash, the Zobrist hash of the occupied squares, is always kept up to
+date, with one xor per change.
+Search code uses the *_sq methods, which take square indexes
+(ir*ncol+ic) and do no checking; locations given as tuples or
+algebraic strings are converted and checked by the other methods.
 """
 class ChessBoard:
     ncol = 8
     nrow = 8
+    piece_letters = "PpNnBbRrQqKk"
     tracking_path = []
     track_all_path = False
     board_picts_mw = []
@@ -140,21 +154,83 @@ class ChessBoard:
                 base_board=None,
                 nrow=8,
                 ncol=8,
+                keep_squares=False,
+                track_degree=False,
+                zobrist_seed=None,
                  ):
+        """ Setup board
+        :base_board: board to copy default: empty board
+        :nrow: number of rows if no base_board
+        :ncol: number of columns if no base_board
+        :keep_squares: True - also keep string grid (squares) for display
+                        default: False - occupancy bitmask only
+                        copied boards follow base_board
+        :track_degree: True - maintain degree, the per square
+                        empty neighbor count, for Warnsdorff scoring
+                        default: False - count as needed
+                        copied boards follow base_board
+        :zobrist_seed: seed for Zobrist hash keys
+                        default: ZobristKeys.default_seed
+                        copied boards follow base_board
+        """
         self.label_number = 0               # Number for default square labeling
+        self.squares = None                 # String grid view, if kept
+        self.degree = None                  # Empty neighbor counts, if tracked
+        self.low_mask = 0                   # Squares with degree <= 1, if tracked
         if base_board is not None:
             self.nrow = base_board.nrow
             self.ncol = base_board.ncol
             self.nempty = base_board.nempty
-            self.copy_squares(self, base_board)
+            self.occupied = base_board.occupied     # int is immutable - no copy needed
+            self._graph = base_board._graph
+            self._zobrist = base_board._zobrist
+            self.zobrist_seed = base_board.zobrist_seed
+            self.zhash = base_board.zhash
+            if base_board.squares is not None:
+                self.copy_squares(self, base_board)
+            if base_board.degree is not None:
+                self.degree = base_board.degree[:]
+                self.low_mask = base_board.low_mask
         else:
             self.nrow = nrow
             self.ncol = ncol
-            self.squares = self.create_squares()
+            self.occupied = 0                       # bit set iff square occupied
+            self._graph = None                      # Shared move tables, on first use
+            self._zobrist = None                    # Shared hash keys, on first use
+            self.zobrist_seed = zobrist_seed
+            self.zhash = 0                          # Hash of occupied squares
+            if keep_squares:
+                self.squares = self.create_squares()
+            if track_degree:
+                self.degree = self.graph.degrees[:]
+                for sq, deg in enumerate(self.degree):
+                    if deg <= 1:
+                        self.low_mask |= 1 << sq
             self.nempty = nrow*ncol
         ChessBoard.board = self             # Set current board in class
 
 
+    @property
+    def graph(self):
+        """ Shared knight move tables, made on first use
+        Boards used only for notation, e.g. describing a constructed
+        tour of a large board, never make them.
+        """
+        if self._graph is None:
+            self._graph = KnightGraph.get(nrow=self.nrow, ncol=self.ncol)
+        return self._graph
+
+
+    @property
+    def zobrist(self):
+        """ Shared Zobrist hash keys, made on first use
+        """
+        if self._zobrist is None:
+            self._zobrist = ZobristKeys.get(nrow=self.nrow, ncol=self.ncol,
+                                            seed=self.zobrist_seed)
+        return self._zobrist
+
+
     def get_legal_moves(self, piece=None, loc=None):
         """ Get legal moves for given piece, from loc
         :piece: piece to move default: Knight
@@ -172,49 +248,35 @@ class ChessBoard:
         :only_empty: True-> only consider empty squares
         :returns: list of tuples for legal moves
         """
-
-        nrow = self.nrow
-        ncol = self.ncol
-        col_index, row_index = self.loc2tuple(loc)
-        if col_index < 0 or col_index >= ncol:
-            raise SelectError("get_knight_moves: col_index {:d} is out of bounds".format(col_index))
-        
-        if row_index < 0 or row_index >= nrow:
-            raise SelectError("get_knight_moves: row_index {:d} is out of bounds".format(row_index))
-        
-        pbs = []
-        ic,ir = col_index-2,row_index+1         # (1)
-        if ic >= 0 and ir < nrow:
-            pbs.append((ic,ir))
-        ic,ir = col_index-1,row_index+2         # (2)
-        if ic >= 0 and ir < nrow:
-            pbs.append((ic,ir))
-        ic,ir = col_index+1,row_index+2         # (3)
-        if ic < ncol and ir < nrow:
-            pbs.append((ic,ir))
-        ic,ir = col_index+2,row_index+1         # (4)
-        if ic < ncol and ir < nrow:
-            pbs.append((ic,ir))
-        ic,ir = col_index+2,row_index-1         # (5)
-        if ic < ncol and ir >= 0:
-            pbs.append((ic,ir))
-        ic,ir = col_index+1,row_index-2         # (6)
-        if ic < ncol and ir >= 0:
-            pbs.append((ic,ir))
-        ic,ir = col_index-1,row_index-2         # (7)
-        if ic >= 0 and ir >=0:
-            pbs.append((ic,ir))
-        ic,ir = col_index-2, row_index-1        # (8)
-        if ic >= 0 and ir >= 0:
-            pbs.append((ic,ir))
+        loc = self.loc2tuple(loc)
+        sq = loc[1]*self.ncol + loc[0]
+        graph = self.graph
         if only_empty:
+            occupied = self.occupied
             epbs = []
-            for loc in pbs:
-                if self.is_empty(loc):
-                    epbs.append(loc)
+            for nsq, nloc in zip(graph.neighbors[sq], graph.neighbor_locs[sq]):
+                if not (occupied >> nsq) & 1:
+                    epbs.append(nloc)
             return epbs
         
-        return pbs
+        return list(graph.neighbor_locs[sq])
+
+
+    def knight_moves_sq(self, sq, only_empty=False):
+        """ Get knight moves from square index - no checking
+        :sq: square index
+        :only_empty: True-> only consider empty squares
+        :returns: list of square indexes
+        """
+        if not only_empty:
+            return list(self.graph.neighbors[sq])
+        
+        occupied = self.occupied
+        esqs = []
+        for nsq in self.graph.neighbors[sq]:
+            if not (occupied >> nsq) & 1:
+                esqs.append(nsq)
+        return esqs
 
 
     def is_neighbor(self, loc, loc2):
@@ -223,19 +285,34 @@ class ChessBoard:
         :loc2: location of candidate neighbor
         :returns: True if is neighbor
         """
-        moves = self.get_knight_moves(loc)
-        if self.loc2tuple(loc2) in moves:
-            return True
-        
-        return False
+        return self.graph.is_neighbor(self.loc2sq(loc), self.loc2sq(loc2))
 
 
     def clear_loc(self, loc=None):
         """ Clear square to empty
         """
         loc = self.loc2tuple(loc)
-        ic,ir = loc[0],loc[1]
-        self.squares[ir][ic] = ""
+        sq = loc[1]*self.ncol + loc[0]
+        if not (self.occupied >> sq) & 1:
+            return                  # Already empty
+        
+        self.clear_sq(sq)
+
+
+    def clear_sq(self, sq):
+        """ Clear occupied square to empty - no checking
+        :sq: square index
+        """
+        self.occupied &= ~(1 << sq)
+        self.zhash ^= self.zobrist.square_keys[sq]
+        if self.squares is not None:
+            self.squares[sq // self.ncol][sq % self.ncol] = ""
+        degree = self.degree
+        if degree is not None:
+            for nsq in self.graph.neighbors[sq]:
+                degree[nsq] += 1
+                if degree[nsq] == 2:
+                    self.low_mask &= ~(1 << nsq)
         self.nempty += 1        
                     
     def loc2desc(self, loc):
@@ -263,7 +340,7 @@ class ChessBoard:
         """
         if isinstance(loc, str):
             if self.ncol > 8 or self.nrow > 8:
-                if len(str) < 4:
+                if len(loc) < 4:
                     raise SelectError(f"loc2tp: loc{loc} to short for form CnRn")
                 m = re.match(r"C(\d+)R(\d+)", loc)
                 if not m:
@@ -287,18 +364,21 @@ class ChessBoard:
 
         return (ic,ir)
 
-    def path_desc(self, path):
+    def path_desc(self, path, max_len=None):
         """ Generate string with path description
         :path: list of locs loc descriptors
+        :max_len: maximum number of squares described, the rest of a
+                longer path being elided from its middle
+                default: None - describe all
         :returns: string of path
         """
-        path_str = ""
-        for loc in path:
-            if path_str != "":
-                path_str += " "
-            desc = self.loc2desc(loc)
-            path_str += desc 
-        return path_str
+        if max_len is not None and len(path) > max_len:
+            nhead = max_len//2
+            return (self.path_desc(path[:nhead])
+                    + f" ...({len(path) - max_len} squares)... "
+                    + self.path_desc(path[len(path) - (max_len-nhead):]))
+        
+        return " ".join(self.loc2desc(loc) for loc in path)
 
     def squares_list(self, locs):
         """ Generate string with compressed
@@ -353,7 +433,9 @@ class ChessBoard:
         :loc: str - algebraic location
         """
         pstr = ''
-        if isinstance(piece, str):
+        if isinstance(piece, str) and len(piece) == 1 and piece in self.piece_letters:
+            pstr = piece                # Just piece - no need to parse
+        elif isinstance(piece, str):
             m = re.match(r'(^[PpNnBbRrQqKk])([a-h][1-8])?$', piece)
             if m is not None:
                 pstr = m.group(1)
@@ -371,11 +453,27 @@ class ChessBoard:
             SlTrace.lg(f"set_piece {piece} at {self.loc2desc(loc)}") 
 
         loc = self.loc2tuple(loc)      # Support str or tuple
-        if not self.is_empty(loc):
+        sq = loc[1]*self.ncol + loc[0]
+        if (self.occupied >> sq) & 1:
             raise SelectError(f"Tried to place {piece} in nonempty square {self.loc2desc(loc)}") 
-        ic = loc[0]
-        ir = loc[1]   
-        self.squares[ir][ic] = pstr
+        self.set_piece_sq(sq, pstr)
+
+
+    def set_piece_sq(self, sq, piece="N"):
+        """ Set piece on empty square - no checking
+        :sq: square index
+        :piece: piece letter default: "N"
+        """
+        self.occupied |= 1 << sq
+        self.zhash ^= self.zobrist.square_keys[sq]
+        if self.squares is not None:
+            self.squares[sq // self.ncol][sq % self.ncol] = piece
+        degree = self.degree
+        if degree is not None:
+            for nsq in self.graph.neighbors[sq]:
+                degree[nsq] -= 1
+                if degree[nsq] == 1:
+                    self.low_mask |= 1 << nsq
         self.nempty -= 1        
 
 
@@ -383,23 +481,62 @@ class ChessBoard:
         """ Check if square is empty (unoccupied)
         """
         loc = self.loc2tuple(loc)
-        if len(loc) < 2:
-            SlTrace.lg(f"loc{loc} to short")
-            return False
-        ic = loc[0]
-        ir = loc[1]
-        if ic >= self.ncol:
-            SlTrace.lg(f"is_empty: ic({ic}) >= ncol({self.ncol}) out of range")
+        if (self.occupied >> (loc[1]*self.ncol + loc[0])) & 1:
             return False
         
-        if ir >= self.nrow:
-            SlTrace.lg(f"is_empty: ir({ir}) >= nrow({self.nrow}) out of range")
+        return True
+
+
+    def is_empty_sq(self, sq):
+        """ Check if square index is empty - no checking
+        """
+        if (self.occupied >> sq) & 1:
             return False
         
-        if self.squares[ir][ic] == "":
-            return True
+        return True
+
+
+    def empty_degree(self, loc):
+        """ Get number of empty squares one knight move away
+        (Warnsdorff score)
+        :loc: location str or tuple
+        :returns: empty neighbor count
+        """
+        return self.empty_degree_sq(self.loc2sq(loc))
+
+
+    def empty_degree_sq(self, sq):
+        """ Get number of empty neighbors of square index - no checking
+        """
+        if self.degree is not None:
+            return self.degree[sq]
         
-        return False
+        occupied = self.occupied
+        return sum(1 for nsq in self.graph.neighbors[sq] if not (occupied >> nsq) & 1)
+
+
+    def loc2sq(self, loc):
+        """ Convert location to square index ir*ncol+ic
+        :loc: location str or tuple
+        :returns: square index
+        """
+        loc = self.loc2tuple(loc)
+        return loc[1]*self.ncol + loc[0]
+
+
+    def sq2loc(self, sq):
+        """ Convert square index to (ic,ir) tuple
+        """
+        return (sq % self.ncol, sq // self.ncol)
+
+
+    def loc2bit(self, loc):
+        """ Convert location to its occupancy bit
+        :loc: location str or tuple
+        :returns: int with square's bit set
+        """
+        loc = self.loc2tuple(loc)
+        return 1 << (loc[1]*self.ncol + loc[0])
 
 
     def is_board_full(self):
@@ -429,10 +566,19 @@ class ChessBoard:
     def contents(self, loc):
         """ Get square contents
         :loc: location
+        :returns: piece string, "" if empty
+                Without the squares view, occupied squares
+                are reported as knights ("N")
         """
         loc = self.loc2tuple(loc)
         ic,ir = loc[0],loc[1]
-        return self.squares[ir][ic]
+        if self.squares is not None:
+            return self.squares[ir][ic]
+        
+        if self.is_empty(loc):
+            return ""
+        
+        return "N"
 
 
     def create_squares(self):
@@ -448,7 +594,7 @@ class ChessBoard:
         :dest: destination board
         :src: source board
         """
-        if not hasattr(dest, "squares"):
+        if getattr(dest, "squares", None) is None:
             dest.squares = src.create_squares()
             
         if dest.nrow != src.nrow:
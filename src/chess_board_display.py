@@ -87,7 +87,8 @@ class ChessBoardDisplay:
         loc_end = path[-1]
         sq2 = cbd.get_square(loc_end)
         cbd.draw_outline(sq2, color="red", width=wd)
-        if cb.is_neighbor(loc_end, loc_start):
+        graph = cb.graph                    # Shared knight move tables
+        if graph.is_neighbor(cb.loc2sq(loc_end), cb.loc2sq(loc_start)):
             p1 = sq1.get_center()
             p2 = sq2.get_center()
             cbd.draw_line(p1,p2, color="blue", width=wd)
@@ -156,7 +157,7 @@ class ChessBoardDisplay:
         self.label_number = 0               # Number for default square labeling
         self.desc = desc
         if board is None:
-            board = ChessBoard(nrow=nrow, ncol=ncol)
+            board = ChessBoard(nrow=nrow, ncol=ncol, keep_squares=True)
         self.path = path                    # Path, if associated, may be placed here
         self.board = board    
         self.width = width
@@ -342,29 +343,19 @@ class ChessBoardDisplay:
         if not self.is_empty(loc):
             raise SelectError("Tried to place {} in nonempty square {}"
                              .format(piece, self.loc2desc(loc))) 
-        ic,ir = loc[0],loc[1]
-        self.board.squares[ir][ic] = pstr
-        self.board.nempty -= 1        
+        self.board.set_piece(pstr, loc)
 
 
     def is_empty(self, loc):
         """ Check if square is empty (unoccupied)
         """
-        loc = self.loc2tuple(loc)
-        ic = loc[0]
-        ir = loc[1]
-        if self.board.squares[ir][ic] == "":
-            return True
-        
-        return False
+        return self.board.is_empty(loc)
+
     def set_empty(self, loc):
         """ Set as empty
         :loc: square on board
         """
-        loc = self.loc2tuple(loc)
-        ic = loc[0]
-        ir = loc[1]
-        self.board.squares[ir][ic] = ""
+        self.board.clear_loc(loc)
         
 
     def get_square_loc(self, sq=None, let=True):
@@ -388,9 +379,7 @@ class ChessBoardDisplay:
         """ Get square contents
         :loc: location
         """
-        loc = self.loc2tuple(loc)
-        ic,ir = loc[0],loc[1]
-        return self.board.squares[ir][ic]
+        return self.board.contents(loc)
 
     def display_connected_moves(self, loc=None, prev_loc=None, color=None,
                                 width=None, leave=None, leave_color=None):
@@ -456,9 +445,7 @@ class ChessBoardDisplay:
             sq = self.get_square(loc)
             sq.display_clear()
             self.clear_display_canvas(connect_tags)
-            ic,ir = loc[0],loc[1]
-            self.board.squares[ir][ic] = ""
-            self.board.nempty += 1
+            self.set_empty(loc)
             if len(self.display_move_stack) > 0 and len(self.display_move_stack[-1]) > 2:
                 self.display_move_no = self.display_move_stack[-1][2]       
             self.wm.after(int(1000*self.move_time))
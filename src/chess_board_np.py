@@ -0,0 +1,167 @@
+# chess_board_np.py
+"""
+NumPy backed chess board
+Optional - requires numpy.  Empty squares are also kept in an int8
+array.  Warnsdorff degree maps are computed once, with eight shifted
+array sums, then brought up to date when next asked for, changing
+only the squares within two moves of those set or cleared since.
+The bitmask occupancy of ChessBoard is kept as well, so the board
+can be used wherever a ChessBoard is.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None               # numpy is optional - checked on board creation
+
+from select_error import SelectError
+
+from chess_board import ChessBoard
+from knight_graph import KnightGraph
+
+class ChessBoardNp(ChessBoard):
+    """ ChessBoard with numpy empty square array and degree maps
+    """
+    index_sets = {}         # Cached (nb_index, nb2_index) by (nrow, ncol)
+
+    def __init__(self,
+                base_board=None,
+                nrow=8,
+                ncol=8,
+                keep_squares=False,
+                track_degree=False,
+                zobrist_seed=None,
+                 ):
+        """ Setup board - see ChessBoard
+        """
+        if np is None:
+            raise SelectError("ChessBoardNp requires numpy, which is not installed")
+
+        super().__init__(base_board=base_board, nrow=nrow, ncol=ncol,
+                         keep_squares=keep_squares, track_degree=track_degree,
+                         zobrist_seed=zobrist_seed)
+        if base_board is not None and hasattr(base_board, "empty"):
+            self.empty = base_board.empty.copy()
+        else:
+            self.empty = np.ones((self.nrow, self.ncol), dtype=np.int8)
+            occupied = self.occupied
+            sq = 0
+            while occupied:
+                if occupied & 1:
+                    self.empty[sq // self.ncol, sq % self.ncol] = 0
+                occupied >>= 1
+                sq += 1
+        self.empty_flat = self.empty.reshape(-1)   # View, indexed by square
+        self.nb_index = None                # Per square: neighbor index array
+        self.nb2_index = None               # Per square: (two move squares,
+                                            #   neighbor each is reached through)
+        self.deg_map = None                 # Maps, made on first degree_maps call
+        self.deg2_map = None
+        self.maps_occupied = None           # Occupancy for which maps are current
+        if base_board is not None and getattr(base_board, "deg_map", None) is not None:
+            self.nb_index = base_board.nb_index
+            self.nb2_index = base_board.nb2_index
+            self.deg_map = base_board.deg_map.copy()
+            self.deg2_map = base_board.deg2_map.copy()
+            self.maps_occupied = base_board.maps_occupied
+
+
+    def set_piece_sq(self, sq, piece="N"):
+        """ Set piece on empty square - no checking
+        """
+        super().set_piece_sq(sq, piece=piece)
+        self.empty_flat[sq] = 0
+
+
+    def clear_sq(self, sq):
+        """ Clear occupied square to empty - no checking
+        """
+        super().clear_sq(sq)
+        self.empty_flat[sq] = 1
+
+
+    def neighbor_sum(self, values):
+        """ Sum values over each square's knight move neighbors
+        :values: nrow x ncol array
+        :returns: nrow x ncol int16 array of neighbor sums
+        """
+        nrow, ncol = self.nrow, self.ncol
+        padded = np.zeros((nrow+4, ncol+4), dtype=np.int16)
+        padded[2:nrow+2, 2:ncol+2] = values
+        nsum = np.zeros((nrow, ncol), dtype=np.int16)
+        for dc,dr in KnightGraph.moves:
+            nsum += padded[2+dr:2+dr+nrow, 2+dc:2+dc+ncol]
+        return nsum
+
+
+    def degree_maps(self):
+        """ Get Warnsdorff degree maps for current position
+        :returns: (deg_map, deg2_map) nrow x ncol arrays indexed [ir, ic]
+                deg_map: number of empty neighbors of each square
+                deg2_map: sum of deg_map over each square's empty neighbors
+        """
+        if self.deg_map is None:
+            self.make_maps()
+        elif self.maps_occupied != self.occupied:
+            self.update_maps()
+        return self.deg_map, self.deg2_map
+
+
+    def make_maps(self):
+        """ Compute degree maps for the whole board
+        """
+        if self.nb_index is None:
+            self.nb_index, self.nb2_index = self.get_index_set()
+        self.deg_map = self.neighbor_sum(self.empty)
+        self.deg2_map = self.neighbor_sum(self.deg_map*self.empty)
+        self.maps_occupied = self.occupied
+
+
+    def get_index_set(self):
+        """ Get shared index arrays for board size, made on first use
+        :returns: (nb_index, nb2_index)
+        """
+        key = (self.nrow, self.ncol)
+        index_set = self.index_sets.get(key)
+        if index_set is None:
+            neighbors = self.graph.neighbors
+            nb_index = [np.array(nbs, dtype=np.intp) for nbs in neighbors]
+            nb2_index = []
+            for nbs in neighbors:
+                nb2s = [nsq2 for nsq in nbs for nsq2 in neighbors[nsq]]
+                throughs = [nsq for nsq in nbs for _ in neighbors[nsq]]
+                nb2_index.append((np.array(nb2s, dtype=np.intp),
+                                  np.array(throughs, dtype=np.intp)))
+            index_set = (nb_index, nb2_index)
+            self.index_sets[key] = index_set
+        return index_set
+
+
+    def update_maps(self):
+        """ Bring degree maps up to date, one changed square at a time
+        Set and clear pairs from backtracking cancel, leaving the squares
+        changed since the maps were last current - few, as a rule.
+        """
+        changed = self.maps_occupied ^ self.occupied
+        sqs = []
+        while changed:
+            low = changed & -changed
+            sqs.append(low.bit_length() - 1)
+            changed ^= low
+        if len(sqs) > self.nrow*self.ncol//8:
+            self.make_maps()                # Quicker all at once
+            return
+
+        empty_flat = self.empty_flat
+        for sq in sqs:
+            empty_flat[sq] ^= 1             # Back to the maps' position
+        deg = self.deg_map.reshape(-1)      # Views, indexed by square
+        deg2 = self.deg2_map.reshape(-1)
+        for sq in sqs:
+            empty_flat[sq] ^= 1
+            change = 1 if empty_flat[sq] else -1
+            nbs = self.nb_index[sq]
+            deg[nbs] += change              # Neighbors lose (gain) an empty neighbor
+            deg2[nbs] += change*deg.item(sq)    # sq leaves (joins) their empty neighbors
+            nb2s, throughs = self.nb2_index[sq]
+            np.add.at(deg2, nb2s[empty_flat[throughs] != 0], change)  # Empty neighbors' degrees changed
+        self.maps_occupied = self.occupied
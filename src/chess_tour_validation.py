@@ -14,6 +14,8 @@ from chess_board import ChessBoard
 from displayed_path import DisplayedPath
 
 class ChessTourValidation:
+    max_path_desc = 1000        # Maximum squares of a path reported
+    
     def __init__(self, locs=None, ncol=None, nrow=None, piece=None, closed_tours=True):
         """ Set up validation constraints on which validation is made
         :locs: squares for which possible tour default ncolxnrow
@@ -35,6 +37,7 @@ class ChessTourValidation:
                 for ir in range(nrow):
                     locs.append((ic,ir))
         self.locs = locs
+        self.loc_set = set(locs)        # For membership tests
         if piece is None:
             piece = 'N'
         self.piece = piece
@@ -116,27 +119,36 @@ class ChessTourValidation:
         prev_loc = None
         for loc in path:
             loc = cb.loc2tuple(loc)
-            if loc not in self.locs:
+            if loc not in self.loc_set:
                 if not quiet:
                     SlTrace.lg(f"{prefix} move {cb.loc2desc(loc)} is not in squares:{cb.path_desc(self.locs)}")
                 return False
             
             if prev_loc is not None:
-                if not self.cb.is_neighbor(prev_loc, loc):
+                if not self.is_move(prev_loc, loc):
                     if not quiet:
-                        SlTrace.lg(f"move {loc2desc(prev_loc)} to {loc2desc(loc)} is not legal")
+                        SlTrace.lg(f"move {cb.loc2desc(prev_loc)} to {cb.loc2desc(loc)} is not legal")
                     return False
             prev_loc = loc
         if closed_tours:
-            prev_loc = path[-1]
-            loc = path[0]
-            if not self.cb.is_neighbor(prev_loc, loc):
+            prev_loc = cb.loc2tuple(path[-1])
+            loc = cb.loc2tuple(path[0])
+            if not self.is_move(prev_loc, loc):
                 if not quiet:
-                    SlTrace.lg(f"path closing move {loc2desc(prev_loc)} to {loc2desc(loc)} is not legal")
+                    SlTrace.lg(f"path closing move {cb.loc2desc(prev_loc)} to {cb.loc2desc(loc)} is not legal")
                 return False
             
         return True    
 
+    def is_move(self, loc, loc2):
+        """ Check if one knight move, from the locations themselves
+        rather than the search's move tables
+        :loc: (ic, ir) tuple
+        :loc2: (ic, ir) tuple
+        """
+        dc, dr = abs(loc2[0]-loc[0]), abs(loc2[1]-loc[1])
+        return (dc == 1 and dr == 2) or (dc == 2 and dr == 1)
+
     def is_covering_but_once(self, dpath, quiet=False, prefix=None):
         """ Check if path covers the board(self.locs) touching each square
         but once
@@ -147,19 +159,18 @@ class ChessTourValidation:
         path = dpath.path
         if prefix is None:
             prefix = ""
-        touches = {}
+        touches = set()             # Squares touched
         for loc in path:
             loc = cb.loc2tuple(loc)
             if loc not in touches:
-                touches[loc] = 1
+                touches.add(loc)
             else:
                 if not quiet:
                     SlTrace.lg(f"\n    {prefix} Repeating square {cb.loc2desc(loc)}")
                 return False
         
         for loc in self.locs:
-            loc = cb.loc2tuple(loc)
-            if loc not in touches:
+            if cb.loc2tuple(loc) not in touches:
                 if not quiet:
                     SlTrace.lg(f"\n    {prefix} {cb.loc2desc(loc)} not in {cb.squares_list(path)}")
                 return False
@@ -211,7 +222,7 @@ class ChessTourValidation:
             for igrp, dup_grp in enumerate(dup_paths):
                 SlTrace.lg(f"{igrp+1}: {cb.loc2desc(dup_grp[0].path[0])}")
                 for grp in dup_grp:
-                    SlTrace.lg(f"{cb.loc2desc(grp.path[0])}-{cb.loc2desc(grp.path[-1])}: {cb.path_desc(grp.path)}")
+                    SlTrace.lg(f"{cb.loc2desc(grp.path[0])}-{cb.loc2desc(grp.path[-1])}: {cb.path_desc(grp.path, max_len=self.max_path_desc)}")
         
 if __name__ == "__main__":
     from chess_board_display import ChessBoardDisplay
@@ -15,6 +15,7 @@ class CompStats:
         self.track_level = None # minimum stack tracking
         self.ntrack_ntie = None
         self.ntie = None
+        self.look_ahead_hist = None  # Nodes by number of look ahead levels used
     
     def report_heading(self, desc):
         SlTrace.lg(f"{desc:14s} {'count':5s} {'time':>6s} {'paths':5s}"
@@ -38,7 +39,7 @@ class CompStats:
             self.ncount += 1
 
 class AvgCompStats(CompStats):
-    def add(self, time_dur=None, npath=None, nbackup=None, nmove=None, track_level=None, ntrack_ntie=None, ntie=None, count=True):
+    def add(self, time_dur=None, npath=None, nbackup=None, nmove=None, track_level=None, ntrack_ntie=None, ntie=None, look_ahead_hist=None, count=True):
         if self.time_dur is None:
             self.time_dur = time_dur
         else:
@@ -67,6 +68,11 @@ class AvgCompStats(CompStats):
             self.ntie = ntie
         else:
             self.ntie += ntie
+        if look_ahead_hist is not None:
+            if self.look_ahead_hist is None:
+                self.look_ahead_hist = {}
+            for nlevel, nnode in look_ahead_hist.items():
+                self.look_ahead_hist[nlevel] = self.look_ahead_hist.get(nlevel, 0) + nnode
             
         if count:
             self.ncount += 1
@@ -85,9 +91,20 @@ class AvgCompStats(CompStats):
         SlTrace.lg(f"{desc:14s} {self.ncount:5d} {time_dur:6.3f}"
                    f" {npath:5.0f} {nmove:6.0f} {track_level:5.0f}"
                    f" {ntrack_ntie:6.1f} {ntie:6.1f} ")
+
+
+    def report_look_ahead(self, desc=""):
+        """ Report average nodes by number of look ahead levels used
+        """
+        if self.ncount < 1 or not self.look_ahead_hist:
+            return                          # Suppress line if no entries
+        
+        hist_str = " ".join([f"{nlevel}:{self.look_ahead_hist[nlevel]/self.ncount:.0f}"
+                             for nlevel in sorted(self.look_ahead_hist)])
+        SlTrace.lg(f"{desc:14s} levels:nodes {hist_str}")
             
 class MaxCompStats(CompStats):
-    def add(self, time_dur=None, npath=None, nbackup=None, nmove=None, track_level=None, ntrack_ntie=None, ntie=None, count=True):
+    def add(self, time_dur=None, npath=None, nbackup=None, nmove=None, track_level=None, ntrack_ntie=None, ntie=None, look_ahead_hist=None, count=True):
         if self.time_dur is None or time_dur > self.time_dur:
             self.time_dur = time_dur
         if self.npath is None or npath > self.npath:
@@ -109,7 +126,7 @@ class MaxCompStats(CompStats):
             self.ncount += 1
 
 class MinCompStats(CompStats):
-    def add(self, time_dur=None, npath=None, nbackup=None, nmove=None, track_level=None, ntrack_ntie=None, ntie=None, count=True):
+    def add(self, time_dur=None, npath=None, nbackup=None, nmove=None, track_level=None, ntrack_ntie=None, ntie=None, look_ahead_hist=None, count=True):
         if self.time_dur is None or time_dur < self.time_dur:
             self.time_dur = time_dur
         if self.npath is None or npath < self.npath:
@@ -0,0 +1,164 @@
+# endgame_solver.py
+"""
+Exact solver for the last part of a knight path
+With few empty squares left, whether a path from the current square
+can cover them all depends only on (empty squares, current square).
+The solver searches those states on bitmasks, remembering each state
+found to fail, so a state is never searched twice - across the main
+search's backups as well as within one solve.  That is the subset
+dynamic programming of Hamiltonian path checking, done lazily, with
+Warnsdorff ordering to reach a solution quickly when there is one.
+"""
+from select_trace import SlTrace
+
+class EndgameSolver:
+    """ Memoized bitmask search for a path covering the empty squares
+    """
+    def __init__(self, graph, end_mask=None, memo_size=500000,
+                 time_check=None, check_interval=4096):
+        """ Setup solver
+        :graph: KnightGraph of board
+        :end_mask: bitmask of squares on which the path may end
+                e.g. starting square's neighbors for closed tours
+                default: None - any square
+        :memo_size: maximum number of failed states remembered, all are
+                dropped when full default: 500000
+        :time_check: function called every check_interval nodes, which
+                may raise an exception (e.g. SelectTimeout) to stop
+                default: no checking
+        :check_interval: nodes between time_check calls default: 4096
+        """
+        self.graph = graph
+        self.neighbor_masks = graph.neighbor_masks
+        self.nsq = graph.nsq
+        self.end_mask = end_mask
+        self.solve_end_mask = end_mask  # Ending squares of current solve
+        self.end_code = 0           # Memo key part for current ending
+        self.memo_size = memo_size
+        self.time_check = time_check
+        self.check_interval = check_interval
+        self.ncheck_left = check_interval
+        self.failed = set()         # Failed state keys: (empty*nsq + cur_sq)*(nsq+1) + end_code
+        self.nsolve = 0             # Number of solve calls
+        self.nsolved = 0            # Number finding a path
+        self.nnode = 0              # Number of states searched
+        self.nmemo_hit = 0          # Number of states found failed before
+        self.nmemo_clear = 0        # Number of times memo was full
+
+
+    def solve(self, empty, cur_sq, end_sq=None):
+        """ Find path covering empty squares
+        :empty: bitmask of empty squares
+        :cur_sq: current square (occupied)
+        :end_sq: occupied square the path must end next to, e.g. the
+                other end of a path grown from both ends
+                default: None - end within end_mask
+        :returns: list of square indexes, in path order, None if no path
+        """
+        self.nsolve += 1
+        if end_sq is None:
+            self.solve_end_mask = self.end_mask
+            self.end_code = 0
+        else:
+            self.solve_end_mask = self.neighbor_masks[end_sq]
+            self.end_code = end_sq + 1
+        path = []
+        if not self.search(empty, cur_sq, path):
+            return None
+
+        self.nsolved += 1
+        if SlTrace.trace("endgame"):
+            SlTrace.lg(f"endgame solved: {len(path)} squares from {cur_sq}")
+        return path
+
+
+    def search(self, empty, cur_sq, path):
+        """ Extend path to cover empty squares
+        :empty: bitmask of empty squares
+        :cur_sq: current square
+        :path: path so far, extended in place
+        :returns: True if path covers empty squares, path holding them
+        """
+        end_mask = self.solve_end_mask
+        if not empty:
+            return end_mask is None or (end_mask >> cur_sq) & 1 == 1
+
+        key = (empty*self.nsq + cur_sq)*(self.nsq + 1) + self.end_code
+        failed = self.failed
+        if key in failed:
+            self.nmemo_hit += 1
+            return False
+
+        self.nnode += 1
+        if self.time_check is not None:
+            self.ncheck_left -= 1
+            if self.ncheck_left <= 0:
+                self.ncheck_left = self.check_interval
+                self.time_check()
+        if self.is_feasible(empty, cur_sq):
+            neighbor_masks = self.neighbor_masks
+            moves = neighbor_masks[cur_sq] & empty
+            scored = []
+            while moves:
+                low_bit = moves & -moves
+                moves ^= low_bit
+                nsq = low_bit.bit_length() - 1
+                ndeg = bin(neighbor_masks[nsq] & empty).count("1")
+                scored.append((ndeg, nsq))
+            scored.sort()
+            for _, nsq in scored:
+                path.append(nsq)
+                if self.search(empty ^ (1 << nsq), nsq, path):
+                    return True
+
+                path.pop()
+        if len(failed) >= self.memo_size:
+            failed.clear()
+            self.nmemo_clear += 1
+        failed.add(key)
+        return False
+
+
+    def is_feasible(self, empty, cur_sq):
+        """ Quick necessary checks, for a path from cur_sq covering empty
+        An empty square not next to cur_sq, with one or no empty
+        neighbors, can only be the path end, so there may be only one,
+        within end_mask.  All empty squares must be reachable.
+        :empty: bitmask of empty squares, not 0
+        :cur_sq: current square
+        :returns: False if no path can exist
+        """
+        neighbor_masks = self.neighbor_masks
+        end_mask = self.solve_end_mask
+        cur_mask = neighbor_masks[cur_sq]
+        far = empty & ~cur_mask
+        nend = 0
+        while far:
+            low_bit = far & -far
+            far ^= low_bit
+            nbs = neighbor_masks[low_bit.bit_length() - 1] & empty
+            if nbs & (nbs - 1):
+                continue                # Two or more exits
+
+            if end_mask is not None and not end_mask & low_bit:
+                return False
+
+            nend += 1
+            if nend > 1:
+                return False
+
+        spread = self.graph.spread
+        reached = cur_mask & empty
+        frontier = reached
+        while frontier:
+            frontier = spread(frontier) & empty & ~reached
+            reached |= frontier
+        return reached == empty
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"solves={self.nsolve} solved={self.nsolved} nodes={self.nnode}"
+                f" memo_hits={self.nmemo_hit} memo={len(self.failed)}/{self.memo_size}"
+                f" memo_clears={self.nmemo_clear}")
@@ -44,49 +44,9 @@ from chess_board_display import ChessBoardDisplay
 display_path = ChessBoardDisplay.display_path
 from paths_window import PathsWindow
 from paths_gen import PathsGen
+from zobrist_keys import ZobristKeys
 
-pWwm = Tk()                 # To support grid layout - MUST be done before wm
-###wm = Tk()                   # To force GUI to main thread
-wm = pWwm
-pW = None
-cF = SelectControl(control_prefix="path_control")
-ncol = cF.make_val("ncol", 4)     # default, override from properties
-
-closed_tours = cF.make_val("find_closed", True)         # True => only accept closed tours
-display_complete = cF.make_val("display_complete", True)    # True => display each complete(cover all) path
-display_move = display_complete = cF.make_val("display_move", False)
-move_time = cF.make_val("move_time", .1)              # Time per move (seconds)
-display_path_board = cF.make_val("display_path_board", False)  # True => display path board each path
-track_all_path = cF.make_val("track_all_path", False)
-###track_all_path = True               # TFD
-max_look_ahead = cF.make_val("max_look_ahead", 5)          # Maximum look-ahead for best move testing    
-nrow = cF.make_val("nrow", 8, repeat=True)
-ncol = cF.make_val("ncol", 8, repeat=True)
-###nrow = ncol = 6       # TFD
-###nrow = ncol = 4       # TFD
-run = cF.make_val("run", False)             # True - run on beginning, False - wait for arrangement
-###run = True              ### TFD
-start_ri = cF.make_val("start_ri", 0)
-###start_ri = 2        # TFD
-end_ri = cF.make_val("end_ri", nrow-1)
-start_ci = cF.make_val("start_ci", 0)
-###start_ci = 3        # TFD
-end_ci = cF.make_val("end_ci", ncol-1)
-###end_ri = 0          # TFD to limit printout
-sqno = 0
-all_paths = cF.make_val("all_paths", False)
-time_out = cF.make_val("time_out", 2)              # Time limit for path calculation
-###time_out = 999              ### TFD
-trace = "stack_grow,complete_paths"
-trace = "stack_grow"
-trace = "back_off_trace"
-trace = ""
-trace = cF.make_val("trace", trace)
-width = cF.make_val("width", 300)             # Chess board width in pixels
-height = cF.make_val("height", width)            # Chess board height in pixels
-###trace = "stack_grow,back_off_trace,no_more_moves"
-###trace = "set_piece"
-
+pW = None                   # Control window (PathsWindow), set by arrange_set
 
 def pgm_exit():
     quit()
@@ -201,7 +161,32 @@ def run_set():
         height=height,
         nrow = nrow,
         ncol = ncol,
-        max_look_ahead=max_look_ahead)
+        max_look_ahead=max_look_ahead,
+        adaptive_look_ahead=adaptive_look_ahead,
+        carry_look_ahead=carry_look_ahead,
+        region_check=region_check,
+        articulation_interval=articulation_interval,
+        dead_end_check=dead_end_check,
+        make_unmake=make_unmake,
+        lookahead_cache_size=lookahead_cache_size,
+        nogood_cache_size=nogood_cache_size,
+        feasibility_check=feasibility_check,
+        endgame_size=endgame_size,
+        endgame_memo_size=endgame_memo_size,
+        randomize_ties=randomize_ties,
+        random_seed=random_seed if random_seed != 0 else None,
+        restart_schedule=restart_schedule,
+        restart_base=restart_base,
+        restart_factor=restart_factor,
+        search_mode=search_mode,
+        beam_width=beam_width,
+        posa_repair=posa_repair,
+        construct_tours=construct_tours,
+        greedy_attempts=greedy_attempts,
+        portfolio=portfolio,
+        portfolio_workers=portfolio_workers,
+        board_backend=board_backend,
+        zobrist_seed=zobrist_seed)
     pW.set_paths_gen(paths_gen)     #connect paths_gen to control window
 
 def run_cmd():
@@ -241,56 +226,145 @@ def arrange_set():
          step_call=step_cmd, back_call=back_cmd, stop_call=stop_cmd)
     ### pW.set_val("arr", pW.ARR_TILE)
     ### pW.set_val("sort", pW.SORT_ORIG)
-    
-parser = argparse.ArgumentParser()
 
-parser.add_argument('--closed_tours', type=str2bool, dest='closed_tours', default=closed_tours)
-parser.add_argument('--display_complete', type=str2bool, dest='display_complete', default=display_complete)
-parser.add_argument('--display_path_board', type=str2bool, dest='display_path_board', default=display_path_board)
-parser.add_argument('--max_look_ahead=', type=int, dest='max_look_ahead', default=max_look_ahead)
-parser.add_argument('--move_time=', type=float, dest='move_time', default=move_time)
-parser.add_argument('--ncol=', type=int, dest='ncol', default=ncol)
-parser.add_argument('--nrow=', type=int, dest='nrow', default=nrow)
-parser.add_argument('--end_ci=', type=int, dest='end_ci', default=end_ci)
-parser.add_argument('--end_ri=', type=int, dest='end_ri', default=end_ri)
-parser.add_argument('--run', type=str2bool, dest='run', default=run)
-parser.add_argument('--time_out=', type=int, dest='time_out', default=time_out)
-parser.add_argument('--width=', type=int, dest='width', default=width)
-parser.add_argument('--height=', type=int, dest='height', default=height)
-parser.add_argument('--trace', dest='trace', default=trace)
-args = parser.parse_args()             # or die "Illegal options"
-SlTrace.lg("args: %s\n" % args)
-closed_tours = args.closed_tours
-display_complete = args.display_complete
-display_path_board = args.display_path_board
-end_ci = args.end_ci
-end_ri = args.end_ri
-max_look_ahead = args.max_look_ahead
-move_time = args.move_time
-ncol = args.ncol
-nrow= args.nrow
-if end_ci >= ncol:
-    end_ci = ncol-1
-if end_ri >= nrow:
-    end_ri = nrow-1
-run = args.run    
-time_out = args.time_out
-width = args.width
-height = args.height
-trace = args.trace
-pgm_info = "%s %s\n" % (os.path.basename(sys.argv[0]), " ".join(sys.argv[1:]))
-SlTrace.lg(pgm_info)
-if trace:
-    SlTrace.setFlags(trace)
 
-SlTrace.setLogStdTs(True)
-app = GridWindow(wm,
-                title="Good Knights",
-                arrange_selection=False,
-                pgmExit=pgm_exit,
-                )
-arrange_set()
-if run:
-    run_cmd()
+if __name__ == "__main__":     # Not when imported, e.g. by portfolio worker processes
+    pWwm = Tk()                 # To support grid layout - MUST be done before wm
+    ###wm = Tk()                   # To force GUI to main thread
+    wm = pWwm
+    cF = SelectControl(control_prefix="path_control")
+    ncol = cF.make_val("ncol", 4)     # default, override from properties
+
+    closed_tours = cF.make_val("find_closed", True)         # True => only accept closed tours
+    display_complete = cF.make_val("display_complete", True)    # True => display each complete(cover all) path
+    display_move = display_complete = cF.make_val("display_move", False)
+    move_time = cF.make_val("move_time", .1)              # Time per move (seconds)
+    display_path_board = cF.make_val("display_path_board", False)  # True => display path board each path
+    track_all_path = cF.make_val("track_all_path", False)
+    ###track_all_path = True               # TFD
+    max_look_ahead = cF.make_val("max_look_ahead", 5)          # Maximum look-ahead for best move testing    
+    adaptive_look_ahead = cF.make_val("adaptive_look_ahead", False)   # True => look ahead deeper only on ties, backups
+    carry_look_ahead = cF.make_val("carry_look_ahead", False)   # True => reuse parent's look ahead (deep look ahead)
+    region_check = cF.make_val("region_check", True)    # True => prune when empty squares can't be one path
+    articulation_interval = cF.make_val("articulation_interval", 256)   # Moves between articulation checks, 0 - none
+    dead_end_check = cF.make_val("dead_end_check", True)    # True => prune on dead end squares, play forced moves
+    make_unmake = cF.make_val("make_unmake", True)      # True => search on one board, undoing moves in place
+    lookahead_cache_size = cF.make_val("lookahead_cache_size", 100000)  # Positions with cached move order, 0 - none
+    nogood_cache_size = cF.make_val("nogood_cache_size", 200000)  # Positions remembered as having no path, 0 - none
+    feasibility_check = cF.make_val("feasibility_check", True)  # True => skip search when tour existence theorems rule it out
+    endgame_size = cF.make_val("endgame_size", 0)      # Empty squares at which exact endgame solver takes over, 0 - never
+    endgame_memo_size = cF.make_val("endgame_memo_size", 500000)  # Failed endgame positions remembered
+    randomize_ties = cF.make_val("randomize_ties", False)   # True => random order of equally scored moves
+    random_seed = cF.make_val("random_seed", 0)        # Tie order seed, 0 - new (logged) seed each run
+    restart_schedule = cF.make_val("restart_schedule", "none")  # "none", "luby" or "geometric" restarts
+    restart_base = cF.make_val("restart_base", 0)      # Moves before first restart, 0 - 4 per square
+    restart_factor = cF.make_val("restart_factor", 1.5)    # Geometric restart growth
+    search_mode = cF.make_val("search_mode", "dfs")    # "dfs", "lds" limited discrepancy, "beam", "bidir" closed tours
+    beam_width = cF.make_val("beam_width", 64)         # Partial paths kept per level, in beam search
+    posa_repair = cF.make_val("posa_repair", True)     # True => complete stalled paths by rotation
+    construct_tours = cF.make_val("construct_tours", False)    # True => closed tours built by tiling, no search
+    greedy_attempts = cF.make_val("greedy_attempts", 8)    # Greedy Warnsdorff passes before searching, 0 - none
+    portfolio = cF.make_val("portfolio", False)        # True => race search strategies in parallel processes
+    portfolio_workers = cF.make_val("portfolio_workers", 0)    # Processes at once in portfolio, 0 - one per strategy
+    board_backend = cF.make_val("board_backend", "bitmask")    # "bitmask" or "numpy" (degree maps, requires numpy)
+    zobrist_seed = cF.make_val("zobrist_seed", ZobristKeys.default_seed)  # Position hash keys seed
+    nrow = cF.make_val("nrow", 8, repeat=True)
+    ncol = cF.make_val("ncol", 8, repeat=True)
+    ###nrow = ncol = 6       # TFD
+    ###nrow = ncol = 4       # TFD
+    run = cF.make_val("run", False)             # True - run on beginning, False - wait for arrangement
+    ###run = True              ### TFD
+    start_ri = cF.make_val("start_ri", 0)
+    ###start_ri = 2        # TFD
+    end_ri = cF.make_val("end_ri", nrow-1)
+    start_ci = cF.make_val("start_ci", 0)
+    ###start_ci = 3        # TFD
+    end_ci = cF.make_val("end_ci", ncol-1)
+    ###end_ri = 0          # TFD to limit printout
+    sqno = 0
+    all_paths = cF.make_val("all_paths", False)
+    time_out = cF.make_val("time_out", 2)              # Time limit for path calculation
+    ###time_out = 999              ### TFD
+    trace = "stack_grow,complete_paths"
+    trace = "stack_grow"
+    trace = "back_off_trace"
+    trace = ""
+    trace = cF.make_val("trace", trace)
+    width = cF.make_val("width", 300)             # Chess board width in pixels
+    height = cF.make_val("height", width)            # Chess board height in pixels
+    ###trace = "stack_grow,back_off_trace,no_more_moves"
+    ###trace = "set_piece"
+
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--closed_tours', type=str2bool, dest='closed_tours', default=closed_tours)
+    parser.add_argument('--display_complete', type=str2bool, dest='display_complete', default=display_complete)
+    parser.add_argument('--display_path_board', type=str2bool, dest='display_path_board', default=display_path_board)
+    parser.add_argument('--max_look_ahead=', type=int, dest='max_look_ahead', default=max_look_ahead)
+    parser.add_argument('--adaptive_look_ahead', type=str2bool, dest='adaptive_look_ahead', default=adaptive_look_ahead)
+    parser.add_argument('--make_unmake', type=str2bool, dest='make_unmake', default=make_unmake)
+    parser.add_argument('--feasibility_check', type=str2bool, dest='feasibility_check', default=feasibility_check)
+    parser.add_argument('--endgame_size=', type=int, dest='endgame_size', default=endgame_size)
+    parser.add_argument('--restart_schedule=', dest='restart_schedule', default=restart_schedule)
+    parser.add_argument('--search_mode=', dest='search_mode', default=search_mode)
+    parser.add_argument('--posa_repair', type=str2bool, dest='posa_repair', default=posa_repair)
+    parser.add_argument('--construct_tours', type=str2bool, dest='construct_tours', default=construct_tours)
+    parser.add_argument('--greedy_attempts=', type=int, dest='greedy_attempts', default=greedy_attempts)
+    parser.add_argument('--portfolio', type=str2bool, dest='portfolio', default=portfolio)
+    parser.add_argument('--move_time=', type=float, dest='move_time', default=move_time)
+    parser.add_argument('--ncol=', type=int, dest='ncol', default=ncol)
+    parser.add_argument('--nrow=', type=int, dest='nrow', default=nrow)
+    parser.add_argument('--end_ci=', type=int, dest='end_ci', default=end_ci)
+    parser.add_argument('--end_ri=', type=int, dest='end_ri', default=end_ri)
+    parser.add_argument('--run', type=str2bool, dest='run', default=run)
+    parser.add_argument('--time_out=', type=int, dest='time_out', default=time_out)
+    parser.add_argument('--width=', type=int, dest='width', default=width)
+    parser.add_argument('--height=', type=int, dest='height', default=height)
+    parser.add_argument('--trace', dest='trace', default=trace)
+    args = parser.parse_args()             # or die "Illegal options"
+    SlTrace.lg("args: %s\n" % args)
+    closed_tours = args.closed_tours
+    display_complete = args.display_complete
+    display_path_board = args.display_path_board
+    end_ci = args.end_ci
+    end_ri = args.end_ri
+    max_look_ahead = args.max_look_ahead
+    adaptive_look_ahead = args.adaptive_look_ahead
+    make_unmake = args.make_unmake
+    feasibility_check = args.feasibility_check
+    endgame_size = args.endgame_size
+    restart_schedule = args.restart_schedule
+    search_mode = args.search_mode
+    posa_repair = args.posa_repair
+    construct_tours = args.construct_tours
+    greedy_attempts = args.greedy_attempts
+    portfolio = args.portfolio
+    move_time = args.move_time
+    ncol = args.ncol
+    nrow= args.nrow
+    if end_ci >= ncol:
+        end_ci = ncol-1
+    if end_ri >= nrow:
+        end_ri = nrow-1
+    run = args.run    
+    time_out = args.time_out
+    width = args.width
+    height = args.height
+    trace = args.trace
+    pgm_info = "%s %s\n" % (os.path.basename(sys.argv[0]), " ".join(sys.argv[1:]))
+    SlTrace.lg(pgm_info)
+    if trace:
+        SlTrace.setFlags(trace)
+
+    SlTrace.setLogStdTs(True)
+    app = GridWindow(wm,
+                    title="Good Knights",
+                    arrange_selection=False,
+                    pgmExit=pgm_exit,
+                    )
+    arrange_set()
+    if run:
+        run_cmd()
 
-wm.mainloop()
+    wm.mainloop()
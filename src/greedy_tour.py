@@ -0,0 +1,167 @@
+# greedy_tour.py
+"""
+Pure greedy Warnsdorff tours, without backtracking
+Each move goes to the empty neighbor having the fewest empty neighbors,
+as in warnsdorf.py, on the shared KnightGraph tables with a running
+degree count, so a pass costs about 8 steps per square.  The first
+attempt breaks ties in move order; later attempts break them at random,
+which finds tours from most starting squares in a few tries.
+For closed tours the start's neighbors are counted as one exit richer
+(the start being the final exit), so they tend to be left for the end.
+"""
+import random
+from datetime import datetime, timedelta
+
+from select_trace import SlTrace
+
+from knights_paths import FoundPaths
+
+class GreedyTour:
+    """ Randomized Warnsdorff passes for a board
+    """
+    def __init__(self, graph, closed_tours=False, nattempt=8, seed=0, time_limit=None):
+        """ Setup
+        :graph: KnightGraph of board
+        :closed_tours: True - tour must end next to its start
+        :nattempt: number of passes per start, the first in move order,
+                the rest with random tie order default: 8
+        :seed: seed for random tie order, with the start square,
+                so each start's attempts repeat from run to run default: 0
+        :time_limit: time limit, in seconds, for each start's passes,
+                checked between passes default: None - all nattempt passes
+        """
+        self.graph = graph
+        self.closed_tours = closed_tours
+        self.nattempt = nattempt
+        self.seed = seed
+        self.time_limit = time_limit
+        self.nsearch = 0            # Number of starts searched
+        self.nfound = 0             # Number of starts with a tour found
+        self.npass = 0              # Number of passes made
+        self.nmove = 0              # Number of moves made, in all passes
+        self.ntimeout = 0           # Number of starts stopped by time limit
+
+
+    def search(self, start_sq):
+        """ Find tour by greedy passes
+        :start_sq: starting square index
+        :returns: list of square indexes, starting with start_sq,
+                None if no pass succeeded
+        """
+        self.nsearch += 1
+        time_end = None
+        if self.time_limit is not None:
+            time_end = datetime.now() + timedelta(seconds=self.time_limit)
+        rng = None
+        for i in range(self.nattempt):
+            if time_end is not None and i > 0 and datetime.now() > time_end:
+                self.ntimeout += 1
+                if SlTrace.trace("greedy"):
+                    SlTrace.lg(f"greedy time limit from {start_sq} after {i} passes")
+                break
+
+            if i == 1:
+                rng = random.Random(self.seed*self.graph.nsq + start_sq)
+            path = self.greedy_pass(start_sq, rng=rng)
+            if path is not None:
+                self.nfound += 1
+                if SlTrace.trace("greedy"):
+                    SlTrace.lg(f"greedy tour from {start_sq} on pass {i+1}")
+                return path
+
+        return None
+
+
+    def greedy_pass(self, start_sq, rng=None):
+        """ One Warnsdorff pass
+        :start_sq: starting square index
+        :rng: random generator for tie order, None - move order
+        :returns: list of square indexes covering board, None if stuck
+        """
+        self.npass += 1
+        graph = self.graph
+        nsq = graph.nsq
+        neighbors = graph.neighbors
+        degree = list(graph.degrees)    # Empty neighbors of each square
+        visited = bytearray(nsq)
+        visited[start_sq] = 1
+        if not self.closed_tours:
+            for nb in neighbors[start_sq]:
+                degree[nb] -= 1
+        path = [start_sq]
+        cur_sq = start_sq
+        for _ in range(nsq - 1):
+            best = None
+            best_key = None
+            for nb in neighbors[cur_sq]:
+                if visited[nb]:
+                    continue
+
+                key = degree[nb]
+                if rng is not None:
+                    key += rng.random()     # Random order within a degree
+                if best is None or key < best_key:
+                    best, best_key = nb, key
+            if best is None:
+                self.nmove += len(path) - 1
+                return None             # Stuck
+
+            visited[best] = 1
+            for nb in neighbors[best]:
+                degree[nb] -= 1
+            path.append(best)
+            cur_sq = best
+        self.nmove += nsq - 1
+        if self.closed_tours and not graph.is_neighbor(start_sq, cur_sq):
+            return None
+
+        return path
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"starts={self.nsearch} found={self.nfound} passes={self.npass}"
+                f" moves={self.nmove} timeouts={self.ntimeout}")
+
+
+class GreedyPaths(FoundPaths):
+    """ Greedy tour from a starting square, for PathsGen
+    """
+    def __init__(self, greedy, loc, closed_tours=False):
+        """ Setup
+        :greedy: GreedyTour of board
+        :loc: starting (ic, ir) location
+        :closed_tours: True - closed tours requested
+        """
+        super().__init__(loc, greedy.graph.nsq, closed_tours=closed_tours)
+        self.greedy = greedy
+        self.npass = 0
+
+
+    def find_path(self):
+        """ Get tour by greedy passes
+        """
+        graph = self.greedy.graph
+        npass = self.greedy.npass
+        nmove = self.greedy.nmove
+        sqs = self.greedy.search(graph.loc2sq(self.loc))
+        self.nmove = self.greedy.nmove - nmove
+        self.npass = self.greedy.npass - npass
+        if sqs is None:
+            return None
+
+        return [graph.sq2loc(sq) for sq in sqs]
+
+
+    def is_neighbor(self, loc, loc2):
+        """ Check if one move away
+        """
+        graph = self.greedy.graph
+        return graph.is_neighbor(graph.loc2sq(loc), graph.loc2sq(loc2))
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return f"passes={self.npass} moves={self.nmove}"
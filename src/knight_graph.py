@@ -0,0 +1,147 @@
+# knight_graph.py
+"""
+Precomputed knight move tables
+One table set per board size (nrow, ncol), shared by every board,
+path search and display of that size, so move generation is a table
+lookup instead of eight bounds checks per call.
+Squares are indexed ir*ncol+ic, matching ChessBoard occupancy bits.
+"""
+from select_error import SelectError
+
+class KnightGraph:
+    """ Knight move adjacency for an nrow x ncol board
+    Use KnightGraph.get(nrow, ncol) to share the cached tables
+    """
+    graphs = {}             # Cached graphs by (nrow, ncol)
+
+    # Knight moves (dc, dr), numbered (1)-(8) as in good_knights.py
+    moves = ((-2,1), (-1,2), (1,2), (2,1), (2,-1), (1,-2), (-1,-2), (-2,-1))
+
+    @classmethod
+    def get(cls, nrow=8, ncol=8):
+        """ Get shared graph for board size
+        :nrow: number of rows
+        :ncol: number of columns
+        :returns: KnightGraph, created on first use
+        """
+        key = (nrow, ncol)
+        graph = cls.graphs.get(key)
+        if graph is None:
+            graph = cls(nrow=nrow, ncol=ncol)
+            cls.graphs[key] = graph
+        return graph
+
+
+    def __init__(self, nrow=8, ncol=8):
+        """ Build adjacency tables
+        :nrow: number of rows
+        :ncol: number of columns
+        """
+        if nrow < 1 or ncol < 1:
+            raise SelectError(f"KnightGraph: board {nrow}x{ncol} has no squares")
+
+        self.nrow = nrow
+        self.ncol = ncol
+        self.nsq = nrow*ncol
+        self.full_mask = (1 << self.nsq) - 1
+        self.neighbors = []         # Per square: tuple of neighbor square indexes
+        for ir in range(nrow):
+            for ic in range(ncol):
+                nbs = []
+                for dc,dr in self.moves:
+                    nc, nr = ic+dc, ir+dr
+                    if nc < 0 or nc >= ncol or nr < 0 or nr >= nrow:
+                        continue
+                    nbs.append(nr*ncol + nc)
+                self.neighbors.append(tuple(nbs))
+        self.degrees = [len(nbs) for nbs in self.neighbors]   # Empty board degree
+        # Built on first use - each mask is a board wide int, so the
+        # tables take time and memory growing as the square of the
+        # number of squares, and only the bitmask searches need them
+        self._neighbor_locs = None
+        self._neighbor_masks = None
+        self._shifts = None
+
+
+    @property
+    def neighbor_locs(self):
+        """ Per square: tuple of neighbor (ic,ir) locs
+        """
+        if self._neighbor_locs is None:
+            ncol = self.ncol
+            self._neighbor_locs = [tuple((nsq % ncol, nsq // ncol) for nsq in nbs)
+                                   for nbs in self.neighbors]
+        return self._neighbor_locs
+
+
+    @property
+    def neighbor_masks(self):
+        """ Per square: bitmask of neighbor squares
+        """
+        if self._neighbor_masks is None:
+            neighbor_masks = []
+            for nbs in self.neighbors:
+                nb_mask = 0
+                for nsq in nbs:
+                    nb_mask |= 1 << nsq
+                neighbor_masks.append(nb_mask)
+            self._neighbor_masks = neighbor_masks
+        return self._neighbor_masks
+
+
+    @property
+    def shifts(self):
+        """ Per move: (bit shift, mask of squares having move)
+        """
+        if self._shifts is None:
+            nrow, ncol = self.nrow, self.ncol
+            shifts = []
+            for dc,dr in self.moves:
+                row_mask = 0        # Columns having the move, in one row
+                for ic in range(max(0,-dc), min(ncol,ncol-dc)):
+                    row_mask |= 1 << ic
+                src_mask = 0
+                for ir in range(max(0,-dr), min(nrow,nrow-dr)):
+                    src_mask |= row_mask << ir*ncol
+                shifts.append((dr*ncol + dc, src_mask))
+            self._shifts = shifts
+        return self._shifts
+
+
+    def loc2sq(self, loc):
+        """ Convert (ic,ir) tuple to square index - no checking
+        """
+        return loc[1]*self.ncol + loc[0]
+
+
+    def sq2loc(self, sq):
+        """ Convert square index to (ic,ir) tuple
+        """
+        return (sq % self.ncol, sq // self.ncol)
+
+
+    def spread(self, mask):
+        """ Get all squares one knight move from squares in mask
+        Whole mask at once, one shift per move direction
+        :mask: bitmask of squares
+        :returns: bitmask of their neighbors
+        """
+        nbs = 0
+        for shift, src_mask in self.shifts:
+            if shift > 0:
+                nbs |= (mask & src_mask) << shift
+            else:
+                nbs |= (mask & src_mask) >> -shift
+        return nbs
+
+
+    def is_neighbor(self, sq, sq2):
+        """ Check if squares are one knight move apart
+        :sq: square index
+        :sq2: square index
+        :returns: True if neighbors
+        """
+        r1, c1 = divmod(sq, self.ncol)
+        r2, c2 = divmod(sq2, self.ncol)
+        dr, dc = abs(r1-r2), abs(c1-c2)
+        return (dr == 1 and dc == 2) or (dr == 2 and dc == 1)
@@ -3,12 +3,24 @@
 Support searching for knights paths on a chess board calculation
 """
 import datetime
+import random
 from select_trace import SlTrace
 from select_error import SelectError
 from select_timeout import SelectTimeout
 
 from chess_board import ChessBoard
+from chess_board_np import ChessBoardNp
 from chess_board_display import ChessBoardDisplay, ChessPiece
+from knight_graph import KnightGraph
+from lookahead_cache import LookaheadCache
+from nogood_cache import NogoodCache
+from region_check import RegionCheck
+from endgame_solver import EndgameSolver
+from restart_schedule import RestartSchedule
+from beam_search import BeamSearch
+from bidirectional_search import BidirectionalSearch
+from posa_repair import PosaRepair
+from tour_feasibility import TourFeasibility
 
 loc2desc = ChessBoard.loc2desc 
 loc2tuple = ChessBoard.loc2tuple 
@@ -37,42 +49,203 @@ class PathStackEntryDisplayInfo:
         
 
 class PathStackEntry:
-    """ move stack, containing information to suggest next move,
+    """ move stack frame, containing information to suggest next move,
     display move, etc.
+    Frames are preallocated, one per depth, by PathStack and reused.
+    The ordered candidate moves are kept in a fixed buffer, consumed
+    by advancing a cursor, so a search step allocates no lists.
+    Look ahead branches (see KnightsPaths.score_vectors), built while
+    ordering the candidates, are kept by candidate, to be handed to the
+    candidate's frame once it is made.
     """
-    def __init__(self, piece=None, loc=None, board=None, best_moves=None, display_info=None):
+    __slots__ = ("piece", "sq", "board", "moves", "nmoves", "cursor",
+                 "display_info", "look_branches", "subtrees", "nogood_ok",
+                 "ndiscrepancy")
+    
+    def __init__(self, piece=None, sq=None, board=None, display_info=None):
         """ setup path stack entry
         :piece: Chess piece string, e.g. N for black knight default: black knight
-        :loc: destination move location
-        :board: ChessBoard default: self.board playing board with move in place
-        :best_moves: list of follow-on moves in decreasing benefit default: unknown - calculate them
-                        next_move_list element: (score, move) where lower is better
+        :sq: destination move square index (ir*ncol+ic)
+        :board: ChessBoard playing board with move in place
+                default: None - make/unmake search, the search board is current
         :display_info: display info, used by display_move, undisplay_move
         """
+        self.moves = [0]*len(KnightGraph.moves)     # Candidate buffer
+        self.set(piece=piece, sq=sq, board=board, display_info=display_info)
+
+
+    def set(self, piece=None, sq=None, board=None, display_info=None):
+        """ (Re)use frame for a new move, candidates not yet known
+        see __init__ for parameters
+        """
         if piece is  None:
             piece = "N"
         self.piece = piece
-        if loc is None:
-            raise SelectError("loc missing")
-        
-        self.loc = loc
-        if board is None:
-            board = self.board
+        self.sq = sq
         self.board = board
-        self.best_moves = best_moves
+        self.nmoves = -1            # -1: candidates not yet calculated
+        self.cursor = 0             # Index of next candidate to try
         self.display_info = display_info
+        self.look_branches = None   # Candidates' look ahead branches, from parent
+        self.subtrees = None        # Branches of candidates' candidates, by candidate
+        self.nogood_ok = True       # False - subtree yielded a path or was cut short
+        self.ndiscrepancy = 0       # Moves, to here, other than a best move
+
+
+    def has_moves(self):
+        """ Check if candidate moves have been calculated
+        """
+        if self.nmoves < 0:
+            return False
+        
+        return True
+
+
+    def set_moves(self, moves):
+        """ Store candidate moves, in decreasing benefit
+        :moves: iterable of square indexes
+        """
+        buf = self.moves
+        n = 0
+        for move in moves:
+            buf[n] = move
+            n += 1
+        self.nmoves = n
+        self.cursor = 0
+
+
+    def next_candidate(self):
+        """ Take next candidate move
+        :returns: square index, None if no more candidates
+        """
+        cursor = self.cursor
+        if cursor >= self.nmoves:
+            return None
+        
+        self.cursor = cursor + 1
+        return self.moves[cursor]
+
+
+    def unget_candidate(self):
+        """ Return the last taken candidate, to be taken again next
+        """
+        if self.cursor > 0:
+            self.cursor -= 1
+
+
+    def reset_moves(self):
+        """ Forget candidate moves, to be calculated again
+        """
+        self.nmoves = -1
+        self.cursor = 0
+        self.subtrees = None
+        self.nogood_ok = True
+
+
+    def best_moves(self):
+        """ Remaining candidate moves
+        :returns: list of square indexes, None if not yet calculated
+        """
+        if self.nmoves < 0:
+            return None
+        
+        return self.moves[self.cursor:self.nmoves]
+
+
+class PathStack:
+    """ Path stack, as a store of preallocated frames, one per depth
+    Supports len(), indexing (including negative) and iteration
+    over the current frames, like the list it replaces.
+    """
+    def __init__(self, max_depth):
+        """ Setup empty stack
+        :max_depth: maximum number of frames (squares on board)
+        """
+        self.frames = [PathStackEntry() for _ in range(max_depth)]
+        self.depth = 0
+
+
+    def __len__(self):
+        return self.depth
+
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.depth
+        if index < 0 or index >= self.depth:
+            raise IndexError(f"PathStack index {index} out of range")
+        
+        return self.frames[index]
+
+
+    def __iter__(self):
+        frames = self.frames
+        for i in range(self.depth):
+            yield frames[i]
+
+
+    def push(self, piece=None, sq=None, board=None):
+        """ Push frame for new move
+        see PathStackEntry.set for parameters
+        :returns: frame
+        """
+        if self.depth >= len(self.frames):
+            raise SelectError(f"PathStack is full at depth {self.depth}")
+        
+        frame = self.frames[self.depth]
+        frame.set(piece=piece, sq=sq, board=board)
+        self.depth += 1
+        return frame
+
+
+    def pop(self):
+        """ Remove top frame
+        """
+        if self.depth == 0:
+            raise SelectError("PathStack is empty")
+        
+        self.depth -= 1
+        frame = self.frames[self.depth]
+        frame.board = None          # Drop references held by frame
+        frame.display_info = None
+        frame.look_branches = None
+        frame.subtrees = None
 
         
 class KnightsPaths:
     """ Generates knight paths, given starting position
     """
+    look_ahead_region = 4       # Stack depths per region, for adaptive look ahead
+    repair_reserve = .1         # Part of time limit kept for rotation repair
+    
     def __init__(self, board=None, loc=None, closed_tours=False, max_try=None, time_limit=None,
                  backup_limit=500,
                  display_move=False,
                  pW=None,
                  move_time=.5,
                  nrow=None, ncol=None,
-                 max_look_ahead=5):
+                 max_look_ahead=5,
+                 adaptive_look_ahead=False,
+                 carry_look_ahead=False,
+                 region_check=True,
+                 articulation_interval=256,
+                 dead_end_check=True,
+                 make_unmake=True,
+                 lookahead_cache_size=100000,
+                 nogood_cache_size=200000,
+                 feasibility_check=True,
+                 endgame_size=0,
+                 endgame_memo_size=500000,
+                 randomize_ties=False,
+                 random_seed=None,
+                 restart_schedule=None,
+                 restart_base=None,
+                 restart_factor=1.5,
+                 search_mode="dfs",
+                 beam_width=64,
+                 posa_repair=True,
+                 board_backend="bitmask",
+                 zobrist_seed=None):
         """ Setup for kight path generation
         Via depth-first search of night moves which traverse board without revisiting any square.
         
@@ -82,6 +255,21 @@ class KnightsPaths:
         :loc: starting knight position                
         :closed_tours: return only closed tours
         :max_look_ahead: maximum number of moves to look ahead in best move determination
+        :adaptive_look_ahead: True - choose look ahead per node: one level unless
+                        first level scores tie, deeper, up to max_look_ahead,
+                        as backups accumulate in the node's stack region
+                        default: False - max_look_ahead at every node
+        :carry_look_ahead: True - keep look ahead walk counts by first step,
+                        so the made move's node starts from them, which pays
+                        when deep look ahead (max_look_ahead > 5) is in play
+                        default: False
+        :region_check: True - back up as soon as the empty squares can't
+                        be covered by one path (see RegionCheck) default: True
+        :articulation_interval: number of moves between region articulation
+                        square checks, 0 - none default: 256
+        :dead_end_check: True - back up when squares with one or no
+                        exits can't all be path ends, and play a move
+                        forced by them without ordering default: True
         :max_tries: Number of tries (no more moves) for path default: no max
         :time_Limit: time limit, in seconds to produce a result (return path)
                     default: 5 seconds
@@ -89,11 +277,76 @@ class KnightsPaths:
         :display_move: True - display move on board
         :pW: control window (PathsWindow)
         :move_time: time to display move default: .5 second
+        :make_unmake: True - search on one board, making and unmaking moves in place
+                        False - give each move (path stack entry) its own board copy
+                        default: True
+        :lookahead_cache_size: maximum number of positions whose look ahead
+                        move ordering is cached, 0 - no caching default: 100000
+                        With adaptive_look_ahead, orderings are cached by
+                        position and look ahead depth.
+        :nogood_cache_size: maximum number of positions (see state_key)
+                        remembered as having no path, so reaching one again
+                        backs up at once, 0 - no caching default: 200000
+        :feasibility_check: True - answer no path, without searching, when
+                        board size, tour type or starting square color rule
+                        out tours (see TourFeasibility) default: True
+        :endgame_size: number of empty squares at or below which the rest
+                        of the path is found by EndgameSolver, instead of
+                        move by move search, 0 - never default: 0
+        :endgame_memo_size: maximum number of failed endgame positions
+                        remembered default: 500000
+        :randomize_ties: True - order moves with equal Warnsdorff scores
+                        randomly, instead of by square default: False
+        :random_seed: seed for random tie order, logged so a run can be
+                        repeated default: None - new seed
+        :restart_schedule: restart search from the first move, with a new
+                        random tie order, after a number of moves given by
+                        RestartSchedule, "luby" or "geometric", implies
+                        randomize_ties default: None - no restarts
+        :restart_base: moves before first restart
+                        default: None (or 0) - 4 per square
+        :restart_factor: geometric schedule growth per restart default: 1.5
+        :search_mode: "dfs" - depth first, trying a node's moves in order
+                        "lds" - limited discrepancy: depth first, passes
+                            allowing 0, 1, 2, ... moves other than a node's
+                            best, anywhere on the path
+                        "beam" - beam search (see BeamSearch), for one path,
+                            giving its best partial path if none found
+                        "bidir" - closed tours only: depth first growing
+                            both ends of the tour, joined by the endgame
+                            solver (see BidirectionalSearch), for one tour,
+                            endgame_size, if set, is the joining size
+                        default: "dfs"
+        :beam_width: partial paths kept per level, in beam search default: 64
+        :posa_repair: True - try completing stalled paths by rotation and
+                        extension (see PosaRepair): complete paths which
+                        don't close, for closed tours, and the longest path
+                        at timeout, with search stopping repair_reserve of
+                        time_limit early to leave time for it default: True
+        :board_backend: board created, if board not present
+                        "bitmask" - ChessBoard
+                        "numpy" - ChessBoardNp, Warnsdorff scores from
+                                numpy degree maps (requires numpy)
+                        default: "bitmask"
+        :zobrist_seed: seed for position hash keys (state_key), if board
+                        not present default: ZobristKeys.default_seed
         """
         self.ntry = 0                            # number of tries so far
         self.nmove = 0                           # NUmber of moves, including retries
         self.path_stack = None
         self.max_look_ahead = max_look_ahead
+        self.adaptive_look_ahead = adaptive_look_ahead
+        self.look_ahead_hist = {}       # Number of nodes by look ahead levels used
+        self.carry_look_ahead = carry_look_ahead
+        self.nlook_branch = 0           # Look ahead branches started
+        self.nlook_carried = 0          # Candidates scored from parent's branches
+        self.make_unmake = make_unmake
+        self.lookahead_cache = None     # Move orderings by position, if caching
+        if lookahead_cache_size > 0:
+            self.lookahead_cache = LookaheadCache(max_size=lookahead_cache_size)
+        self.nogood_cache = None        # Positions without a path, if caching
+        if nogood_cache_size > 0:
+            self.nogood_cache = NogoodCache(max_size=nogood_cache_size)
         self.max_try = max_try
         self.is_display_move = display_move
         self.pW = pW
@@ -101,11 +354,21 @@ class KnightsPaths:
         self.time_begin = datetime.datetime.now()
         self.move_time = move_time
         if board is None:
-            board = ChessBoard(ncol=ncol, nrow=nrow)
+            if board_backend == "numpy":
+                board = ChessBoardNp(ncol=ncol, nrow=nrow, track_degree=True,
+                                     zobrist_seed=zobrist_seed)
+            elif board_backend == "bitmask":
+                board = ChessBoard(ncol=ncol, nrow=nrow, track_degree=True,
+                                   zobrist_seed=zobrist_seed)
+            else:
+                raise SelectError(f"Unrecognized board_backend: '{board_backend}'")
         self.board = board
+        self.graph = board.graph        # Shared knight move tables
+        self.zobrist = board.zobrist    # Shared position hash keys
         self.ncol = board.ncol
         self.nrow = board.nrow
         self.len_ckt = self.ncol*self.nrow
+        self.region_nbackup = [0]*(self.len_ckt//self.look_ahead_region + 1)   # Backups by stack region
         self.display_board = None       # Board displaying moves during run
         if self.is_display_move:
             self.display_move_setup()
@@ -117,10 +380,84 @@ class KnightsPaths:
         self.time_limit = time_limit
         self.time_end = self.time_begin + datetime.timedelta(seconds=time_limit)
         self.loc_start = loc
+        self.sq_start = board.loc2sq(board.loc2tuple(loc))
         self.closed_tours = closed_tours
-        self.candidate_end_moves = self.get_knight_moves(loc)       # Possible end moves for closed tour
+        self.impossible_reason = None   # Why no tour can exist, if known
+        if feasibility_check:
+            self.impossible_reason = TourFeasibility.impossible_reason(
+                                        self.nrow, self.ncol, closed_tours=closed_tours,
+                                        loc=board.loc2tuple(loc))
+        self.candidate_end_moves = list(self.graph.neighbors[self.sq_start])   # Possible end moves for closed tour
+        self.candidate_end_mask = self.graph.neighbor_masks[self.sq_start]
+        self.dead_end_check = dead_end_check
+        self.nprune_dead_end = 0        # Nodes with too many dead end squares
+        self.nforced_move = 0           # Nodes with a forced move
+        self.region_check = None
+        if region_check:
+            self.region_check = RegionCheck(self.graph, closed_tours=closed_tours,
+                                            articulation_interval=articulation_interval)
+        self.endgame_size = endgame_size
+        self.endgame = None
+        if endgame_size > 0:
+            end_mask = self.candidate_end_mask if closed_tours else None
+            self.endgame = EndgameSolver(self.graph, end_mask=end_mask,
+                                         memo_size=endgame_memo_size,
+                                         time_check=self.time_check)
+        if restart_schedule == "none":
+            restart_schedule = None
+        self.restart_schedule = None
+        self.restart_nmove = None       # Move count at which to restart
+        self.nrestart = 0               # Number of restarts
+        if restart_schedule is not None:
+            randomize_ties = True
+            if not restart_base:
+                restart_base = 4*self.len_ckt   # Room for several tries at a path
+            self.restart_schedule = RestartSchedule(restart_schedule, base=restart_base,
+                                                    factor=restart_factor)
+        self.randomize_ties = randomize_ties
+        self.rng = None                 # Tie order generator, if randomizing
+        if randomize_ties:
+            if random_seed is None:
+                random_seed = random.SystemRandom().getrandbits(32)
+            self.rng = random.Random(random_seed)
+        self.random_seed = random_seed
+        if search_mode not in ("dfs", "lds", "beam", "bidir"):
+            raise SelectError(f"Unrecognized search_mode: '{search_mode}'")
+        self.search_mode = search_mode
+        self.is_searched = False        # One path modes: search done
+        self.bidir = None               # Bidirectional search, if in use
+        if search_mode == "bidir":
+            if not closed_tours:
+                raise SelectError("search_mode 'bidir' requires closed_tours")
+            join_size = endgame_size if endgame_size > 0 else 16
+            if self.endgame is None:
+                self.endgame = EndgameSolver(self.graph, memo_size=endgame_memo_size,
+                                             time_check=self.time_check)
+            self.bidir = BidirectionalSearch(self.graph, self.zobrist, self.endgame,
+                                             join_size=join_size,
+                                             region_check=self.region_check,
+                                             nogood_cache_size=nogood_cache_size,
+                                             time_check=self.time_check)
+        self.beam = None                # Beam search, if in use
+        if search_mode == "beam":
+            self.beam = BeamSearch(self.graph, width=beam_width,
+                                   closed_tours=closed_tours,
+                                   region_check=self.region_check,
+                                   time_check=self.time_check)
+        self.discrepancy_limit = None   # Most discrepancies allowed in pass, if limited
+        self.nlds_pass = 0              # Number of limited discrepancy passes
+        if search_mode == "lds":
+            self.discrepancy_limit = 0
+            self.nlds_pass = 1
+        self.posa = None                # Path repair, if in use
+        self.search_time_end = self.time_end    # Search timeout, before repair
+        if posa_repair:
+            self.posa = PosaRepair(self.graph)
+            self.search_time_end -= datetime.timedelta(seconds=self.repair_reserve*time_limit)
         self.nprune_closed = 0              # count pruning
-        self.make_move('N', self.loc_start)
+        self.make_move('N', sq=self.sq_start)
+        if self.restart_schedule is not None:
+            self.restart_nmove = self.nmove + self.restart_schedule.next_limit()
         self.track_level = self.len_ckt
         self.ncomplete_path = 0     # Number of paths found
         self.nbackup = 0           # Number of backups, not including non-tour paths
@@ -148,6 +485,8 @@ class KnightsPaths:
         while True:
             self.time_check()
             ###board.update_display()      # Don't let display block
+            if self.restart_nmove is not None and self.nmove >= self.restart_nmove:
+                self.restart()
             len_stk = len(self.path_stack)
             
             if len_stk == 0:
@@ -159,18 +498,22 @@ class KnightsPaths:
                 self.ncomplete_path += 1             # Count all complete paths
                 self.is_complete_tour = True
                 if self.closed_tours:
-                    start_loc = self.path_stack[0].loc
-                    end_loc = self.path_stack[-1].loc
-                    if board.is_neighbor(start_loc, end_loc):
+                    if self.graph.is_neighbor(self.path_stack[0].sq,
+                                              self.path_stack[-1].sq):
                         self.is_closed_tour = True
+                        self.path_stack[-1].nogood_ok = False   # Ancestors led to a tour
                         return True
                     
                     self.last_complete_path = self.path_stack_path()
+                    if self.repair_path([se.sq for se in self.path_stack]):
+                        self.is_closed_tour = True
+                        self.path_stack[-1].nogood_ok = False   # Ancestors led to a tour
+                        return True
                     
                     if SlTrace.trace("non-closed"):
                         self.display_stack_path("ignoring non-closed tour {} to {}"
-                                                .format(loc2desc(self.path_stack[0].loc),
-                                                        loc2desc(self.path_stack[-1].loc)))
+                                                .format(self.sq2desc(self.path_stack[0].sq),
+                                                        self.sq2desc(self.path_stack[-1].sq)))
                         self.display_stack("non-closed")
                     if self.max_try is not None and self.ntry >= self.max_try:
                         SlTrace.lg(f"Giving up looking for closed tour after {self.ntry:d} tries")
@@ -182,6 +525,7 @@ class KnightsPaths:
                     self.widen_search()
                     continue                        # look again
                 else:
+                    self.path_stack[-1].nogood_ok = False   # Ancestors led to a path
                     return True
         
             ###if self.path_stack is None or len(self.path_stack) == 0:
@@ -211,25 +555,51 @@ class KnightsPaths:
         if self.closed_tours:
             self.prune_not_closed()                
         stke = self.path_stack[-1]
-        next_move = stke.loc
-        board = stke.board
-        best_moves = stke.best_moves
-        SlTrace.lg(f"best_moves = {best_moves}", "stack_build")
-        if best_moves is None:
-            SlTrace.lg(f"best_moves tested is None", "stack_build")
-            best_moves = self.get_best_moves(board, next_move)
-            SlTrace.lg(f"best_moves = {best_moves}", "stack_build")
-            SlTrace.lg(f"len(best_moves)={len(best_moves)}", "stack_build")
-        if len(best_moves) == 0:
-            SlTrace.lg("tested as 0", "stack_build")
+        next_move = stke.sq
+        board = self.stack_board(stke)
+        if not stke.has_moves():
+            forced_moves = self.dead_end_moves(board, next_move)
+            if forced_moves is not None:
+                if forced_moves and self.region_infeasible(board):
+                    forced_moves = ()           # Keep region checked at every node
+                stke.set_moves(forced_moves)    # Dead end or forced move
+            elif (self.nogood_cache is not None
+                    and self.nogood_cache.is_nogood(self.state_key(board, next_move))):
+                stke.set_moves(())              # Failed when reached before
+            elif self.region_infeasible(board):
+                stke.set_moves(())              # Dead end
+            elif self.endgame is not None and board.nempty <= self.endgame_size:
+                if self.play_endgame(board, stke):
+                    return False                # Path complete
+            else:
+                stke.set_moves(self.get_best_moves(board, next_move, frame=stke))
+            stke.look_branches = None           # Done with parent's look ahead
+        if SlTrace.trace("stack_build"):        # Avoid message formatting if not tracing
+            SlTrace.lg(f"best_moves = {self.sqs_desc(stke.best_moves())}")
+        if (self.discrepancy_limit is not None and stke.cursor > 0
+                and stke.ndiscrepancy >= self.discrepancy_limit
+                and stke.cursor < stke.nmoves):
+            stke.nogood_ok = False          # Left for a later pass
+            follow_move = None
+        else:
+            follow_move = stke.next_candidate()
+        if follow_move is None:
+            if (len(self.path_stack) == 1 and self.discrepancy_limit is not None
+                    and not stke.nogood_ok):
+                self.next_lds_pass()
+                return False
+            
             self.ntry += 1
             if SlTrace.trace("no_more_moves"):
                 SlTrace.lg("{:d}: No more moves at {} len_stk={:d}"
-                           .format(self.ntry, loc2desc(next_move), len_stk))
+                           .format(self.ntry, self.sq2desc(next_move), len(self.path_stack)))
             if self.max_try is not None and self.ntry > self.max_try:
                 SlTrace.lg("Giving up this search")
                 return True
             
+            if (self.nogood_cache is not None and stke.nogood_ok
+                    and stke.nmoves > 0):       # Cheaper failures are just redone
+                self.nogood_cache.record(self.state_key(board, next_move))
             if SlTrace.trace("no_more_moves"):
                 self.display_stack_path("no_more_moves")
             if (self.last_complete_path is None
@@ -240,26 +610,212 @@ class KnightsPaths:
                 if SlTrace.trace("back_off_trace"):
                     if self.track_level > 0:
                         stke = self.path_stack[-1]
-                        nxt_move, board, bst_moves = stke.loc, stke.board, stke.best_moves
-                        self.board = board
+                        nxt_move, bst_moves = stke.sq, stke.best_moves()
+                        self.board = self.stack_board(stke)
+                        if bst_moves is None:
+                            bst_moves = []
                         SlTrace.lg("back_off_trace stk_len={:d} start={} at {} best_moves={}"
-                               .format(self.track_level, loc2desc(self.loc_start),
-                                       loc2desc(nxt_move), path_desc(bst_moves)))
+                               .format(self.track_level, self.sq2desc(self.sq_start),
+                                       self.sq2desc(nxt_move), self.sqs_desc(bst_moves)))
                         self.display_stack_path("back_off_trace")
             self.widen_search()
             return False                            # Backup
-        else:
-            SlTrace.lg(f"len(best_moves)={len(best_moves)} failed test for 0", "stack_build")
         
-        follow_move = best_moves.pop(0)
-        stke = self.path_stack[-1]
-        stke.best_moves = best_moves            # Update best moves
-        new_board = ChessBoard(base_board=board)
-        self.make_move(loc=follow_move, board=new_board)
+        look_branches = None
+        if stke.subtrees is not None:
+            look_branches = stke.subtrees.pop(follow_move, None)
+        if self.make_unmake:
+            self.make_move(sq=follow_move)      # Undone by backup_move
+        else:
+            new_board = ChessBoard(base_board=board)
+            self.make_move(sq=follow_move, board=new_board)
+        new_stke = self.path_stack[-1]
+        new_stke.look_branches = look_branches  # Continue parent's look ahead
+        new_stke.ndiscrepancy = stke.ndiscrepancy
+        if stke.cursor > 1:
+            new_stke.ndiscrepancy += 1          # Not the best move
         return False
 
+    def next_lds_pass(self):
+        """ Start next limited discrepancy pass, from the first move,
+        allowing one more discrepancy
+        """
+        self.discrepancy_limit += 1
+        self.nlds_pass += 1
+        self.path_stack[0].reset_moves()
+        if SlTrace.trace("lds"):
+            SlTrace.lg(f"lds pass {self.nlds_pass}: up to {self.discrepancy_limit} discrepancies")
+
+    def play_endgame(self, board, stke):
+        """ Complete path by the endgame solver, if possible
+        Each frame's solution move is made its first candidate, already
+        taken, the other empty neighbors following, unordered, should
+        the search continue past the path.
+        :board: board of top of stack
+        :stke: top of stack entry, without candidates
+        :returns: True if path completed, False if none (stke dead end)
+        """
+        path = self.endgame.solve(~board.occupied & self.graph.full_mask, stke.sq)
+        if path is None:
+            stke.set_moves(())
+            return False
+        
+        stke.look_branches = None
+        frame = stke
+        for nsq in path:
+            frame_board = self.stack_board(frame)
+            others = [sq for sq in frame_board.knight_moves_sq(frame.sq, only_empty=True)
+                      if sq != nsq]
+            frame.set_moves([nsq] + others)
+            frame.next_candidate()
+            if self.make_unmake:
+                self.make_move(sq=nsq)
+            else:
+                self.make_move(sq=nsq, board=ChessBoard(base_board=frame_board))
+            self.path_stack[-1].ndiscrepancy = frame.ndiscrepancy
+            frame = self.path_stack[-1]
+        return True
+
+    def dead_end_moves(self, board, sq):
+        """ Check empty squares with degree (empty neighbors) 0 or 1
+        Such a square can only be the path end, unless entered next from
+        sq, the current square.  Closed tours count the starting square
+        as an exit, and have no ending square in the empty region.
+        :board: board with move to sq in place, tracking degree
+        :sq: current square
+        :returns: None - no restriction (order all moves)
+                    () - dead end, back up
+                    (forced move,) - the move that must be made next
+        """
+        if not self.dead_end_check or board.degree is None:
+            return None
+        
+        low_mask = board.low_mask & ~board.occupied
+        if not low_mask or board.nempty <= 1:
+            return None                 # The usual case
+        
+        degree = board.degree
+        cur_mask = self.graph.neighbor_masks[sq]
+        start_mask = self.candidate_end_mask    # Neighbors of start square
+        nend = 0                # Squares which must be the path end
+        nexts = []              # Squares which must be entered next
+        while low_mask:
+            low_bit = low_mask & -low_mask
+            low_mask ^= low_bit
+            lsq = low_bit.bit_length() - 1
+            nexit = degree[lsq]
+            if self.closed_tours:
+                if start_mask & low_bit:
+                    nexit += 1          # Can close tour from here
+                if nexit >= 2:
+                    continue
+                
+                if cur_mask & low_bit and nexit == 1:
+                    nexts.append(lsq)   # Enter now, else can't pass through
+                    continue
+                
+                return self.dead_end_prune()
+            
+            if cur_mask & low_bit:
+                if nexit == 0:
+                    return self.dead_end_prune()    # Next and last, but more empty
+                
+                nexts.append(lsq)       # Next or path end
+                continue
+            
+            if nexit == 0:
+                return self.dead_end_prune()        # Can't be reached
+            
+            nend += 1                   # Must be path end
+        if self.closed_tours:
+            if len(nexts) > 1:
+                return self.dead_end_prune()
+            
+            if len(nexts) == 1:
+                self.nforced_move += 1
+                return (nexts[0],)
+            
+            return None
+        
+        if nend > 1 or nend + len(nexts) > 2:
+            return self.dead_end_prune()            # Too many ends
+        
+        if nend == 1 and len(nexts) == 1:
+            self.nforced_move += 1
+            return (nexts[0],)                      # Can't be the end
+        
+        return None
+
+    def dead_end_prune(self):
+        """ Count and return dead end
+        :returns: () no moves
+        """
+        self.nprune_dead_end += 1
+        return ()
+
+    def region_infeasible(self, board):
+        """ Check if empty region, after top of stack move, can't be covered
+        :board: board with move in place
+        :returns: True if no path can be completed
+        """
+        if self.region_check is None:
+            return False
+        
+        prev_sq = None
+        if len(self.path_stack) > 1:
+            prev_sq = self.path_stack[-2].sq
+        if self.region_check.is_feasible(board.occupied, self.path_stack[-1].sq,
+                                         prev_sq=prev_sq, start_sq=self.sq_start):
+            return False
+        
+        if SlTrace.trace("region_check"):
+            SlTrace.lg(f"region check prune at {self.sq2desc(self.path_stack[-1].sq)}"
+                       f" len_stk={len(self.path_stack)}")
+        return True
+
+    def stack_board(self, stke):
+        """ Get board for path stack entry
+        :stke: path stack entry
+        :returns: entry's board, the search board if make/unmake
+        """
+        if stke.board is None:
+            return self.board
+        
+        return stke.board
+
+    def state_key(self, board=None, sq=None):
+        """ Current search state key: Zobrist hash of occupied squares
+        and the square of the piece to move
+        Deterministic, for a given zobrist seed, across processes.
+        :board: board default: current (top of stack) board
+        :sq: piece square index default: top of stack move
+        :returns: 64 bit int key
+        """
+        if board is None:
+            board = self.stack_board(self.path_stack[-1])
+        if sq is None:
+            sq = self.path_stack[-1].sq
+        return board.zhash ^ self.zobrist.current_keys[sq]
+
+    def sq2desc(self, sq):
+        """ Algebraic description of square index, for logs and traces
+        """
+        return self.board.loc2desc(self.graph.sq2loc(sq))
+
+    def sqs_desc(self, sqs):
+        """ Description of list of square indexes, for logs and traces
+        """
+        return " ".join([self.sq2desc(sq) for sq in sqs])
+
     def time_check(self):
-        """ Check for timeout
+        """ Check for search timeout
+        """
+        now = datetime.datetime.now()
+        if now > self.search_time_end:
+            raise SelectTimeout
+
+    def repair_time_check(self):
+        """ Check for timeout of rotation repair, at the time limit
         """
         now = datetime.datetime.now()
         if now > self.time_end:
@@ -274,7 +830,7 @@ class KnightsPaths:
         """ Setup for move display
         """
         self.display_board = ChessBoardDisplay(x=600,y=100, width=600, height=600,
-                                               board=self.board,
+                                               nrow=self.nrow, ncol=self.ncol,
                                                move_time=self.move_time)
 
     def prune_not_closed(self):
@@ -301,18 +857,19 @@ class KnightsPaths:
     def has_candidate_moves(self):
         """ Test if any empty candidate end squares for closed tour
         """
-        for loc in self.candidate_end_moves:
-            if self.is_empty(loc):
-                return True      # At least empty candidate
+        if self.candidate_end_mask & ~self.board.occupied:
+            return True      # At least empty candidate
         
         return False
                 
         
-    def make_move(self, piece=None, loc=None, board=None):
+    def make_move(self, piece=None, loc=None, board=None, sq=None):
         """ Make top level (visible) move
         :piece: algebraic move default: 'N'
-        :loc: location /square
+        :loc: location /square, checked
         :board: board default self.board
+        :sq: square index, unchecked, used instead of loc
+                the square must be empty
         """
         self.nmove += 1
         if piece is None:
@@ -320,12 +877,18 @@ class KnightsPaths:
         if board is None:
             board = self.board
         self.board = board                  # Update board
+        if sq is None:
+            loc = board.loc2tuple(loc)
+            if not board.is_empty(loc):
+                raise SelectError(f"make_move: square {board.loc2desc(loc)} is occupied")
+            sq = board.loc2sq(loc)
         if self.path_stack is None:
-            self.path_stack = []
-        self.path_stack.append(PathStackEntry(loc=loc, board=self.board))
+            self.path_stack = PathStack(self.len_ckt)
+        stk_board = None if self.make_unmake else self.board
+        self.path_stack.push(sq=sq, board=stk_board)
         if SlTrace.trace("stack_grow"):
-            SlTrace.lg(f"stk_len:{len(self.path_stack):d} at {loc2desc(loc)}")
-        board.set_piece(piece, loc)
+            SlTrace.lg(f"stk_len:{len(self.path_stack):d} at {self.sq2desc(sq)}")
+        board.set_piece_sq(sq, piece)
         if self.is_display_move:
             self.display_move()
  
@@ -344,8 +907,8 @@ class KnightsPaths:
             piece = "N"
         prev_loc = None
         if  move_no > 1:
-            prev_loc = self.path_stack[-2].loc
-        loc = stke.loc
+            prev_loc = self.graph.sq2loc(self.path_stack[-2].sq)
+        loc = self.graph.sq2loc(stke.sq)
         if not dboard.is_empty(loc):            # Indicate if square occupied
             sq = dboard.get_square(loc)
             dboard.set_empty(loc)                   # HACK to continue TFD
@@ -388,15 +951,14 @@ class KnightsPaths:
         
         stke = self.path_stack[-1]
         dboard = self.display_board
-        loc = stke.loc
+        loc = self.graph.sq2loc(stke.sq)
         connect_tags = []
         if stke.display_info is not None:
             connect_tags = stke.display_info.connect_tags
         sq = dboard.get_square(loc)
         sq.display_clear()
         dboard.clear_display_canvas(connect_tags)
-        ic,ir = loc[0],loc[1]
-        dboard.board.squares[ir][ic] = ""
+        dboard.set_empty(loc)
         dboard.wm.after(int(1000*self.move_time))
         dboard.update_display()
 
@@ -488,33 +1050,75 @@ class KnightsPaths:
             iend = 0                    # Limit to top of stack
         for ient in range(len(self.path_stack)-1, iend-1, -1):
             stkent = self.path_stack[ient] 
-            next_move, board = stkent[0], stkent[1]
-            ktmoves = board.get_knight_moves(next_move)                 # Force new look
-            bestmoves = self.order_moves_by_warnsdorff(ktmoves)        # Force new look
-            txt = "[{:2d}]: {}  {}".format(ient, loc2desc(next_move), path_desc(bestmoves))
+            next_move = stkent.sq
+            bestmoves = stkent.best_moves()     # Remaining moves, as searched
+            if bestmoves is None:
+                bestmoves = []
+            txt = "[{:2d}]: {}  {}".format(ient, self.sq2desc(next_move), self.sqs_desc(bestmoves))
             SlTrace.lg(txt)
         SlTrace.lg()
         if display_board:
             self.display_stack_path(desc)
 
     
-    def get_best_moves(self, board, loc):
-        """ Retrieve an ordered list of best moves for piece at loc
+    def get_best_moves(self, board, sq, frame=None):
+        """ Retrieve an ordered list of best moves for piece at sq
         if max_lookahead == -1 ==> just give all legal knight moves
         :board: chess board
-        :loc: piece location
+        :sq: piece square index
+        :frame: path stack entry of sq, for look ahead branches, if any
+        :returns: list (or cached tuple, not to be modified) of square indexes
         """
         
         if self.max_look_ahead == -1:
-            ktmoves = board.get_knight_moves(loc, only_empty=True)
+            ktmoves = board.knight_moves_sq(sq, only_empty=True)
             return ktmoves
         
-        ktmoves = board.get_knight_moves(loc)
-        best_moves = self.order_moves_by_warnsdorff(board, ktmoves)
+        max_look_ahead = self.max_look_ahead
+        if self.adaptive_look_ahead and max_look_ahead >= 2:
+            max_look_ahead = self.adaptive_look_ahead_depth()
+        cache = self.lookahead_cache
+        if cache is None or self.max_look_ahead < 2:
+            ktmoves = board.knight_moves_sq(sq)
+            best_moves = self.order_moves_by_warnsdorff(board, ktmoves,
+                                                        max_look_ahead=max_look_ahead,
+                                                        frame=frame)
+        else:
+            key = self.state_key(board, sq)
+            if self.adaptive_look_ahead:
+                key = (key, max_look_ahead)     # Deeper looks order differently
+            cached_moves = cache.get(key)
+            if cached_moves is None:
+                ktmoves = board.knight_moves_sq(sq)
+                best_moves = self.order_moves_by_warnsdorff(board, ktmoves,
+                                                            max_look_ahead=max_look_ahead,
+                                                            frame=frame)
+                cache.put(key, tuple(best_moves))
+            else:
+                best_moves = cached_moves
         if SlTrace.trace("best_moves"):
-            SlTrace.lg(f"best_moves(for {loc2desc(loc)}): {path_desc(best_moves)}")
+            SlTrace.lg(f"best_moves(for {self.sq2desc(sq)}): {self.sqs_desc(best_moves)}")
         return best_moves
 
+    def adaptive_look_ahead_depth(self):
+        """ Look ahead depth for the node at the top of the stack
+        Starts at two levels, which are only used if first level scores
+        tie, adding a level each time backups in the node's stack region
+        grow eightfold.
+        :returns: maximum look ahead levels, at most max_look_ahead
+        """
+        nbackup = self.region_nbackup[len(self.path_stack)//self.look_ahead_region]
+        depth = 2 + nbackup.bit_length()//3
+        if depth > self.max_look_ahead:
+            depth = self.max_look_ahead
+        return depth
+
+    def look_ahead_hist_desc(self):
+        """ Description of look ahead levels used: levels:nodes ...
+        """
+        return " ".join([f"{nlevel}:{self.look_ahead_hist[nlevel]}"
+                         for nlevel in sorted(self.look_ahead_hist)])
+
     def get_ncomplete_path(self):
         """ Get number of complete paths found so far
         """
@@ -565,9 +1169,10 @@ class KnightsPaths:
     def path_stack_path(self):
         """ Returns path on stack
         """
+        sq2loc = self.graph.sq2loc
         path = []
         for se in self.path_stack:
-            path.append(se.loc)
+            path.append(sq2loc(se.sq))
         return path
     
                    
@@ -578,7 +1183,19 @@ class KnightsPaths:
         
         :returns: next path, None if none
         """
+        if self.impossible_reason is not None:
+            if SlTrace.trace("feasibility"):
+                SlTrace.lg(f"no search from {self.sq2desc(self.sq_start)}:"
+                           f" {self.impossible_reason}")
+            return None
+        
         try:
+            if self.beam is not None:
+                return self.beam_path()
+            
+            if self.bidir is not None:
+                return self.bidir_path()
+            
             if not self.build_path_stack():
                 return None
             
@@ -590,7 +1207,7 @@ class KnightsPaths:
             if t is None:
                 t = -1
             SlTrace.lg(f"path find timeout({t:.3f} sec)")
-            return None
+            return self.repair_longest_path()
 
         except BaseException:
             SlTrace.lg("path find exception: {traceback.format_exc()}")
@@ -598,73 +1215,323 @@ class KnightsPaths:
 
     
 
-    def order_moves_by_warnsdorff(self, board, moves, max_look_ahead=None):
+    def repair_path(self, path):
+        """ Try completing path by rotation and extension, and place
+        the result on the path stack
+        :path: list of square indexes, from the starting square
+        :returns: True if completed (closed, if closed tours)
+        """
+        if self.posa is None:
+            return False
+        
+        tour = self.posa.repair(path, closed_tours=self.closed_tours,
+                                time_check=self.repair_time_check)
+        if tour is None:
+            return False
+        
+        while len(self.path_stack) > 1:
+            self.backup_move()
+        self.play_path(tour[1:])
+        return True
+
+    def repair_longest_path(self):
+        """ Try completing the longest path seen, after search stopped
+        :returns: path, None if not completed
+        """
+        if self.posa is None:
+            return None
+        
+        path = [se.sq for se in self.path_stack]
+        if (self.last_complete_path is not None
+                and len(self.last_complete_path) > len(path)):
+            loc2sq = self.graph.loc2sq
+            path = [loc2sq(loc) for loc in self.last_complete_path]
+        try:
+            if len(path) == 0 or not self.repair_path(path):
+                return None
+            
+        except SelectTimeout:
+            SlTrace.lg(f"path repair timeout ({self.posa.stats_desc()})")
+            return None
+        
+        
+        SlTrace.lg(f"path repaired by rotation ({self.posa.stats_desc()})")
+        return self.path_stack_path()
+
+    def beam_path(self):
+        """ Get path by beam search, placing it on the path stack
+        Only one path is searched for.  The best partial path
+        is kept as last_complete_path.
+        :returns: path, None if none found
+        """
+        if self.is_searched:
+            return None
+        
+        self.is_searched = True
+        try:
+            path = self.beam.search(self.board.occupied, self.sq_start)
+        finally:
+            self.nmove += self.beam.nnode
+            best_path = self.beam.best_path()
+            if best_path is not None:
+                sq2loc = self.graph.sq2loc
+                self.last_complete_path = [sq2loc(sq) for sq in best_path]
+        if path is None:
+            return None
+        
+        return self.play_path(path)
+
+    def bidir_path(self):
+        """ Get closed tour by bidirectional search, placing it on the path stack
+        Only one tour is searched for.
+        :returns: path, None if none found
+        """
+        if self.is_searched:
+            return None
+        
+        self.is_searched = True
+        try:
+            path = self.bidir.search(self.sq_start)
+        finally:
+            self.nmove += self.bidir.nnode
+        if path is None:
+            return None
+        
+        return self.play_path(path[1:])
+
+    def play_path(self, path):
+        """ Make a found path's moves, after the start, on the path stack
+        :path: list of square indexes, completing the board
+        :returns: path, as locations
+        """
+        for sq in path:
+            if self.make_unmake:
+                self.make_move(sq=sq)
+            else:
+                self.make_move(sq=sq, board=ChessBoard(base_board=self.board))
+        self.ncomplete_path += 1
+        self.is_complete_tour = True
+        self.is_closed_tour = self.closed_tours
+        return self.path_stack_path()
+
+    def order_moves_by_warnsdorff(self, board, moves, max_look_ahead=None,
+                                  frame=None):
         """ Order moves by Warnsdorff algorithm (minimum neighbors)
+        Each move gets a vector of per level scores (see score_vectors),
+        ordered by one lexicographic sort.
         :board: current board
-        :moves: Candidate list of moves
+        :moves: Candidate list of moves (square indexes)
         :max_look_ahead: maximum level look ahead to break ties
-                        default: 5
+                        default: self.max_look_ahead
+        :frame: path stack entry of the moving piece, for look ahead branches
+                default: None - branches are not kept
         :returns: list in decreasing order of preference
         """
-            
-        if len(moves) <= 1:
-            return moves[:]
-
         if max_look_ahead is None:
-            max_look_ahead = self.max_look_ahead        
-        sorted_move_tuples1 = self.order_moves_by_warnsdorff_1(board, moves)
-        if not self.check_order(sorted_move_tuples1):
-            SlTrace.lg("Re-sorting warnsdorff_1")
-            self.list_tuples(sorted_move_tuples1, desc="to")
-            sorted_move_tuples1 = self.sorted_tuples(sorted_move_tuples1)
-            self.list_tuples(sorted_move_tuples1, desc="to")
-        if max_look_ahead < 2:
-            sorted_moves1 = self.moves_from_sorted(sorted_move_tuples1)
-            return sorted_moves1
-        if SlTrace.trace("track_refine"):
-            self.list_tuples(sorted_move_tuples1, desc="before refine")
-        sorted_move_tuples = self.order_warn_refine(board, sorted_move_tuples1,
-                                                max_look_ahead=max_look_ahead)
+            max_look_ahead = self.max_look_ahead
+        nlevel = max_look_ahead if max_look_ahead >= 2 else 1
+        scored = self.score_vectors(board, moves, nlevel, frame=frame)
+        scored.sort(key=by_first)
+        if self.rng is not None:
+            self.shuffle_ties(scored)
+        if len(scored) > 0:
+            nused = max([len(smv[0]) for smv in scored])
+            self.look_ahead_hist[nused] = self.look_ahead_hist.get(nused, 0) + 1
+        if nlevel >= 2:
+            self.track_ties(scored)
         if SlTrace.trace("track_refine"):
-            self.list_tuples(sorted_move_tuples, "after refine")
-        if not self.check_order(sorted_move_tuples):
-            SlTrace.lg("Re-sorting")
-            sorted_move_tuples2 = self.sorted_tuples(sorted_move_tuples)
-            self.list_tuples(sorted_move_tuples2, desc="to")
-            if not self.check_order(sorted_move_tuples2):
-                SlTrace.lg("Still not sorted")
-            else:
-                SlTrace.lg("sorted")
-                sorted_move_tuples = sorted_move_tuples2
-        self.track_ties(sorted_move_tuples)
-        sorted_moves = self.moves_from_sorted(sorted_move_tuples)
-        return sorted_moves
+            self.list_tuples(scored, desc="score vectors")
+        return self.moves_from_sorted(scored)
+
+
+    def score_vectors(self, board, moves, nlevel, frame=None):
+        """ Score empty candidate moves by Warnsdorff levels, in one pass
+        Level k score is the number of k move walks from the candidate
+        over empty squares, with the candidate occupied: level 1 is the
+        candidate's empty neighbor count, level 2 the sum of those
+        neighbors' counts, ...  Levels are only added to a candidate
+        while it ties another on all levels so far.
+        With carry_look_ahead, a candidate's walks are counted by first
+        step, in branches (see branch_extend), kept in frame.subtrees.
+        Once the candidate is made, its node scores its own candidates
+        from these branches (see branch_level), only extending them.
+        :board: current board
+        :moves: Candidate list of moves (square indexes)
+        :nlevel: maximum number of levels
+        :frame: path stack entry of the moving piece, whose look_branches
+                are used and whose subtrees receive the candidates' branches
+                default: None - branches are not kept
+        :returns: unsorted list of (score vector tuple, move)
+        """
+        occupied = board.occupied
+        cands = []
+        for sq in moves:
+            if not (occupied >> sq) & 1:
+                cands.append(sq)           # Don't consider non-empty squares
+        if len(cands) == 0:
+            return []
+        
+        neighbors = board.graph.neighbors
+        degree = board.degree
+        deg2_map = None
+        if hasattr(board, "degree_maps"):
+            deg_map, deg2_map = board.degree_maps()  # Flat index is square index
+            vectors = [[deg_map.item(sq)] for sq in cands]
+        elif degree is not None:
+            vectors = [[degree[sq]] for sq in cands]
+        else:
+            vectors = [[board.empty_degree_sq(sq)] for sq in cands]
+        
+        carried = None                      # Branches from parent, by candidate
+        subtrees = None                     # Candidates' branches, by candidate
+        if frame is not None and self.carry_look_ahead:
+            carried = frame.look_branches
+            subtrees = frame.subtrees
+            if subtrees is None:
+                subtrees = frame.subtrees = {}
+        tied = list(range(len(cands)))      # Indexes of candidates still tied
+        frontiers = {}                      # walk counts by end square, by index
+        level = 1
+        while level < nlevel and len(tied) > 1:
+            counts = {}
+            for i in tied:
+                key = tuple(vectors[i])
+                counts[key] = counts.get(key, 0) + 1
+            tied = [i for i in tied if counts[tuple(vectors[i])] > 1]
+            for i in tied:
+                sq = cands[i]
+                vec = vectors[i]
+                if level == 1 and deg2_map is not None:
+                    # Follow-ons lose the candidate as a neighbor, once made
+                    vec.append(deg2_map.item(sq) - vec[0])
+                    continue
+                
+                if level == 1 and degree is not None:
+                    nsum = 0
+                    for nsq in neighbors[sq]:
+                        if not (occupied >> nsq) & 1:
+                            nsum += degree[nsq] - 1
+                    vec.append(nsum)
+                    continue
+                
+                if carried is not None and sq in carried:
+                    vec.append(self.branch_level(carried[sq], level+1,
+                                                 occupied, neighbors))
+                    self.nlook_carried += 1
+                    continue
+                
+                occ = occupied | (1 << sq)          # Look with candidate in place
+                if subtrees is not None:
+                    branches = subtrees.get(sq)
+                    if branches is None:
+                        branches = {}
+                        for nsq in neighbors[sq]:
+                            if not (occ >> nsq) & 1:
+                                branches[nsq] = [nsq, [1], [1], {nsq:1}]
+                        subtrees[sq] = branches
+                        self.nlook_branch += len(branches)
+                    nsum = 0
+                    for branch in branches.values():
+                        self.branch_extend(branch, level, occ, neighbors)
+                        nsum += branch[1][level]
+                    vec.append(nsum)
+                    continue
+                
+                nwalk, frontier = frontiers.get(i, (0, {sq:1}))
+                while nwalk <= level:
+                    next_frontier = {}
+                    for wsq, nw in frontier.items():
+                        for nsq in neighbors[wsq]:
+                            if not (occ >> nsq) & 1:
+                                next_frontier[nsq] = next_frontier.get(nsq, 0) + nw
+                    frontier = next_frontier
+                    nwalk += 1
+                frontiers[i] = (nwalk, frontier)
+                vec.append(sum(frontier.values()))
+            level += 1
+        
+        return [(tuple(vectors[i]), cands[i]) for i in range(len(cands))]
+
+
+    def branch_extend(self, branch, length, occupied, neighbors):
+        """ Extend look ahead branch walks to length
+        :branch: [first step square, walks by length,
+                    walks back at first step by length,
+                    walk counts by end square, for the longest walks]
+        :length: walk length
+        :occupied: occupancy the walks avoid, not including first step
+        :neighbors: knight graph neighbors
+        """
+        first_sq, nwalks, nbacks, frontier = branch
+        if len(nwalks) > length:
+            return                          # Already long enough
+        
+        while len(nwalks) <= length:
+            next_frontier = {}
+            for wsq, nw in frontier.items():
+                for nsq in neighbors[wsq]:
+                    if not (occupied >> nsq) & 1:
+                        next_frontier[nsq] = next_frontier.get(nsq, 0) + nw
+            frontier = next_frontier
+            nwalks.append(sum(frontier.values()))
+            nbacks.append(frontier.get(first_sq, 0))
+        branch[3] = frontier
+
+
+    def branch_level(self, branch, level, occupied, neighbors):
+        """ Score level of a branch's first step, as a candidate
+        The number of level long walks from the first step, which never
+        return to it: all walks less those by first return time.
+        :branch: look ahead branch, see branch_extend
+        :level: score level (walk length)
+        :occupied: occupancy, not including first step
+        :neighbors: knight graph neighbors
+        :returns: level score
+        """
+        self.branch_extend(branch, level, occupied, neighbors)
+        nwalks, nbacks = branch[1], branch[2]
+        nfirst_backs = [0]                  # Walks first back at first step, by length
+        for j in range(1, level+1):
+            nfb = nbacks[j]
+            for i in range(1, j):
+                nfb -= nfirst_backs[i]*nbacks[j-i]
+            nfirst_backs.append(nfb)
+        nlevel = nwalks[level]
+        for j in range(1, level+1):
+            nlevel -= nfirst_backs[j]*nwalks[level-j]
+        return nlevel
+
+
+    def shuffle_ties(self, sorted_move_tuples):
+        """ Randomly reorder each run of equally scored moves, in place
+        :sorted_move_tuples: sorted list of tuples: (score, move)
+        """
+        rng = self.rng
+        n = len(sorted_move_tuples)
+        i = 0
+        while i < n:
+            score = sorted_move_tuples[i][0]
+            j = i + 1
+            while j < n and sorted_move_tuples[j][0] == score:
+                j += 1
+            if j - i > 1:
+                run = sorted_move_tuples[i:j]
+                rng.shuffle(run)
+                sorted_move_tuples[i:j] = run
+            i = j
 
     def track_ties(self, sorted_move_tuples):
         """ Keep statistics on number of ties in final best_moves list
-        :sorted_move_tuples: tuple: (len(score), move, next_moves)
-        :returns: number of ties
+        :sorted_move_tuples: sorted list of tuples: (score, move)
+        :returns: number of ties - moves scored the same as the move before
         """
-        scoreh = {}
+        nties = 0
+        prev_score = None
         for move_tuple in sorted_move_tuples:
             score = move_tuple[0]
-            if score not in scoreh:
-                scoreh[score] = 1
-            else:
-                scoreh[score] += 1
-        tieh = {}                   # number of n-way ties
-        nties = 0                   # Any duplication
-        for score in scoreh:
-            ntie = scoreh[score]
-            if ntie < 2:
-                continue
-            if ntie not in tieh:
-                tieh[ntie] = 1
-            else:
-                tieh[ntie] += 1
-                tieh[ntie] += 1
-        for tie in tieh:
-            nties += tieh[tie]-1        # Add the extra past no-tie
+            if score == prev_score:
+                nties += 1
+            prev_score = score
         self.ntrack_ntie += 1
         self.ntie += nties
         return nties
@@ -676,136 +1543,12 @@ class KnightsPaths:
             if end is None:
                 end = " "
         for tup in tuples:
-            SlTrace.lg("    {} len:{:d}".format(loc2desc(tup[1]), tup[0]))
+            SlTrace.lg("    {} score:{}".format(self.sq2desc(tup[1]), tup[0]))
         if end is not None:
             if end.startswith("-"):
                 end = end*25
             SlTrace.lg(end)
 
-    def sorted_tuples(self, move_tuples):
-        """ Sort move tuples (len, move, follow_ons) by increasing len
-        where len: len_str1 [" " len_str2 " " len_str3 ... ]
-        :move_tuples: list of tuples
-        """
-        aug_tuples = []
-        for move_tuple in move_tuples:
-            aug_tuples.append((move_tuple[0], move_tuple))
-        sorted_aug_tuples = sorted(aug_tuples, key=by_first)
-        sorted_move_tuples = []
-        for aug_tuple in sorted_aug_tuples:
-            sorted_move_tuples.append(aug_tuple[1])
-        return sorted_move_tuples
-
-    def check_order(self, sorted_move_tuples):
-        if len(sorted_move_tuples) < 2:
-            return True
-                    
-        in_order = True
-        prev_tuple = None
-        out_of_order_tuple = None
-        next_tuple = None           # one after out of order
-        prev_len = None 
-        for move_tuple in sorted_move_tuples:
-            if prev_tuple is not None:
-                prev_len = prev_tuple[0]
-            list_len = move_tuple[0]
-            if prev_len is not None and prev_len > list_len:       # >= to catch ties
-                in_order = False
-                out_of_order_tuple = prev_tuple
-                next_tuple = move_tuple
-                if list_len == 0:
-                    SlTrace.lg("order len == 0")
-                    ### TBDself.draw(desc="order len== 0")
-                break
-            prev_tuple = move_tuple
-
-        if not in_order:
-            if prev_len == list_len:
-                SlTrace.lg(f"\nnot strictly ordered tuples: {sorted_move_tuples}")
-                return True
-            
-            if prev_len > list_len:
-                for move_tuple in sorted_move_tuples:
-                    SlTrace.lg(f"    {move_tuple[1]} len:{move_tuple[0]:d}")
-                desc = "???"
-                if out_of_order_tuple is not None:
-                    oo_move = out_of_order_tuple[1]
-                    oo_len = out_of_order_tuple[0]
-                    nx_move = next_tuple[1]
-                    nx_len = next_tuple[0]
-                    desc = (f" {oo_move}({oo_len})"
-                            + f" > {nx_move}({nx_len})")
-                SlTrace.lg(f"out of order - {desc}")
-                for move_tuple in sorted_move_tuples:
-                    SlTrace.lg("    {} len:{:d}".format(loc2desc(move_tuple[1]), move_tuple[0]))
-                SlTrace.lg("-"*50)
-            return False
-        
-        return True
-    
-    
-    
-    def order_warn_refine(self, board,  move_tuples, max_look_ahead=None):
-        """ Refine move_tuples list by successively applying warnsdoff conjecture
-        on subgroups with ties in score (number of follow ons).  No checks for
-        collisions with already played levels
-        :board: current board
-        :move_tuples: list of (len, move, followon_list)
-        :max_look_ahead: number of levels of look ahead default: 5
-        :returns: list of further ordered tuples
-        """
-        if max_look_ahead is None:
-            max_look_ahead = self.max_look_ahead
-        for _ in range(max_look_ahead):
-            sorted_lists = self.split_by_first(move_tuples)
-            if len(sorted_lists) == len(move_tuples):
-                return move_tuples          # No ties - list is good
-
-            sorted_tuples = []
-            for sub_list in sorted_lists:
-                if len(sub_list) == 1:
-                    sole_tuple = sub_list[0]
-                    if len(sorted_tuples) > 0:
-                        offset = sorted_tuples[-1][0] + 1    # make one greater than highest len code
-                    else:
-                        offset = 1 
-                    next_entry = (offset, sole_tuple[1], sole_tuple[2])
-                    sorted_tuples.append(next_entry)    # No need for further ordering
-                    continue
-                
-                sorted_tuples1 = self.order_moves_by_warnsdorff_tuples(board, sub_list)
-                for mtuple in sorted_tuples1:
-                    if len(sorted_tuples) > 0:
-                        offset = sorted_tuples[-1][0] + mtuple[0]    # start at highest previous code
-                    else:
-                        offset = mtuple[0]+1 
-                    next_entry = (offset, mtuple[1], mtuple[2])
-                    sorted_tuples.append(next_entry)    # No need for further ordering
-        return sorted_tuples                # Return best so far
-    
-    
-    def order_warn_refine_1(self, board,  move_tuples):
-        """ Refine move_tuples list one level
-        No checks for
-        collisions with already played levels
-        :board: current board
-        :move_tuples: list of (len, move, followon_list)
-        :returns: list of further ordered tuples
-        """
-        sorted_lists = self.split_by_first(move_tuples)
-        if len(sorted_lists) == len(move_tuples):
-            return move_tuples          # No ties - list is good
-        
-        sorted_tuples = []
-        for sub_list in sorted_lists:
-            if len(sub_list) == 1:
-                sorted_tuples.append(sub_list[0])    # No need for further ordering
-                continue
-            
-            sorted_tuples1 = self.order_moves_by_warnsdorff_tuples(board, sub_list)
-            sorted_tuples.extend(sorted_tuples1)     # Add sorted list
-        return sorted_tuples
-
 
     def moves_from_sorted(self, sorted_move_tuples):
         """ Retrieve moves from list of move tuples
@@ -815,85 +1558,6 @@ class KnightsPaths:
         for smv in sorted_move_tuples:
             mvs.append(smv[1])
         return mvs
-    
-
-    def order_moves_by_warnsdorff_1(self, board, moves):
-        """ Order moves by Warnsdorff algorithm (minimum neighbors) one level
-        :board: current board
-        :moves: Candidate list of moves
-        :returns: list with moves of decreasing number of follow-on moves
-                    of 3-tuples (number-of follow-on moves,
-                                 move,
-                                 list of this move's follow-on
-                                 )
-        """
-        if len(moves) == 0:
-            return []
-        
-        ###if len(moves) == 1:
-        ###    return [(0, moves[0], [])]
-        
-        mv_by_nms = []
-        for move in moves:
-            if not board.is_empty(move):
-                continue                    # Don't consider non-empty squares
-            
-            nms = board.get_knight_moves(move)
-            ncs = []
-            for mv in nms:
-                if board.is_empty(mv):
-                    ncs.append(mv)
-            mv_by_nms.append((len(ncs), move, ncs))
-        
-        smv_by_nms_sorted = sorted(mv_by_nms, key=by_first)
-        return smv_by_nms_sorted
-    
-
-    def order_moves_by_warnsdorff_tuples(self, board, move_tuples):
-        """ Order moves by Warnsdorff algorithm (minimum neighbors) one level
-        :board: current board
-        :move_tuples: sorted list of 3-tuples
-                        (number-of follow-on moves,
-                        move,
-                        list of this move's follow-on
-                        )
-        :returns: list with moves of decreasing number of follow-on's folow-on moves
-                    of 3-tuples (number-of follow-on folow-on's moves,
-                                 move,
-                                 list of this move's follow-on's follow-ons
-                                 )
-        """
-        ffon_tuples = []    # list of (follow-on's follow-on cnt, move, ffon_list)
-        for move_tuple in move_tuples:
-            follow_ons = move_tuple[2]
-            follow_board = ChessBoard(board)
-            follow_board.set_piece('N', move_tuple[1])
-            follow_on_tuples = self.order_moves_by_warnsdorff_1(follow_board, follow_ons)
-            ffon_moves = []
-            for follow_on_tuple in follow_on_tuples:
-                ffon_moves.extend(follow_on_tuple[2])
-            ffon_tuples.append((len(ffon_moves), move_tuple[1], ffon_moves))    
-        
-        ffon_tuples_sorted = sorted(ffon_tuples, key=by_first)
-        return ffon_tuples_sorted
-
-
-    def split_by_first(self, sorted_list):
-        """ Split sorted list into lists, of identical first element
-        :sorted_list: list of tuples sorted by first element
-        :returns: list of list of tuples grouped by identical first element
-        """
-        list_lists = [] # list of lists
-        first_val = None    # track first value
-        for entry in sorted_list:
-            if first_val is None or entry[0] != first_val:
-                first_val = entry[0]
-                group = []     # Start new group
-                list_lists.append(group)
-            group.append(entry)
-        return list_lists        
-
-
 
 
     def track_path(self, desc, square, path, trace_flag=None):
@@ -939,23 +1603,42 @@ class KnightsPaths:
         if SlTrace.trace("backup_move"):
             if len(self.path_stack) > 0:
                 st = self.path_stack[-1]
-                SlTrace.lg(f"backup_move {len(self.path_stack)} {loc2desc(st.loc)} ")
+                SlTrace.lg(f"backup_move {len(self.path_stack)} {self.sq2desc(st.sq)} ")
         if len(self.path_stack) > 1:        # Don't allow backingup before first move
             if self.is_display_move:
                 self.undisplay_move()       # Update display before move removal
             ste = self.path_stack[-1]
-            board = ste.board
-            loc = ste.loc
-            board.clear_loc(loc)
+            board = self.stack_board(ste)
+            sq = ste.sq
+            board.clear_sq(sq)
+            self.region_nbackup[len(self.path_stack)//self.look_ahead_region] += 1
+            if not ste.nogood_ok:
+                self.path_stack[-2].nogood_ok = False   # Parent's search is not a proof
             if keep_move:
                 if len(self.path_stack) > 1:
-                    self.path_stack[-2].best_moves.insert(0, loc)
+                    self.path_stack[-2].unget_candidate()   # sq is parent's last taken
                 else:
                     self.nbackup += 1
-            del self.path_stack[-1]
+            self.path_stack.pop()
         if self.is_display_move and keep_move:
             SlTrace.lg("after backup_move")
 
+    def restart(self):
+        """ Restart search from the first move, with the next move budget
+        Cached move orders are dropped, so ties get a new random order.
+        Failed positions (nogood and endgame caches) stay failed.
+        """
+        self.nrestart += 1
+        self.path_stack[-1].nogood_ok = False   # Search is cut short
+        while len(self.path_stack) > 1:
+            self.backup_move()
+        self.path_stack[0].reset_moves()
+        if self.lookahead_cache is not None:
+            self.lookahead_cache.clear()
+        self.restart_nmove = self.nmove + self.restart_schedule.next_limit()
+        if SlTrace.trace("restart"):
+            SlTrace.lg(f"restart {self.nrestart}: next after {self.restart_nmove} moves")
+
     def widen_search(self):
         """ Do a little "breath-first" by looking at a new choice at top
         of stack
@@ -965,6 +1648,7 @@ class KnightsPaths:
             return
         
         SlTrace.lg("widen search")
+        self.path_stack[-1].nogood_ok = False   # Remaining moves are skipped
         while len(self.path_stack) > self.widen_level:
             self.backup_move()
         self.nbackup = 0
@@ -973,3 +1657,86 @@ class KnightsPaths:
         
     def update_display(self):
         self.display_board.update_display()
+
+
+class FoundPaths:
+    """ Path found other than by KnightsPaths search - constructed,
+    greedy or raced in other processes - with the parts of the
+    KnightsPaths interface used by PathsGen
+    Subclasses give find_path and stats_desc.
+    """
+    def __init__(self, loc, len_ckt, closed_tours=False):
+        """ Setup
+        :loc: starting (ic, ir) location
+        :len_ckt: number of board squares
+        :closed_tours: True - closed tours requested
+        """
+        self.loc = loc
+        self.len_ckt = len_ckt
+        self.closed_tours = closed_tours
+        self.is_searched = False
+        self.nmove = 0
+        self.track_level = len_ckt
+        self.ncomplete_path = 0
+        self.ntrack_ntie = 0
+        self.ntie = 0
+        self.nprune_closed = 0
+        self.look_ahead_hist = {}
+        self.impossible_reason = None
+        self.last_complete_path = None
+        self.is_complete_tour = False
+        self.is_closed_tour = False
+        self.is_change_tour = False
+        self.is_stop_gen = False
+
+    def find_path(self):
+        """ Find path, setting nmove and any other statistics
+        :returns: list of (ic, ir) locations, None if not found
+        """
+        raise SelectError(f"{type(self).__name__}: find_path not implemented")
+
+    def next_path(self):
+        """ Get path, the first time
+        :returns: path, None if not found or already given
+        """
+        if self.is_searched:
+            return None
+
+        self.is_searched = True
+        path = self.find_path()
+        if path is None:
+            return None
+
+        if self.ncomplete_path == 0:
+            self.ncomplete_path = 1
+        self.last_complete_path = path
+        self.is_complete_tour = True
+        self.is_closed_tour = self.is_neighbor(path[0], path[-1])
+        return path
+
+    def get_nmove(self):
+        return self.nmove
+
+    def get_track_level(self):
+        return self.track_level
+
+    def get_ncomplete_path(self):
+        return self.ncomplete_path
+
+    def look_ahead_hist_desc(self):
+        return ""
+
+    def is_neighbor(self, loc, loc2):
+        """ Check if one move away
+        """
+        dc, dr = abs(loc[0]-loc2[0]), abs(loc[1]-loc2[1])
+        return (dc, dr) in ((1,2), (2,1))
+
+    def backup_move(self, keep_move=False):
+        pass                        # No search to step through
+
+    def next_move(self):
+        pass
+
+    def destroy(self):
+        pass
@@ -0,0 +1,18 @@
+# lookahead_cache.py
+"""
+Bounded cache of look-ahead move orderings
+Backtracking revisits the same board positions, through different
+move orders, and each visit would otherwise repeat the full look-ahead.
+"""
+from lru_cache import LruCache
+
+class LookaheadCache(LruCache):
+    """ Least recently used (LRU) cache of move orderings
+    keyed by position e.g. (board occupancy, current square)
+    """
+    def __init__(self, max_size=100000):
+        """ Setup cache
+        :max_size: maximum number of entries, least recently used
+                    entries are evicted beyond this default: 100000
+        """
+        super().__init__(max_size=max_size)
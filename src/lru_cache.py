@@ -0,0 +1,85 @@
+# lru_cache.py
+"""
+Bounded least recently used (LRU) cache
+Base of the search caches (LookaheadCache, NogoodCache): entries are
+kept in use order, in an OrderedDict, and the least recently used
+entry is evicted when a new one would exceed the size limit.
+"""
+from collections import OrderedDict
+
+from select_error import SelectError
+
+class LruCache:
+    """ Least recently used (LRU) cache, with lookup statistics
+    """
+    def __init__(self, max_size=100000):
+        """ Setup cache
+        :max_size: maximum number of entries, least recently used
+                    entries are evicted beyond this default: 100000
+        """
+        if max_size < 1:
+            raise SelectError(f"{type(self).__name__}: max_size({max_size}) must be positive")
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.nlookup = 0            # Number of lookups
+        self.nhit = 0               # Number of lookups found
+        self.nstore = 0             # Number of entries stored
+        self.nevict = 0             # Number of entries evicted
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def get(self, key):
+        """ Look up entry, marking it as recently used
+        :key: entry key
+        :returns: stored value, None if not present
+        """
+        self.nlookup += 1
+        value = self.entries.get(key)
+        if value is None:
+            return None
+
+        self.nhit += 1
+        self.entries.move_to_end(key)
+        return value
+
+
+    def put(self, key, value):
+        """ Store entry, evicting least recently used entry if full
+        :key: entry key
+        :value: value to store (not None)
+        """
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+        else:
+            if len(entries) >= self.max_size:
+                entries.popitem(last=False)
+                self.nevict += 1
+            self.nstore += 1
+        entries[key] = value
+
+
+    def clear(self):
+        """ Remove all entries, keeping counts
+        """
+        self.entries.clear()
+
+
+    def hit_rate(self):
+        """ Fraction of lookups found
+        """
+        if self.nlookup == 0:
+            return 0.
+
+        return self.nhit/self.nlookup
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"lookups={self.nlookup} hits={self.nhit}"
+                f" hit_rate={self.hit_rate():.3f} evictions={self.nevict}"
+                f" size={len(self.entries)}/{self.max_size}")
@@ -0,0 +1,54 @@
+# nogood_cache.py
+"""
+Bounded cache of search states proven to lead to no path (nogoods)
+Backtracking reaches the same position (occupied squares plus current
+square) through different move orders; once one visit has exhausted
+the position's moves, later visits can back up at once.
+"""
+import sys
+
+from lru_cache import LruCache
+
+class NogoodCache(LruCache):
+    """ Least recently used (LRU) set of failed state keys
+    e.g. KnightsPaths.state_key() Zobrist hashes
+    """
+    def __init__(self, max_size=200000):
+        """ Setup cache
+        :max_size: maximum number of states, least recently used
+                    states are dropped beyond this default: 200000
+        """
+        super().__init__(max_size=max_size)
+
+
+    def is_nogood(self, key):
+        """ Check if state is a recorded failure, marking it as recently used
+        :key: state key
+        :returns: True if recorded
+        """
+        return self.get(key) is not None
+
+
+    def record(self, key):
+        """ Record state as failed, dropping least recently used if full
+        :key: state key
+        """
+        self.put(key, True)
+
+
+    def memory_bytes(self):
+        """ Approximate memory used, in bytes
+        """
+        nkey_bytes = 0
+        if len(self.entries) > 0:
+            nkey_bytes = len(self.entries)*sys.getsizeof(next(iter(self.entries)))
+        return sys.getsizeof(self.entries) + nkey_bytes
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"lookups={self.nlookup} hits={self.nhit}"
+                f" recorded={self.nstore} evictions={self.nevict}"
+                f" size={len(self.entries)}/{self.max_size}"
+                f" memory={self.memory_bytes()/1e6:.1f}MB")
@@ -4,6 +4,7 @@ Generate a list of paths
 """
 
 from datetime import datetime
+import random
 
 
 from select_trace import SlTrace
@@ -14,10 +15,17 @@ from chess_board_display import ChessBoardDisplay
 from knights_paths import KnightsPaths
 from displayed_path import DisplayedPath
 from chess_tour_validation import ChessTourValidation
+from tour_feasibility import TourFeasibility
+from tiling_tours import TilingTour, TilingPaths
+from knight_graph import KnightGraph
+from greedy_tour import GreedyTour, GreedyPaths
+from portfolio_solver import PortfolioSolver, PortfolioPaths
 
 class PathsGen:
     """ Generate and manipulate a list of paths
     """
+    max_path_desc = 1000        # Maximum squares of a path logged
+    
     def __init__(self, path_starts=None, arrange=None,
                  time_out=None,
                  closed_tours=None,
@@ -28,7 +36,32 @@ class PathsGen:
                  height=400,
                  nrow = 8,
                  ncol = 8,
-                 max_look_ahead=5):
+                 max_look_ahead=5,
+                 adaptive_look_ahead=False,
+                 carry_look_ahead=False,
+                 region_check=True,
+                 articulation_interval=256,
+                 dead_end_check=True,
+                 make_unmake=True,
+                 lookahead_cache_size=100000,
+                 nogood_cache_size=200000,
+                 feasibility_check=True,
+                 endgame_size=0,
+                 endgame_memo_size=500000,
+                 randomize_ties=False,
+                 random_seed=None,
+                 restart_schedule=None,
+                 restart_base=None,
+                 restart_factor=1.5,
+                 search_mode="dfs",
+                 beam_width=64,
+                 posa_repair=True,
+                 construct_tours=False,
+                 greedy_attempts=8,
+                 portfolio=False,
+                 portfolio_workers=0,
+                 board_backend="bitmask",
+                 zobrist_seed=None):
         self.display_move = display_move
         self.pW = pW
         self.move_time = move_time
@@ -44,6 +77,40 @@ class PathsGen:
         self.path_starts = path_starts
         self.closed_tours = closed_tours
         self.max_look_ahead = max_look_ahead
+        self.adaptive_look_ahead = adaptive_look_ahead
+        self.carry_look_ahead = carry_look_ahead
+        self.region_check = region_check
+        self.articulation_interval = articulation_interval
+        self.dead_end_check = dead_end_check
+        self.make_unmake = make_unmake
+        self.lookahead_cache_size = lookahead_cache_size
+        self.nogood_cache_size = nogood_cache_size
+        self.feasibility_check = feasibility_check
+        self.endgame_size = endgame_size
+        self.endgame_memo_size = endgame_memo_size
+        if restart_schedule == "none":
+            restart_schedule = None
+        self.randomize_ties = randomize_ties or restart_schedule is not None
+        if self.randomize_ties and random_seed is None:
+            random_seed = random.SystemRandom().getrandbits(32)     # Shared by all starts
+        self.random_seed = random_seed
+        self.restart_schedule = restart_schedule
+        self.restart_base = restart_base
+        self.restart_factor = restart_factor
+        self.search_mode = search_mode
+        self.beam_width = beam_width
+        self.posa_repair = posa_repair
+        self.construct_tours = construct_tours
+        self.tiling = None          # TilingTour, if constructing tours
+        if display_move:
+            greedy_attempts = 0         # Show the search moves
+        self.greedy_attempts = greedy_attempts
+        self.greedy = None          # GreedyTour, if trying greedy passes first
+        self.portfolio = portfolio and not display_move
+        self.portfolio_workers = portfolio_workers
+        self.portfolio_solver = None    # PortfolioSolver, if racing strategies
+        self.board_backend = board_backend
+        self.zobrist_seed = zobrist_seed
         self.arrange = arrange
         self.sqno = 0        # number within list
         self.displayed_paths = []   # Repository of displayed paths
@@ -79,6 +146,8 @@ class PathsGen:
         n_having_complete_path = 0
         n_with_no_complete_path = 0
         n_with_multiple_complete_paths = 0
+        n_impossible = 0            # Starting squares ruled out without search
+        n_greedy = 0                # Starting squares solved by greedy passes
         longest_path = []
         longest_path_start = None
         n_closed_tour = 0
@@ -87,6 +156,14 @@ class PathsGen:
         self.is_stop_gen = False       # Set to stop generation
         success_comp_stats = ResultCompStats()
         fail_comp_stats = ResultCompStats()    
+        if self.feasibility_check:
+            reason = TourFeasibility.impossible_reason(self.nrow, self.ncol,
+                                                       closed_tours=self.closed_tours)
+            if reason is not None:
+                SlTrace.lg(f"No search needed: {reason}")
+        if self.randomize_ties:
+            SlTrace.lg(f"Random tie order seed: {self.random_seed}"
+                       f" (random_seed={self.random_seed} repeats run)")
         while True:
             if self.ipstart >= len(self.path_starts):
                 break
@@ -97,16 +174,38 @@ class PathsGen:
             SlTrace.lg(f"{self.sqno:2d}: {cb.loc2desc(loc)}", dp=3)
             if self.kpths is not None:
                 self.kpths.destroy()
-            self.kpths = kpths = KnightsPaths(loc=loc, closed_tours=self.closed_tours,
-                                 display_move=self.display_move,
-                                 pW=self.pW,
-                                 move_time = self.move_time,
-                                 time_limit=self.time_out,
-                                 nrow=self.nrow, ncol=self.ncol,
-                                 max_look_ahead=self.max_look_ahead)
+            is_ruled_out = (self.feasibility_check
+                            and TourFeasibility.impossible_reason(self.nrow, self.ncol,
+                                        closed_tours=self.closed_tours,
+                                        loc=cb.loc2tuple(loc)) is not None)
+            if self.construct_tours and TilingTour.is_supported(self.nrow, self.ncol):
+                if self.tiling is None:
+                    self.tiling = TilingTour(nrow=self.nrow, ncol=self.ncol)
+                self.kpths = kpths = TilingPaths(self.tiling, cb.loc2tuple(loc),
+                                                 closed_tours=self.closed_tours)
+            elif self.greedy_attempts > 0 and not is_ruled_out:
+                if self.greedy is None:
+                    self.greedy = GreedyTour(KnightGraph.get(nrow=self.nrow, ncol=self.ncol),
+                                             closed_tours=self.closed_tours,
+                                             nattempt=self.greedy_attempts,
+                                             seed=self.random_seed if self.random_seed is not None else 0,
+                                             time_limit=self.time_out)
+                self.kpths = kpths = GreedyPaths(self.greedy, cb.loc2tuple(loc),
+                                                 closed_tours=self.closed_tours)
+            elif is_ruled_out:
+                self.kpths = kpths = self.make_knights_paths(loc)    # Reports reason
+            else:
+                self.kpths = kpths = self.make_search(loc)
             self.ipstart += 1   # Bump for next iteration
             time_beg = datetime.now()
             path = kpths.next_path()
+            if isinstance(kpths, GreedyPaths):
+                if path is not None:
+                    n_greedy += 1
+                elif not self.is_change_tour and not self.is_stop_gen:
+                    SlTrace.lg(f"    greedy failed: {kpths.stats_desc()} - searching")
+                    self.kpths = kpths = self.make_search(loc)
+                    path = kpths.next_path()
             if self.is_change_tour:
                 continue            # Change tour cmd
             if self.is_stop_gen:
@@ -120,15 +219,25 @@ class PathsGen:
             npath = kpths.get_ncomplete_path()
             ntrack_ntie = kpths.ntrack_ntie
             ntie = kpths.ntie
+            look_ahead_hist = kpths.look_ahead_hist
             comp_stats = (f"Comp Stats: time={time_dur:.3f} paths={npath}"
-                        f" move={nmove} track_level={track_level} tie_track={ntrack_ntie} ntie={ntie}")
+                        f" move={nmove} track_level={track_level} tie_track={ntrack_ntie} ntie={ntie}"
+                        f" look_ahead={kpths.look_ahead_hist_desc()}")
+            if path is None and kpths.impossible_reason is not None:
+                n_impossible += 1
+                path_description = (f" {self.sqno}: {cb.loc2desc(loc)} IMPOSSIBLE:"
+                                    f" {kpths.impossible_reason}")
+                SlTrace.lg(path_description)
+                continue            # No path to display or validate
+            
             if path is None:
                 what = "tours" if self.closed_tours else "paths"
                 SlTrace.lg(f"No {what} found - {npath} complete paths found")
                 SlTrace.lg(f"    {comp_stats}")
+                self.log_search_stats(kpths)
                 fail_comp_stats.add(time_dur=time_dur, npath=npath, nmove=nmove,
                                 track_level=track_level, ntrack_ntie=ntrack_ntie,
-                                ntie=ntie)
+                                ntie=ntie, look_ahead_hist=look_ahead_hist)
                 pth = kpths.last_complete_path
                 if pth is None:
                     pth_desc = "NO PATH"
@@ -155,7 +264,7 @@ class PathsGen:
                 kpths.is_complete_tour = True
                 success_comp_stats.add(time_dur=time_dur, npath=npath, nmove=nmove,
                                 track_level=track_level, ntrack_ntie=ntrack_ntie,
-                                ntie=ntie)
+                                ntie=ntie, look_ahead_hist=look_ahead_hist)
                 ct_desc = ""        # Closed tour description, if one
                 if kpths.is_neighbor(path[0], path[-1]):
                     kpths.is_closed_tour = True
@@ -172,7 +281,7 @@ class PathsGen:
                 SlTrace.lg(f"{ct_desc} (in {time_dur:.3f} sec)"
                            + f" from {cb.loc2desc(path[0])}"
                            + f" to {cb.loc2desc(path[-1])}"
-                           + f" path: {cb.path_desc(path)}")
+                           + f" path: {cb.path_desc(path, max_len=self.max_path_desc)}")
                 n_complete_paths += 1
                 n_having_complete_path += 1
                 total_success_time += time_dur
@@ -191,6 +300,7 @@ class PathsGen:
                 self.displayed_paths.append(DisplayedPath(disp_board=dp, org_no=self.sqno,
                                                           desc="Short Path"))
             SlTrace.lg(f"    {comp_stats}")
+            self.log_search_stats(kpths)
             SlTrace.lg(f"prunes non-closed-tour: {kpths.nprune_closed}")            
         SlTrace.lg(f"{n_complete_paths:4d} complete paths")
         SlTrace.lg(f"{n_closed_tour:4d} closed tours")
@@ -198,6 +308,12 @@ class PathsGen:
         SlTrace.lg(f"{n_having_complete_path:4d} starting squares having complete path")
         SlTrace.lg(f"{n_with_no_complete_path:4d} starting squares with no complete path")
         SlTrace.lg(f"{n_with_multiple_complete_paths:4d} starting squares with multiple complete paths")
+        SlTrace.lg(f"{n_impossible:4d} starting squares ruled out by tour existence rules")
+        if self.greedy is not None:
+            SlTrace.lg(f"{n_greedy:4d} starting squares solved by greedy passes"
+                       f" ({self.greedy.stats_desc()})")
+        if self.portfolio_solver is not None:
+            SlTrace.lg(f"  Portfolio: {self.portfolio_solver.stats_desc()}")
         if n_complete_paths > 0:
             SlTrace.lg(f"  Average success time: {total_success_time/n_complete_paths:.3f}")
             SlTrace.lg(f"  Maximum success time: {max_success_time:.3f}")
@@ -207,13 +323,15 @@ class PathsGen:
         success_comp_stats.min.report_line("    minimum")
         success_comp_stats.max.report_line("    maximum")
         success_comp_stats.avg.report_line("    average")
+        success_comp_stats.avg.report_look_ahead("    look ahead")
         fail_comp_stats.report_heading("  Failed")
         fail_comp_stats.min.report_line("    minimum")
         fail_comp_stats.max.report_line("    maximum")
         fail_comp_stats.avg.report_line("    average")
+        fail_comp_stats.avg.report_look_ahead("    look ahead")
         if longest_path_start is not None:
             SlTrace.lg(f"  {cb.loc2desc(longest_path_start)} starts the longest path({len(longest_path):d})"
-                       + f"  {cb.path_desc(longest_path)}"
+                       + f"  {cb.path_desc(longest_path, max_len=self.max_path_desc)}"
                        )
 
         SlTrace.lg("Do validation")
@@ -226,6 +344,109 @@ class PathsGen:
             SlTrace.lg("We have some looking to do")
         SlTrace.lg("End of Run")
 
+    def make_search(self, loc):
+        """ Make search for a start: portfolio race or KnightsPaths
+        :loc: starting location
+        :returns: PortfolioPaths or KnightsPaths
+        """
+        if self.portfolio:
+            if self.portfolio_solver is None:
+                self.portfolio_solver = PortfolioSolver(nrow=self.nrow, ncol=self.ncol,
+                                                        closed_tours=self.closed_tours,
+                                                        time_limit=self.time_out,
+                                                        options=self.knights_paths_options(),
+                                                        nworker=self.portfolio_workers)
+            return PortfolioPaths(self.portfolio_solver, self.board.loc2tuple(loc),
+                                  closed_tours=self.closed_tours)
+
+        return self.make_knights_paths(loc)
+
+    def make_knights_paths(self, loc):
+        """ Make search engine for a start, with the run's options
+        :loc: starting location
+        :returns: KnightsPaths
+        """
+        return KnightsPaths(loc=loc, closed_tours=self.closed_tours,
+                            nrow=self.nrow, ncol=self.ncol,
+                            **self.knights_paths_options())
+
+    def knights_paths_options(self):
+        """ KnightsPaths options of the run, but for start and board size
+        :returns: dictionary of options
+        """
+        return dict(display_move=self.display_move,
+                    pW=self.pW,
+                    move_time=self.move_time,
+                    time_limit=self.time_out,
+                    max_look_ahead=self.max_look_ahead,
+                    adaptive_look_ahead=self.adaptive_look_ahead,
+                    carry_look_ahead=self.carry_look_ahead,
+                    region_check=self.region_check,
+                    articulation_interval=self.articulation_interval,
+                    dead_end_check=self.dead_end_check,
+                    make_unmake=self.make_unmake,
+                    lookahead_cache_size=self.lookahead_cache_size,
+                    nogood_cache_size=self.nogood_cache_size,
+                    feasibility_check=self.feasibility_check,
+                    endgame_size=self.endgame_size,
+                    endgame_memo_size=self.endgame_memo_size,
+                    randomize_ties=self.randomize_ties,
+                    random_seed=self.random_seed,
+                    restart_schedule=self.restart_schedule,
+                    restart_base=self.restart_base,
+                    restart_factor=self.restart_factor,
+                    search_mode=self.search_mode,
+                    beam_width=self.beam_width,
+                    posa_repair=self.posa_repair,
+                    board_backend=self.board_backend,
+                    zobrist_seed=self.zobrist_seed)
+
+    def log_search_stats(self, kpths):
+        """ Log search engine statistics, beyond Comp Stats line
+        :kpths: KnightsPaths of search
+        """
+        if isinstance(kpths, TilingPaths):
+            SlTrace.lg(f"    tiling construction: {kpths.stats_desc()}")
+            return
+
+        if isinstance(kpths, GreedyPaths):
+            SlTrace.lg(f"    greedy: {kpths.stats_desc()}")
+            return
+
+        if isinstance(kpths, PortfolioPaths):
+            SlTrace.lg(f"    portfolio: {kpths.stats_desc()}")
+            return
+
+        if kpths.lookahead_cache is not None:
+            SlTrace.lg(f"    lookahead cache: {kpths.lookahead_cache.stats_desc()}")
+        if kpths.nogood_cache is not None:
+            SlTrace.lg(f"    nogood cache: {kpths.nogood_cache.stats_desc()}")
+        if kpths.dead_end_check:
+            SlTrace.lg(f"    dead ends: prunes={kpths.nprune_dead_end}"
+                       f" forced moves={kpths.nforced_move}")
+        if kpths.region_check is not None:
+            SlTrace.lg(f"    region check: {kpths.region_check.stats_desc()}")
+        if kpths.endgame is not None:
+            SlTrace.lg(f"    endgame: {kpths.endgame.stats_desc()}")
+        if kpths.rng is not None:
+            restart_desc = ""
+            if kpths.restart_schedule is not None:
+                restart_desc = (f" restarts={kpths.nrestart}"
+                                f" ({kpths.restart_schedule.desc()})")
+            SlTrace.lg(f"    random ties: seed={kpths.random_seed}{restart_desc}")
+        if kpths.beam is not None:
+            SlTrace.lg(f"    beam search: {kpths.beam.stats_desc()}")
+        if kpths.bidir is not None:
+            SlTrace.lg(f"    bidirectional: {kpths.bidir.stats_desc()}")
+        if kpths.posa is not None and kpths.posa.nrepair > 0:
+            SlTrace.lg(f"    rotation repair: {kpths.posa.stats_desc()}")
+        if kpths.discrepancy_limit is not None:
+            SlTrace.lg(f"    limited discrepancy: passes={kpths.nlds_pass}"
+                       f" discrepancy_limit={kpths.discrepancy_limit}")
+        if kpths.carry_look_ahead:
+            SlTrace.lg(f"    look ahead branches: started={kpths.nlook_branch}"
+                       f" carried={kpths.nlook_carried}")
+
     def next_tour(self):
         if self.kpths is not None and self.ipstart >= len(self.path_starts):
             return
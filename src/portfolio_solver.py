@@ -0,0 +1,261 @@
+# portfolio_solver.py
+"""
+Portfolio of search strategies, raced in parallel processes
+Different starting squares favor different strategies - deep look
+ahead, random restarts, limited discrepancy, greedy passes.  Each
+strategy runs in its own process, on the same start; the first valid
+tour wins and the other processes are stopped.  Wins are counted per
+strategy, and strategies are started in order of wins so far, which
+matters when there are fewer workers than strategies.  Wins are kept
+by the solver, for the starts it races (one PathsGen run), and are not
+saved between runs.
+"""
+import multiprocessing
+import queue
+from datetime import datetime
+
+from select_trace import SlTrace
+
+from knight_graph import KnightGraph
+from knights_paths import KnightsPaths, FoundPaths
+from greedy_tour import GreedyTour
+
+def run_strategy(name, options, loc, nrow, ncol, closed_tours, result_queue):
+    """ Run one strategy, in a worker process
+    :name: strategy name
+    :options: KnightsPaths options, greedy_attempts (and time_limit) for
+            greedy passes instead
+    :loc: starting (ic, ir) location
+    :nrow, ncol: board size
+    :closed_tours: True - closed tours
+    :result_queue: queue for the result dictionary
+    """
+    time_beg = datetime.now()
+    result = dict(name=name, path=None, nmove=0, track_level=0, npath=0,
+                  last_complete_path=None, error=None)
+    try:
+        options = dict(options)
+        greedy_attempts = options.pop("greedy_attempts", 0)
+        if greedy_attempts > 0:
+            graph = KnightGraph.get(nrow=nrow, ncol=ncol)
+            greedy = GreedyTour(graph, closed_tours=closed_tours,
+                                nattempt=greedy_attempts, seed=options.get("random_seed") or 0,
+                                time_limit=options.get("time_limit"))
+            sqs = greedy.search(graph.loc2sq(loc))
+            if sqs is not None:
+                result["path"] = [graph.sq2loc(sq) for sq in sqs]
+                result["npath"] = 1
+            result["nmove"] = greedy.nmove
+        else:
+            kpths = KnightsPaths(loc=loc, nrow=nrow, ncol=ncol,
+                                 closed_tours=closed_tours, **options)
+            result["path"] = kpths.next_path()
+            result["nmove"] = kpths.get_nmove()
+            result["track_level"] = kpths.get_track_level()
+            result["npath"] = kpths.get_ncomplete_path()
+            result["last_complete_path"] = kpths.last_complete_path
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["time"] = (datetime.now() - time_beg).total_seconds()
+    result_queue.put(result)
+
+
+class PortfolioSolver:
+    """ Race of KnightsPaths variants for each start
+    """
+    # Strategy name: KnightsPaths option changes
+    default_strategies = {
+        "greedy": dict(greedy_attempts=10000),
+        "deep_lookahead": dict(max_look_ahead=8, adaptive_look_ahead=True),
+        "restarts": dict(randomize_ties=True, restart_schedule="luby"),
+        "lds": dict(search_mode="lds"),
+    }
+    closed_strategies = {
+        "bidir": dict(search_mode="bidir"),
+    }
+    poll_interval = .25         # Seconds between checks for dead workers
+
+    def __init__(self, nrow=8, ncol=8, closed_tours=False, time_limit=None,
+                 options=None, strategies=None, nworker=0):
+        """ Setup portfolio
+        :nrow, ncol: board size
+        :closed_tours: True - closed tours
+        :time_limit: time limit, in seconds, for each start
+                default: None - until every strategy finishes
+        :options: KnightsPaths options common to all strategies
+        :strategies: dictionary of strategy name: option changes
+                default: default_strategies, plus closed_strategies
+                for closed tours
+        :nworker: maximum number of processes at once, 0 - one per
+                strategy default: 0
+        """
+        self.nrow = nrow
+        self.ncol = ncol
+        self.closed_tours = closed_tours
+        self.time_limit = time_limit
+        self.options = dict(options) if options is not None else {}
+        self.options["display_move"] = False
+        self.options["pW"] = None
+        if strategies is None:
+            strategies = dict(self.default_strategies)
+            if closed_tours:
+                strategies.update(self.closed_strategies)
+        self.strategies = strategies
+        self.nworker = nworker if nworker > 0 else len(strategies)
+        self.wins = {name: 0 for name in strategies}            # Tours found first
+        self.win_time = {name: 0.0 for name in strategies}      # Total winning time
+        self.nsolve = 0             # Number of starts raced
+        self.nsolved = 0            # Number with a tour found
+        self.ncancel = 0            # Number of processes stopped early
+
+
+    def schedule(self):
+        """ Strategy names in starting order, most wins first
+        """
+        return sorted(self.strategies, key=lambda name: -self.wins[name])
+
+
+    def is_valid(self, path):
+        """ Check worker's path: a tour, closed if required
+        """
+        nsq = self.nrow*self.ncol
+        if path is None or len(path) != nsq or len(set(path)) != nsq:
+            return False
+
+        pairs = list(zip(path, path[1:]))
+        if self.closed_tours:
+            pairs.append((path[-1], path[0]))
+        for loc, loc2 in pairs:
+            dc, dr = abs(loc[0]-loc2[0]), abs(loc[1]-loc2[1])
+            if (dc, dr) not in ((1,2), (2,1)):
+                return False
+
+        return True
+
+
+    def solve(self, loc):
+        """ Race strategies for a start
+        :loc: starting (ic, ir) location
+        :returns: result dictionary of the winner (name, path, nmove,
+                track_level, npath, time), or if none wins, of the
+                strategy giving the longest partial path, with path None
+        """
+        self.nsolve += 1
+        time_beg = datetime.now()
+        ctx = multiprocessing.get_context()     # Spawned workers import main module
+        result_queue = ctx.Queue()
+        pending = self.schedule()
+        running = {}                # Strategy name: Process
+        winner = None
+        best_fail = None
+        while pending or running:
+            while pending and len(running) < self.nworker:
+                name = pending.pop(0)
+                options = dict(self.options)
+                options.update(self.strategies[name])
+                if self.time_limit is not None:
+                    options["time_limit"] = self.time_limit
+                proc = ctx.Process(target=run_strategy,
+                                   args=(name, options, loc, self.nrow, self.ncol,
+                                         self.closed_tours, result_queue),
+                                   daemon=True)
+                proc.start()
+                running[name] = proc
+            timeout = self.poll_interval
+            if self.time_limit is not None:
+                time_left = self.time_limit - (datetime.now() - time_beg).total_seconds()
+                if time_left <= 0:
+                    break
+                timeout = min(timeout, time_left)
+            try:
+                result = result_queue.get(timeout=timeout)
+            except queue.Empty:
+                for name, proc in list(running.items()):
+                    if proc.exitcode is not None and proc.exitcode != 0:
+                        SlTrace.lg(f"portfolio {name} died: exit code {proc.exitcode}")
+                        running.pop(name).join()    # No result coming
+                continue
+
+            name = result["name"]
+            proc = running.pop(name, None)
+            if proc is not None:
+                proc.join()
+            if result["error"] is not None:
+                SlTrace.lg(f"portfolio {name} failed: {result['error']}")
+            if self.is_valid(result["path"]):
+                winner = result
+                break
+
+            result["path"] = None
+            partial = result["last_complete_path"]
+            if best_fail is None or (partial is not None
+                    and (best_fail["last_complete_path"] is None
+                         or len(partial) > len(best_fail["last_complete_path"]))):
+                best_fail = result
+        for proc in running.values():
+            proc.terminate()        # Cancel the rest
+            proc.join()
+            self.ncancel += 1
+        result_queue.close()
+        if winner is None:
+            if SlTrace.trace("portfolio"):
+                SlTrace.lg(f"portfolio: no tour from {loc}")
+            return best_fail
+
+        self.nsolved += 1
+        name = winner["name"]
+        self.wins[name] += 1
+        self.win_time[name] += winner["time"]
+        if SlTrace.trace("portfolio"):
+            SlTrace.lg(f"portfolio: {name} won from {loc} in {winner['time']:.3f} sec")
+        return winner
+
+
+    def stats_desc(self):
+        """ Statistics description string, strategies by wins
+        """
+        wins = " ".join(f"{name}={self.wins[name]}" for name in self.schedule())
+        return (f"starts={self.nsolve} solved={self.nsolved} cancelled={self.ncancel}"
+                f" wins: {wins}")
+
+
+class PortfolioPaths(FoundPaths):
+    """ Portfolio race from a starting square, for PathsGen
+    """
+    def __init__(self, portfolio, loc, closed_tours=False):
+        """ Setup
+        :portfolio: PortfolioSolver of board
+        :loc: starting (ic, ir) location
+        :closed_tours: True - closed tours requested
+        """
+        super().__init__(loc, portfolio.nrow*portfolio.ncol, closed_tours=closed_tours)
+        self.portfolio = portfolio
+        self.track_level = 0
+        self.result = None          # Winner's (or best failure's) result
+
+
+    def find_path(self):
+        """ Race for a tour
+        """
+        self.result = result = self.portfolio.solve(self.loc)
+        if result is None:
+            return None
+
+        self.nmove = result["nmove"]
+        self.track_level = result["track_level"]
+        self.ncomplete_path = result["npath"]
+        self.last_complete_path = result["last_complete_path"]
+        return result["path"]
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        if self.result is None:
+            return "no strategy finished"
+
+        name = self.result["name"]
+        if self.result["path"] is None:
+            return f"no winner, longest from {name}"
+
+        return f"winner={name} in {self.result['time']:.3f} sec"
@@ -0,0 +1,116 @@
+# posa_repair.py
+"""
+Repair of stalled knight paths by Posa rotation-extension
+A path which can't be extended from its end square, e, may still be
+rotated: if e is a knight move from an interior square, p[i], then
+p[0..i] + reversed(p[i+1..]) is a path too, ending at p[i+1].  Rotating
+until the new end can be extended (or, for closed tours, is next to the
+start), repeatedly, often completes a path the search has given up on,
+in far fewer steps than backing up.  The starting square is kept.
+"""
+import random
+
+from select_trace import SlTrace
+
+class PosaRepair:
+    """ Rotation-extension of paths, keeping the first square
+    """
+    def __init__(self, graph, max_steps=None, seed=0):
+        """ Setup repair
+        :graph: KnightGraph of board
+        :max_steps: maximum rotations plus extensions per repair
+                default: 50 per square
+        :seed: seed for choosing among rotations default: 0
+        """
+        self.graph = graph
+        if max_steps is None:
+            max_steps = 50*graph.nsq
+        self.max_steps = max_steps
+        self.rng = random.Random(seed)
+        self.nrepair = 0            # Number of repairs tried
+        self.nrepaired = 0          # Number succeeding
+        self.nrotation = 0          # Number of rotations
+        self.nextension = 0         # Number of extensions
+
+
+    def repair(self, path, closed_tours=False, time_check=None, check_interval=64):
+        """ Complete path by rotations and extensions
+        :path: list of square indexes, path from its first square
+        :closed_tours: True - last square must be next to the first
+        :time_check: function called before the first step and every
+                check_interval steps, which may raise an exception
+                (e.g. SelectTimeout) to stop default: no checking
+        :check_interval: steps between time_check calls default: 64
+        :returns: list of square indexes covering the board, starting
+                with path's first square, None if not found in max_steps
+        """
+        self.nrepair += 1
+        graph = self.graph
+        nsq = graph.nsq
+        neighbors = graph.neighbors
+        neighbor_masks = graph.neighbor_masks
+        path = list(path)
+        pos = [-1]*nsq              # Index in path, -1 if not on path
+        visited = 0
+        for i, sq in enumerate(path):
+            pos[sq] = i
+            visited |= 1 << sq
+        start_mask = neighbor_masks[path[0]]
+        for nstep in range(self.max_steps):
+            if time_check is not None and nstep % check_interval == 0:
+                time_check()
+            end = path[-1]
+            npath = len(path)
+            if npath == nsq:
+                if not closed_tours or (start_mask >> end) & 1:
+                    self.nrepaired += 1
+                    if SlTrace.trace("posa"):
+                        SlTrace.lg(f"posa repaired: {self.nrotation} rotations"
+                                   f" {self.nextension} extensions so far")
+                    return path
+
+            else:
+                best = None
+                best_deg = None
+                for nbr in neighbors[end]:
+                    if not (visited >> nbr) & 1:
+                        ndeg = bin(neighbor_masks[nbr] & ~visited).count("1")
+                        if best is None or ndeg < best_deg:
+                            best, best_deg = nbr, ndeg
+                if best is not None:
+                    pos[best] = npath
+                    path.append(best)
+                    visited |= 1 << best
+                    self.nextension += 1
+                    continue
+
+            pivots = []             # Rotation points, i with path[i] next to end
+            good = []               # Those whose new end is useful
+            for psq in neighbors[end]:
+                i = pos[psq]
+                if i < 0 or i >= npath - 2:
+                    continue
+
+                pivots.append(i)
+                new_end = path[i+1]
+                if npath == nsq:
+                    if (start_mask >> new_end) & 1:
+                        good.append(i)
+                elif neighbor_masks[new_end] & ~visited:
+                    good.append(i)
+            if not pivots:
+                return None         # Can't rotate
+
+            i = self.rng.choice(good if good else pivots)
+            path[i+1:] = path[npath-1:i:-1]
+            for j in range(i+1, npath):
+                pos[path[j]] = j
+            self.nrotation += 1
+        return None
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"repairs={self.nrepair} repaired={self.nrepaired}"
+                f" rotations={self.nrotation} extensions={self.nextension}")
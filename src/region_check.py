@@ -0,0 +1,169 @@
+# region_check.py
+"""
+Feasibility checks of the empty region left to a knight path search
+The rest of the path must start at the current square, cover every
+empty square and, for closed tours, end next to the starting square.
+That is impossible if the region (empty squares, current square and,
+for closed tours, starting square) is not knight connected, or if
+removing one square would split it in a way no single path can cover.
+"""
+from select_trace import SlTrace
+
+class RegionCheck:
+    """ Connectivity and articulation square checks, on occupancy bitmasks
+    Connectivity is checked after every move, by a bitmask flood fill
+    which stops once the previous square's neighbors are reached
+    Articulation squares are found by an occasional Tarjan pass.
+    """
+    def __init__(self, graph, closed_tours=False, articulation_interval=256):
+        """ Setup checks
+        :graph: KnightGraph of board
+        :closed_tours: True - path must end next to starting square
+        :articulation_interval: number of checks between articulation
+                    square passes, 0 - no articulation checks default: 256
+        """
+        self.graph = graph
+        self.closed_tours = closed_tours
+        self.articulation_interval = articulation_interval
+        self.ncheck_left = articulation_interval    # Checks till next pass
+        self.ncheck = 0                 # Number of checks
+        self.narticulation_check = 0    # Number of articulation passes
+        self.nprune_connect = 0         # Number failing connectivity
+        self.nprune_articulation = 0    # Number failing articulation check
+
+
+    def is_feasible(self, occupied, cur_sq, prev_sq=None, start_sq=None):
+        """ Check if the region can still be covered by a path
+        :occupied: occupancy bitmask, including cur_sq
+        :cur_sq: current (path end) square
+        :prev_sq: square moved from, None - check whole region
+                The region before the move is taken to be connected
+        :start_sq: path starting square, used for closed tours
+        :returns: False if no path can cover the region
+        """
+        self.ncheck += 1
+        region = ~occupied & self.graph.full_mask | (1 << cur_sq)
+        if self.closed_tours and start_sq is not None:
+            region |= 1 << start_sq
+        if prev_sq is None:
+            targets = region
+        else:
+            targets = self.graph.neighbor_masks[prev_sq] & region
+        if not self.is_connected(region, cur_sq, targets):
+            self.nprune_connect += 1
+            return False
+
+        if self.articulation_interval > 0:
+            self.ncheck_left -= 1
+            if self.ncheck_left <= 0:
+                self.ncheck_left = self.articulation_interval
+                if not self.articulation_ok(region, cur_sq, start_sq):
+                    self.nprune_articulation += 1
+                    self.ncheck_left = 1        # Check siblings too
+                    return False
+
+        return True
+
+
+    def is_connected(self, region, from_sq, targets):
+        """ Check if target squares are reachable within region
+        :region: bitmask of squares which may be traversed
+        :from_sq: square to start from
+        :targets: bitmask of squares to reach
+        :returns: True if all targets are reached
+        """
+        spread = self.graph.spread
+        reached = 1 << from_sq
+        frontier = reached
+        while targets & ~reached:
+            frontier = spread(frontier) & region & ~reached
+            if not frontier:
+                return False
+
+            reached |= frontier
+        return True
+
+
+    def articulation_ok(self, region, cur_sq, start_sq=None):
+        """ Check region's articulation squares, by a Tarjan pass
+        Removing a square the path passes through may leave at most two
+        parts, the one before it (with cur_sq) and the one after it
+        (with start_sq, for closed tours).  The path's end squares,
+        cur_sq and, for closed tours, start_sq, may not split it at all.
+        :region: bitmask of region squares, assumed connected
+        :cur_sq: current (path end) square
+        :start_sq: starting square, for closed tours
+        :returns: False if some square makes covering impossible
+        """
+        self.narticulation_check += 1
+        closed = self.closed_tours and start_sq is not None
+        neighbors = self.graph.neighbors
+        disc = {cur_sq:0}           # discovery order
+        low = {cur_sq:0}
+        last_desc = {}              # Highest discovery order in subtree
+        nsplit = {}                 # Children cut off by removing square
+        splits = {}                 # Cut off child, if just one
+        order = 1
+        stack = [(cur_sq, iter(neighbors[cur_sq]))]
+        while stack:
+            sq, nbs = stack[-1]
+            advanced = False
+            for nsq in nbs:
+                if not (region >> nsq) & 1:
+                    continue
+
+                if nsq not in disc:
+                    disc[nsq] = low[nsq] = order
+                    order += 1
+                    stack.append((nsq, iter(neighbors[nsq])))
+                    advanced = True
+                    break
+
+                if disc[nsq] < low[sq]:
+                    low[sq] = disc[nsq]
+            if advanced:
+                continue
+
+            stack.pop()
+            last_desc[sq] = order - 1
+            if not stack:
+                break
+
+            parent = stack[-1][0]
+            if low[sq] < low[parent]:
+                low[parent] = low[sq]
+            if low[sq] >= disc[parent]:
+                nsplit[parent] = nsplit.get(parent, 0) + 1
+                splits[parent] = sq
+
+        if closed and start_sq not in disc:
+            return False            # Start not reached, region split
+
+        if nsplit.get(cur_sq, 0) > 1:
+            return False            # Path can't go both ways from its start
+
+        for sq, ncut in nsplit.items():
+            if sq == cur_sq:
+                continue
+
+            if closed and sq == start_sq:
+                return False        # Path must end at start_sq, can't split
+
+            if ncut > 1:
+                return False        # Three or more parts
+
+            if closed:
+                child = splits[sq]
+                if not disc[child] <= disc[start_sq] <= last_desc[child]:
+                    return False    # The part after sq must hold start_sq
+        if SlTrace.trace("region_check"):
+            SlTrace.lg(f"articulation check passed: {len(nsplit)} articulation squares")
+        return True
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"checks={self.ncheck} connect_prunes={self.nprune_connect}"
+                f" articulation_passes={self.narticulation_check}"
+                f" articulation_prunes={self.nprune_articulation}")
@@ -0,0 +1,67 @@
+# restart_schedule.py
+"""
+Restart schedules for randomized search
+Search times with random tie breaking are heavy tailed: most runs
+are quick, a few take very long.  Restarting after a budget of moves,
+with a new random order, cuts off the long runs.  Budgets follow
+Luby's universal sequence (1, 1, 2, 1, 1, 2, 4, 1, ...) or grow
+geometrically, times a base number of moves.
+"""
+from select_error import SelectError
+
+class RestartSchedule:
+    """ Sequence of move budgets between restarts
+    """
+    kinds = ("luby", "geometric")
+
+    @staticmethod
+    def luby(i):
+        """ Luby sequence term
+        :i: term number, starting at 1
+        :returns: i'th term: 1, 1, 2, 1, 1, 2, 4, 1, ...
+        """
+        while True:
+            k = 1
+            while (1 << k) - 1 < i:
+                k += 1
+            if i == (1 << k) - 1:
+                return 1 << (k-1)
+
+            i -= (1 << (k-1)) - 1
+
+
+    def __init__(self, kind="luby", base=1000, factor=1.5):
+        """ Setup schedule
+        :kind: "luby" or "geometric" default: "luby"
+        :base: moves in unit (first) budget default: 1000
+        :factor: geometric growth per restart default: 1.5
+        """
+        if kind not in self.kinds:
+            raise SelectError(f"Unrecognized restart schedule: '{kind}'"
+                              f" - expecting one of {self.kinds}")
+        if base < 1:
+            raise SelectError(f"restart base({base}) must be positive")
+        self.kind = kind
+        self.base = base
+        self.factor = factor
+        self.nlimit = 0             # Number of budgets given
+
+
+    def next_limit(self):
+        """ Get next budget
+        :returns: number of moves before next restart
+        """
+        self.nlimit += 1
+        if self.kind == "luby":
+            return self.base*self.luby(self.nlimit)
+
+        return int(self.base*self.factor**(self.nlimit-1))
+
+
+    def desc(self):
+        """ Schedule description string
+        """
+        if self.kind == "luby":
+            return f"luby base={self.base}"
+
+        return f"geometric base={self.base} factor={self.factor}"
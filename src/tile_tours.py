@@ -0,0 +1,148 @@
+# tile_tours.py
+"""
+Closed knight's tours of the tiles used by tiling_tours.py
+One tour for each tile size, rows by columns, 5 to 10 squares a side and
+not both odd, as square indexes ir*ncol+ic starting at square 0.
+Found once by KnightsPaths (closed_tours, from (0,0)) and kept here, so
+constructing a tiled tour needs no search and can not fail.
+"""
+
+tile_tours = {
+    (5, 6): (
+        0, 13, 24, 20, 28, 17, 4, 15, 26, 18, 7, 3, 11, 22, 9, 5,
+        16, 29, 21, 25, 12, 1, 14, 27, 23, 10, 2, 6, 19, 8),
+    (5, 8): (
+        0, 17, 32, 26, 16, 1, 11, 5, 15, 30, 36, 21, 31, 37, 27, 33,
+        18, 24, 9, 3, 20, 35, 25, 8, 2, 12, 6, 23, 38, 28, 34, 19,
+        13, 7, 22, 39, 29, 14, 4, 10),
+    (5, 10): (
+        0, 21, 40, 32, 20, 1, 13, 5, 17, 9, 28, 49, 37, 29, 48, 36,
+        44, 25, 4, 16, 8, 27, 19, 38, 46, 34, 42, 30, 11, 3, 15, 7,
+        26, 47, 39, 18, 6, 14, 2, 23, 35, 43, 31, 10, 22, 41, 33, 45,
+        24, 12),
+    (6, 5): (
+        0, 7, 4, 13, 24, 27, 20, 17, 14, 3, 6, 15, 26, 23, 16, 25,
+        22, 29, 18, 9, 2, 5, 12, 19, 28, 21, 10, 1, 8, 11),
+    (6, 6): (
+        0, 13, 24, 32, 28, 17, 4, 15, 2, 6, 19, 30, 26, 34, 23, 10,
+        21, 29, 33, 25, 12, 1, 14, 18, 31, 27, 35, 22, 11, 3, 7, 20,
+        9, 5, 16, 8),
+    (6, 7): (
+        0, 15, 28, 37, 22, 35, 30, 39, 34, 19, 6, 11, 2, 7, 16, 21,
+        36, 31, 40, 27, 12, 3, 8, 17, 26, 41, 32, 23, 10, 1, 14, 29,
+        24, 33, 38, 25, 20, 5, 18, 13, 4, 9),
+    (6, 8): (
+        0, 17, 32, 42, 25, 40, 34, 24, 41, 35, 45, 39, 22, 7, 13, 23,
+        6, 12, 2, 8, 18, 1, 16, 33, 43, 28, 38, 44, 29, 46, 31, 14,
+        4, 19, 9, 3, 20, 37, 47, 30, 36, 26, 11, 5, 15, 21, 27, 10),
+    (6, 9): (
+        0, 19, 36, 47, 28, 45, 38, 27, 46, 39, 50, 43, 26, 7, 14, 3,
+        10, 21, 2, 9, 20, 1, 18, 37, 48, 29, 12, 31, 24, 5, 16, 35,
+        52, 33, 44, 51, 40, 23, 4, 15, 8, 25, 42, 53, 34, 17, 6, 13,
+        32, 49, 30, 41, 22, 11),
+    (6, 10): (
+        0, 21, 40, 52, 31, 50, 42, 30, 51, 43, 55, 47, 59, 38, 19, 7,
+        28, 9, 17, 29, 8, 16, 4, 23, 2, 10, 22, 1, 20, 41, 53, 32,
+        11, 3, 15, 34, 13, 5, 24, 36, 57, 49, 37, 58, 39, 18, 6, 27,
+        48, 56, 44, 25, 46, 54, 35, 14, 26, 45, 33, 12),
+    (7, 6): (
+        0, 8, 4, 17, 9, 5, 16, 29, 40, 32, 36, 25, 12, 1, 14, 3,
+        11, 22, 35, 39, 31, 18, 7, 20, 33, 41, 28, 15, 19, 6, 2, 10,
+        21, 34, 23, 27, 38, 30, 26, 37, 24, 13),
+    (7, 8): (
+        0, 17, 32, 49, 43, 53, 47, 30, 15, 5, 11, 1, 16, 26, 9, 24,
+        41, 51, 45, 55, 38, 23, 6, 21, 31, 46, 36, 42, 48, 33, 50, 40,
+        34, 44, 54, 39, 22, 7, 13, 28, 18, 3, 20, 37, 52, 35, 29, 14,
+        4, 19, 25, 8, 2, 12, 27, 10),
+    (7, 10): (
+        0, 21, 40, 61, 53, 65, 57, 69, 48, 67, 59, 38, 19, 7, 28, 9,
+        17, 29, 8, 16, 4, 25, 6, 18, 39, 58, 37, 49, 68, 56, 64, 52,
+        60, 41, 20, 1, 13, 5, 26, 45, 66, 47, 55, 36, 44, 63, 51, 32,
+        24, 3, 11, 30, 22, 10, 2, 14, 33, 54, 46, 27, 15, 34, 42, 50,
+        62, 43, 35, 23, 31, 12),
+    (8, 5): (
+        0, 7, 4, 13, 2, 5, 16, 25, 36, 33, 24, 27, 38, 29, 18, 9,
+        12, 3, 6, 15, 22, 19, 8, 1, 10, 21, 30, 37, 34, 23, 14, 17,
+        26, 35, 32, 39, 28, 31, 20, 11),
+    (8, 6): (
+        0, 8, 4, 17, 9, 5, 16, 3, 11, 22, 35, 46, 38, 42, 31, 44,
+        36, 25, 12, 1, 14, 6, 2, 10, 23, 27, 40, 29, 33, 41, 45, 37,
+        24, 20, 7, 18, 26, 34, 47, 39, 43, 30, 19, 15, 28, 32, 21, 13),
+    (8, 7): (
+        0, 9, 4, 13, 26, 41, 54, 45, 50, 35, 22, 7, 2, 17, 8, 3,
+        12, 27, 40, 55, 46, 51, 42, 37, 52, 47, 32, 19, 6, 11, 20, 5,
+        18, 33, 48, 53, 44, 49, 36, 31, 16, 21, 30, 39, 34, 25, 38, 43,
+        28, 23, 10, 1, 14, 29, 24, 15),
+    (8, 8): (
+        0, 17, 2, 8, 25, 40, 57, 51, 61, 55, 38, 23, 6, 12, 22, 7,
+        13, 3, 9, 24, 34, 49, 32, 42, 59, 53, 63, 46, 31, 14, 4, 19,
+        29, 39, 54, 44, 50, 56, 41, 58, 48, 33, 16, 1, 18, 28, 11, 5,
+        15, 21, 27, 37, 43, 60, 45, 35, 52, 62, 47, 30, 36, 26, 20, 10),
+    (8, 9): (
+        0, 19, 2, 9, 28, 45, 64, 57, 68, 61, 44, 25, 8, 15, 26, 7,
+        14, 3, 10, 27, 46, 63, 56, 67, 60, 71, 52, 69, 62, 43, 50, 33,
+        16, 35, 24, 17, 6, 13, 20, 1, 18, 37, 54, 65, 58, 39, 32, 51,
+        70, 53, 34, 41, 22, 5, 12, 29, 36, 55, 48, 31, 38, 21, 4, 23,
+        40, 59, 42, 49, 66, 47, 30, 11),
+    (8, 10): (
+        0, 21, 2, 10, 31, 50, 71, 63, 75, 67, 79, 58, 77, 69, 48, 29,
+        8, 16, 4, 23, 11, 30, 42, 61, 40, 52, 60, 72, 51, 70, 62, 74,
+        66, 78, 59, 38, 19, 7, 28, 9, 17, 5, 13, 1, 20, 32, 44, 65,
+        73, 54, 46, 25, 6, 27, 39, 18, 37, 49, 68, 56, 35, 47, 26, 14,
+        33, 41, 53, 34, 15, 3, 22, 43, 64, 76, 55, 36, 57, 45, 24, 12),
+    (9, 6): (
+        0, 8, 4, 17, 9, 5, 16, 3, 11, 22, 35, 46, 50, 42, 31, 18,
+        7, 20, 12, 1, 14, 6, 2, 10, 23, 15, 19, 27, 38, 30, 43, 51,
+        47, 39, 52, 41, 28, 32, 24, 37, 48, 44, 40, 53, 45, 49, 36, 25,
+        33, 29, 21, 34, 26, 13),
+    (9, 8): (
+        0, 10, 16, 1, 11, 5, 15, 30, 47, 62, 68, 58, 64, 49, 66, 56,
+        41, 24, 9, 3, 13, 7, 22, 39, 54, 71, 61, 55, 70, 60, 45, 51,
+        57, 67, 50, 65, 48, 33, 18, 8, 2, 12, 6, 23, 38, 28, 43, 53,
+        63, 69, 59, 44, 34, 40, 25, 35, 20, 26, 32, 42, 52, 37, 31, 46,
+        29, 14, 4, 19, 36, 21, 27, 17),
+    (9, 10): (
+        0, 21, 2, 10, 31, 50, 71, 83, 75, 87, 79, 58, 39, 18, 6, 14,
+        22, 1, 20, 41, 60, 81, 62, 70, 82, 74, 86, 78, 59, 67, 88, 69,
+        77, 89, 68, 49, 28, 9, 17, 29, 8, 16, 4, 25, 37, 56, 48, 27,
+        19, 7, 15, 3, 11, 30, 51, 72, 80, 61, 40, 52, 73, 85, 64, 76,
+        84, 63, 42, 23, 35, 43, 55, 47, 66, 54, 33, 45, 57, 38, 46, 65,
+        53, 34, 26, 5, 13, 32, 44, 36, 24, 12),
+    (10, 5): (
+        0, 7, 4, 13, 2, 5, 16, 25, 36, 45, 42, 49, 38, 47, 44, 33,
+        24, 27, 20, 31, 40, 37, 46, 43, 34, 23, 14, 3, 6, 15, 26, 35,
+        32, 39, 48, 41, 30, 21, 10, 17, 28, 19, 8, 1, 12, 9, 18, 29,
+        22, 11),
+    (10, 6): (
+        0, 8, 4, 17, 9, 5, 16, 3, 11, 22, 35, 46, 59, 51, 55, 42,
+        50, 54, 43, 56, 48, 37, 24, 20, 12, 1, 14, 6, 2, 10, 23, 15,
+        7, 18, 31, 27, 19, 30, 26, 39, 47, 58, 45, 53, 57, 49, 36, 44,
+        52, 41, 28, 32, 40, 29, 33, 25, 38, 34, 21, 13),
+    (10, 7): (
+        0, 9, 4, 13, 26, 41, 54, 69, 60, 55, 68, 59, 64, 49, 58, 63,
+        50, 65, 56, 43, 28, 37, 42, 57, 66, 61, 52, 67, 62, 47, 34, 19,
+        6, 11, 2, 7, 22, 35, 44, 39, 48, 53, 40, 45, 32, 27, 12, 17,
+        30, 21, 8, 3, 16, 1, 14, 29, 24, 33, 46, 51, 36, 31, 18, 23,
+        38, 25, 20, 5, 10, 15),
+    (10, 8): (
+        0, 10, 16, 1, 11, 5, 15, 30, 47, 62, 79, 69, 63, 78, 68, 74,
+        64, 49, 32, 26, 9, 3, 20, 14, 4, 21, 6, 23, 13, 7, 22, 39,
+        54, 71, 77, 67, 73, 56, 66, 72, 57, 40, 25, 8, 2, 19, 36, 46,
+        31, 37, 52, 42, 48, 58, 75, 65, 59, 76, 70, 53, 43, 60, 50, 33,
+        27, 12, 29, 35, 41, 24, 18, 28, 45, 55, 38, 44, 61, 51, 34, 17),
+    (10, 9): (
+        0, 11, 18, 1, 12, 5, 16, 35, 52, 71, 88, 77, 84, 73, 54, 37,
+        20, 9, 2, 13, 6, 17, 24, 7, 26, 43, 62, 79, 86, 69, 80, 87,
+        70, 89, 78, 85, 74, 81, 64, 83, 72, 55, 36, 47, 66, 59, 76, 65,
+        82, 63, 46, 27, 10, 3, 14, 25, 8, 15, 4, 23, 34, 53, 42, 61,
+        44, 33, 22, 29, 48, 31, 50, 67, 60, 41, 30, 49, 56, 75, 58, 39,
+        32, 51, 68, 57, 40, 21, 28, 45, 38, 19),
+    (10, 10): (
+        0, 21, 2, 10, 31, 50, 71, 90, 82, 70, 91, 83, 95, 87, 99, 78,
+        97, 89, 68, 49, 28, 9, 17, 29, 8, 16, 4, 23, 11, 30, 51, 63,
+        42, 61, 80, 92, 84, 96, 88, 69, 48, 36, 15, 7, 19, 27, 6, 18,
+        39, 58, 79, 98, 77, 85, 93, 81, 60, 72, 64, 76, 57, 38, 59, 67,
+        86, 94, 75, 56, 37, 25, 44, 52, 40, 32, 20, 1, 13, 5, 24, 3,
+        22, 43, 55, 47, 35, 14, 26, 34, 46, 65, 73, 54, 62, 74, 66, 45,
+        53, 41, 33, 12),
+}
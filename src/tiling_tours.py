@@ -0,0 +1,287 @@
+# tiling_tours.py
+"""
+Closed knight's tours of large boards, built by tiling
+The board is cut into tiles, 5 to 10 squares a side, each covered by
+a closed tour kept in tile_tours.py, so no search is done.
+Tiles are joined one at a time, row by row, to the cycle of the tiles
+before: an edge a-b of the new tile's tour, near the shared border,
+and an edge c-d of the cycle, with a-c and b-d knight moves, are
+swapped for a-c and b-d, making one cycle of the two.  This is the
+divide and conquer construction of Parberry, with joins found by a
+local search along each border instead of fixed tile structure.
+Time and memory are linear in the number of squares: the tour is held
+as two neighbor arrays, so 2000x2000 boards are practical.
+"""
+from array import array
+from datetime import datetime
+
+from select_trace import SlTrace
+from select_error import SelectError
+
+from knight_graph import KnightGraph
+from knights_paths import FoundPaths
+from tile_tours import tile_tours
+
+class TilingTour:
+    """ Closed tour of an nrow x ncol board, constructed by tiling
+    """
+    base_tours = {}             # Tile tours as locations, by (nrow, ncol)
+    even_parts = {6:(6,), 8:(8,), 10:(10,), 12:(6,6), 14:(6,8)}
+    odd_parts = {5:(5,), 7:(7,), 9:(9,), 11:(5,6), 13:(5,8), 15:(7,8)}
+
+    @classmethod
+    def split_side(cls, length):
+        """ Cut a board side into tile sides, each 5 to 10
+        At most one tile side is odd, and only if length is odd.
+        :length: board side
+        :returns: tuple of tile sides, None if side can't be tiled
+        """
+        if length < 5:
+            return None
+
+        parts = cls.odd_parts if length%2 == 1 else cls.even_parts
+        if length <= 15:
+            return parts.get(length)
+
+        nrest = length - 8*((length - 8)//8)       # 8 .. 15
+        return parts[nrest] + (8,)*((length - nrest)//8)
+
+
+    @classmethod
+    def is_supported(cls, nrow, ncol):
+        """ Check if board can be tiled
+        Sides must be at least 5 and not both odd - every board with
+        a closed tour but the 3 x n ones (n >= 10).
+        """
+        if nrow%2 == 1 and ncol%2 == 1:
+            return False
+
+        if cls.split_side(nrow) is None or cls.split_side(ncol) is None:
+            return False
+
+        return True
+
+
+    @classmethod
+    def base_tour(cls, nrow, ncol):
+        """ Get closed tour of tile
+        :nrow: tile rows
+        :ncol: tile columns
+        :returns: list of (ic, ir) locations
+        """
+        key = (nrow, ncol)
+        tour = cls.base_tours.get(key)
+        if tour is None:
+            sqs = tile_tours.get(key)
+            if sqs is None:
+                raise SelectError(f"TilingTour: no closed tour kept for {nrow}x{ncol} tile")
+            tour = [(sq % ncol, sq // ncol) for sq in sqs]
+            cls.base_tours[key] = tour
+        return tour
+
+
+    def __init__(self, nrow=8, ncol=8):
+        """ Construct tour
+        :nrow: number of rows
+        :ncol: number of columns
+        """
+        if not self.is_supported(nrow, ncol):
+            raise SelectError(f"TilingTour: can't tile a {nrow}x{ncol} board")
+
+        time_beg = datetime.now()
+        self.nrow = nrow
+        self.ncol = ncol
+        self.nsq = nrow*ncol
+        self.adj0 = array('l', [-1])*self.nsq      # Tour neighbors of each square
+        self.adj1 = array('l', [-1])*self.nsq
+        self.njoin = 0                  # Number of tile joins
+        self.njoin_tried = 0            # Number of candidate edge pairs tried
+        row_sides = self.split_side(nrow)
+        col_sides = self.split_side(ncol)
+        r0 = 0
+        for ti, h in enumerate(row_sides):
+            c0 = 0
+            for tj, w in enumerate(col_sides):
+                self.place_tile(r0, c0, h, w)
+                if ti > 0 or tj > 0:
+                    self.join_tile(r0, c0, h, w, join_left=(tj > 0))
+                c0 += w
+            r0 += h
+        self.build_time = (datetime.now() - time_beg).total_seconds()
+        if SlTrace.trace("tiling"):
+            SlTrace.lg(f"tiling {nrow}x{ncol}: {self.stats_desc()}")
+
+
+    def place_tile(self, r0, c0, h, w):
+        """ Place tile's tour, as a separate cycle
+        :r0, c0: tile's top row, left column
+        :h, w: tile's rows, columns
+        """
+        ncol = self.ncol
+        adj0, adj1 = self.adj0, self.adj1
+        tour = self.base_tour(h, w)
+        sqs = [(r0+ir)*ncol + c0+ic for ic, ir in tour]
+        prev = sqs[-1]
+        for sq in sqs:
+            adj1[prev] = sq
+            adj0[sq] = prev
+            prev = sq
+
+
+    def join_tile(self, r0, c0, h, w, join_left=True):
+        """ Join newly placed tile's cycle to the cycle before
+        :r0, c0: tile's top row, left column
+        :h, w: tile's rows, columns
+        :join_left: True - join across the tile's left border,
+                    else its top border, trying the other if needed
+        """
+        borders = [join_left, not join_left]
+        if r0 == 0:
+            borders = [True]
+        elif c0 == 0:
+            borders = [False]
+        for left in borders:
+            if self.join_border(r0, c0, h, w, left):
+                self.njoin += 1
+                return
+
+        raise SelectError(f"TilingTour: no join found for tile at row {r0} column {c0}")
+
+
+    def join_border(self, r0, c0, h, w, left):
+        """ Join across one border
+        :r0, c0, h, w: tile, as in join_tile
+        :left: True - left border, False - top border
+        :returns: True if joined
+        """
+        nrow, ncol = self.nrow, self.ncol
+        adj0, adj1 = self.adj0, self.adj1
+        if left:
+            rows, cols = range(r0, r0+h), range(c0, c0+2)
+        else:
+            rows, cols = range(r0, r0+2), range(c0, c0+w)
+        for ir in rows:
+            for ic in cols:
+                a = ir*ncol + ic
+                for dc, dr in KnightGraph.moves:
+                    cr, cc = ir+dr, ic+dc
+                    if cr < 0 or cr >= nrow or cc < 0 or cc >= ncol:
+                        continue
+
+                    if (left and (cc >= c0 or cr >= r0+h)
+                            or not left and (cr >= r0 or cc >= c0+w)):
+                        continue            # Not in the earlier tiles
+
+                    c = cr*ncol + cc
+                    if adj0[c] < 0:
+                        continue            # Not yet placed
+
+                    for b in (adj0[a], adj1[a]):
+                        for d in (adj0[c], adj1[c]):
+                            self.njoin_tried += 1
+                            if self.is_knight_move(b, d):
+                                self.swap_edges(a, b, c, d)
+                                return True
+        return False
+
+
+    def is_knight_move(self, sq, sq2):
+        """ Check if squares are a knight move apart
+        """
+        r1, c1 = divmod(sq, self.ncol)
+        r2, c2 = divmod(sq2, self.ncol)
+        dr, dc = abs(r1-r2), abs(c1-c2)
+        return (dr == 1 and dc == 2) or (dr == 2 and dc == 1)
+
+
+    def replace_neighbor(self, sq, old, new):
+        """ Replace one tour neighbor of sq
+        """
+        if self.adj0[sq] == old:
+            self.adj0[sq] = new
+        else:
+            self.adj1[sq] = new
+
+
+    def swap_edges(self, a, b, c, d):
+        """ Replace edges a-b and c-d, of separate cycles, by a-c and b-d
+        """
+        self.replace_neighbor(a, b, c)
+        self.replace_neighbor(b, a, d)
+        self.replace_neighbor(c, d, a)
+        self.replace_neighbor(d, c, b)
+
+
+    def path_squares(self, start_sq=0):
+        """ Tour from a starting square
+        :start_sq: starting square index (ir*ncol + ic)
+        :returns: array of square indexes, the last next to start_sq
+        """
+        adj0, adj1 = self.adj0, self.adj1
+        sqs = array('l', [0])*self.nsq
+        prev, sq = -1, start_sq
+        for i in range(self.nsq):
+            sqs[i] = sq
+            nxt = adj0[sq]
+            if nxt == prev:
+                nxt = adj1[sq]
+            prev, sq = sq, nxt
+        return sqs
+
+
+    def path(self, loc=(0,0)):
+        """ Tour from a starting location
+        :loc: starting (ic, ir) location
+        :returns: list of (ic, ir) locations
+        """
+        ncol = self.ncol
+        return [(sq % ncol, sq // ncol)
+                for sq in self.path_squares(loc[1]*ncol + loc[0])]
+
+
+    def is_closed_tour(self):
+        """ Check tour: one cycle of knight moves over every square
+        """
+        sqs = self.path_squares()
+        if len(set(sqs)) != self.nsq:
+            return False
+
+        for i in range(self.nsq):
+            if not self.is_knight_move(sqs[i-1], sqs[i]):
+                return False
+
+        return True
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return (f"tiles={self.njoin+1} joins_tried={self.njoin_tried}"
+                f" build_time={self.build_time:.3f}")
+
+
+class TilingPaths(FoundPaths):
+    """ Tiling tour from a starting square, for PathsGen
+    """
+    def __init__(self, tiling, loc, closed_tours=False):
+        """ Setup
+        :tiling: TilingTour of board
+        :loc: starting (ic, ir) location
+        :closed_tours: True - closed tours requested (all tiling tours are)
+        """
+        super().__init__(loc, tiling.nsq, closed_tours=closed_tours)
+        self.tiling = tiling
+
+
+    def find_path(self):
+        """ Get tour, from the starting square
+        """
+        path = self.tiling.path(self.loc)
+        self.nmove = len(path)
+        return path
+
+
+    def stats_desc(self):
+        """ Statistics description string
+        """
+        return self.tiling.stats_desc()
@@ -0,0 +1,91 @@
+# tour_feasibility.py
+"""
+Knight's tour existence, from board size, tour type and starting square
+Closed tours - Schwenk (1991): an m x n board, m <= n, has one unless
+    m and n are both odd, m is 1, 2 or 4, or m is 3 and n is 4, 6 or 8.
+Open tours - Conrad et al. (1994), Cull and De Curtins (1978): an
+    m x n board, m <= n, has one unless m is 1 (n > 1), m is 2,
+    m is 3 and n is 3, 5 or 6, or m and n are 4.
+Color parity - a knight alternates square colors, so on an odd area
+    board an open tour starts and ends on the majority color, that of
+    the corner squares.
+"""
+
+class TourFeasibility:
+    """ Checks which answer "no tour" without searching
+    """
+    @staticmethod
+    def closed_impossible_reason(nrow, ncol):
+        """ Check closed tour existence by Schwenk's theorem
+        :nrow: number of rows
+        :ncol: number of columns
+        :returns: reason string if no closed tour exists, else None
+        """
+        m, n = min(nrow, ncol), max(nrow, ncol)
+        if m%2 == 1 and n%2 == 1:
+            return f"{nrow}x{ncol} has odd area - closed tours need equal square colors"
+
+        if m in (1, 2, 4):
+            return f"{nrow}x{ncol} has a side of {m} - no closed tours (Schwenk)"
+
+        if m == 3 and n in (4, 6, 8):
+            return f"{nrow}x{ncol} is 3x{n} - no closed tours (Schwenk)"
+
+        return None
+
+
+    @staticmethod
+    def open_impossible_reason(nrow, ncol):
+        """ Check open tour existence by board size
+        :nrow: number of rows
+        :ncol: number of columns
+        :returns: reason string if no open tour exists, else None
+        """
+        m, n = min(nrow, ncol), max(nrow, ncol)
+        if m == 1 and n > 1:
+            return f"{nrow}x{ncol} has a side of 1 - knight can't move along it"
+
+        if m == 2:
+            return f"{nrow}x{ncol} has a side of 2 - no tours"
+
+        if (m == 3 and n in (3, 5, 6)) or (m == 4 and n == 4):
+            return f"{nrow}x{ncol} has no open tours"
+
+        return None
+
+
+    @staticmethod
+    def start_impossible_reason(nrow, ncol, loc):
+        """ Check open tour starting square color parity
+        :nrow: number of rows
+        :ncol: number of columns
+        :loc: starting (ic, ir) location
+        :returns: reason string if no open tour can start at loc, else None
+        """
+        if (nrow*ncol)%2 == 0:
+            return None             # Equal colors - either can start
+
+        ic, ir = loc
+        if (ic+ir)%2 == 1:
+            return (f"{nrow}x{ncol} has odd area - open tours start on"
+                    f" the corner squares' color")
+
+        return None
+
+
+    @classmethod
+    def impossible_reason(cls, nrow, ncol, closed_tours=False, loc=None):
+        """ Check if a tour can exist
+        :nrow: number of rows
+        :ncol: number of columns
+        :closed_tours: True - closed tours
+        :loc: starting (ic, ir) location default: any starting square
+        :returns: reason string if no tour exists, None if one may
+        """
+        if closed_tours:
+            return cls.closed_impossible_reason(nrow, ncol)
+
+        reason = cls.open_impossible_reason(nrow, ncol)
+        if reason is None and loc is not None:
+            reason = cls.start_impossible_reason(nrow, ncol, loc)
+        return reason
@@ -0,0 +1,65 @@
+# zobrist_keys.py
+"""
+Zobrist hashing keys for board positions
+A position's hash is the exclusive-or of a random 64 bit key for each
+occupied square, so making or unmaking a move updates it with one xor.
+Keys come from a seeded generator, not python's hash(), so hashes are
+the same in every process for a given seed and board size.
+"""
+import random
+
+class ZobristKeys:
+    """ Random keys per square for an nrow x ncol board
+    Use ZobristKeys.get(nrow, ncol, seed) to share the cached keys
+    """
+    key_sets = {}               # Cached keys by (nrow, ncol, seed)
+    default_seed = 20191026
+
+    @classmethod
+    def get(cls, nrow=8, ncol=8, seed=None):
+        """ Get shared keys for board size and seed
+        :nrow: number of rows
+        :ncol: number of columns
+        :seed: random seed default: default_seed
+        :returns: ZobristKeys, created on first use
+        """
+        if seed is None:
+            seed = cls.default_seed
+        key = (nrow, ncol, seed)
+        zkeys = cls.key_sets.get(key)
+        if zkeys is None:
+            zkeys = cls(nrow=nrow, ncol=ncol, seed=seed)
+            cls.key_sets[key] = zkeys
+        return zkeys
+
+
+    def __init__(self, nrow=8, ncol=8, seed=None):
+        """ Generate keys
+        :nrow: number of rows
+        :ncol: number of columns
+        :seed: random seed default: default_seed
+        """
+        if seed is None:
+            seed = self.default_seed
+        self.nrow = nrow
+        self.ncol = ncol
+        self.seed = seed
+        rng = random.Random(f"{seed}:{nrow}x{ncol}")
+        nsq = nrow*ncol
+        self.square_keys = [rng.getrandbits(64) for _ in range(nsq)]   # Occupied square
+        self.current_keys = [rng.getrandbits(64) for _ in range(nsq)]  # Piece to move
+
+
+    def occupied_hash(self, occupied):
+        """ Calculate hash from scratch
+        :occupied: occupancy bitmask, bit ir*ncol+ic set iff occupied
+        :returns: hash of occupied squares
+        """
+        zhash = 0
+        sq = 0
+        while occupied:
+            if occupied & 1:
+                zhash ^= self.square_keys[sq]
+            occupied >>= 1
+            sq += 1
+        return zhash
@@ -0,0 +1,76 @@
+# brute_force.py
+"""
+Brute force knight path search, for checking the search helpers
+Written from the rules alone, without the KnightGraph tables, and
+small boards only: every state (squares left, current square) found
+to fail is remembered, so the search is exhaustive.
+"""
+
+def board_neighbors(nrow, ncol):
+    """ Knight neighbors of each square
+    :returns: list, by square index ir*ncol+ic, of neighbor index lists
+    """
+    neighbors = []
+    for ir in range(nrow):
+        for ic in range(ncol):
+            nbs = []
+            for dr in (-2, -1, 1, 2):
+                for dc in (-2, -1, 1, 2):
+                    if abs(dr) == abs(dc):
+                        continue
+
+                    nr, nc = ir+dr, ic+dc
+                    if 0 <= nr < nrow and 0 <= nc < ncol:
+                        nbs.append(nr*ncol + nc)
+            neighbors.append(nbs)
+    return neighbors
+
+
+def has_path(neighbors, left, cur_sq, ends=None, failed=None):
+    """ Check if a path from cur_sq can cover the squares left
+    :neighbors: board_neighbors list
+    :left: frozenset of squares to cover
+    :cur_sq: current square, not in left
+    :ends: squares the path may end on, None - any
+    :failed: dictionary of failed states, shared between calls with
+            the same ends
+    :returns: True if such a path exists
+    """
+    if failed is None:
+        failed = {}
+    if not left:
+        return ends is None or cur_sq in ends
+
+    key = (left, cur_sq)
+    if key in failed:
+        return False
+
+    for nsq in neighbors[cur_sq]:
+        if nsq in left and has_path(neighbors, left - {nsq}, nsq, ends, failed):
+            return True
+
+    failed[key] = True
+    return False
+
+
+def has_tour(nrow, ncol, closed_tours=False, start_sq=None):
+    """ Check if the board has a tour
+    :closed_tours: True - tour must end next to its start
+    :start_sq: starting square default: None - any (one, for closed
+            tours, every square being on a closed tour)
+    """
+    neighbors = board_neighbors(nrow, ncol)
+    nsq = nrow*ncol
+    if start_sq is not None:
+        starts = [start_sq]
+    elif closed_tours:
+        starts = [0]
+    else:
+        starts = range(nsq)
+    for sq in starts:
+        ends = set(neighbors[sq]) if closed_tours else None
+        left = frozenset(range(nsq)) - {sq}
+        if has_path(neighbors, left, sq, ends):
+            return True
+
+    return False
@@ -0,0 +1,9 @@
+# conftest.py
+"""
+pytest setup - modules import each other from src, as when
+good_knights.py is run there
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,42 @@
+# positions.py
+"""
+Random knight path positions, for checking the search helpers
+"""
+import random
+
+from brute_force import board_neighbors
+
+def random_positions(nrow, ncol, nempty_min, nempty_max, count, seed=0):
+    """ Positions reached by random knight walks, half of them
+    Warnsdorff walks (fewest onward moves first, random ties), which
+    mostly leave positions that can be completed
+    :nrow, ncol: board size
+    :nempty_min, nempty_max: range of empty squares left
+    :count: number of positions
+    :seed: random seed
+    :returns: list of (path, empty squares) - path as square indexes,
+            starting square first, current square last
+    """
+    neighbors = board_neighbors(nrow, ncol)
+    nsq = nrow*ncol
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        nempty = rng.randint(nempty_min, nempty_max)
+        warnsdorff = len(positions)%2 == 0
+        path = [rng.randrange(nsq)]
+        visited = {path[0]}
+        while nsq - len(path) > nempty:
+            moves = [nsq2 for nsq2 in neighbors[path[-1]] if nsq2 not in visited]
+            if not moves:
+                break               # Stuck early - skip
+
+            if warnsdorff:
+                ndegs = [sum(1 for nsq3 in neighbors[nsq2] if nsq3 not in visited)
+                         for nsq2 in moves]
+                moves = [nsq2 for nsq2, ndeg in zip(moves, ndegs) if ndeg == min(ndegs)]
+            path.append(rng.choice(moves))
+            visited.add(path[-1])
+        if nsq - len(path) == nempty:
+            positions.append((path, frozenset(range(nsq)) - visited))
+    return positions
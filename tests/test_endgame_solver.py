@@ -0,0 +1,79 @@
+# test_endgame_solver.py
+"""
+EndgameSolver against brute force, on 5x5 and 6x6 endgames
+"""
+import pytest
+
+from knight_graph import KnightGraph
+from endgame_solver import EndgameSolver
+
+from brute_force import board_neighbors, has_path
+from positions import random_positions
+
+def to_mask(sqs):
+    mask = 0
+    for sq in sqs:
+        mask |= 1 << sq
+    return mask
+
+
+def check_solution(graph, path, empty, cur_sq, ends):
+    """ Check solver's path covers empty squares by knight moves
+    """
+    assert sorted(path) == sorted(empty)
+    prev_sq = cur_sq
+    for sq in path:
+        assert graph.is_neighbor(prev_sq, sq)
+        prev_sq = sq
+    if ends is not None:
+        assert path[-1] in ends
+
+
+@pytest.mark.parametrize("nrow, ncol", [(5, 5), (6, 6)])
+def test_open_endgames(nrow, ncol):
+    graph = KnightGraph.get(nrow=nrow, ncol=ncol)
+    neighbors = board_neighbors(nrow, ncol)
+    solver = EndgameSolver(graph)
+    nsolved = 0
+    for path, empty in random_positions(nrow, ncol, 6, 14, 60, seed=nrow):
+        cur_sq = path[-1]
+        found = solver.solve(to_mask(empty), cur_sq)
+        assert (found is not None) == has_path(neighbors, empty, cur_sq)
+        if found is not None:
+            nsolved += 1
+            check_solution(graph, found, empty, cur_sq, None)
+    assert 0 < nsolved < 60             # Both outcomes checked
+
+
+@pytest.mark.parametrize("nrow, ncol", [(5, 5), (6, 6)])
+def test_closed_endgames(nrow, ncol):
+    """ Path must end next to the start, by end_mask and by end_sq
+    """
+    graph = KnightGraph.get(nrow=nrow, ncol=ncol)
+    neighbors = board_neighbors(nrow, ncol)
+    for path, empty in random_positions(nrow, ncol, 6, 14, 60, seed=nrow+1):
+        start_sq, cur_sq = path[0], path[-1]
+        ends = set(neighbors[start_sq])
+        expected = has_path(neighbors, empty, cur_sq, ends)
+        solver = EndgameSolver(graph, end_mask=to_mask(ends))
+        found = solver.solve(to_mask(empty), cur_sq)
+        assert (found is not None) == expected
+        if found is not None:
+            check_solution(graph, found, empty, cur_sq, ends)
+        found = EndgameSolver(graph).solve(to_mask(empty), cur_sq, end_sq=start_sq)
+        assert (found is not None) == expected
+        if found is not None:
+            check_solution(graph, found, empty, cur_sq, ends)
+
+
+def test_memo_reused():
+    """ Solving again gives the same answers from remembered failures
+    """
+    graph = KnightGraph.get(nrow=5, ncol=5)
+    neighbors = board_neighbors(5, 5)
+    solver = EndgameSolver(graph)
+    positions = random_positions(5, 5, 10, 14, 30, seed=7)
+    for _ in range(2):
+        for path, empty in positions:
+            found = solver.solve(to_mask(empty), path[-1])
+            assert (found is not None) == has_path(neighbors, empty, path[-1])
@@ -0,0 +1,49 @@
+# test_region_check.py
+"""
+RegionCheck against brute force: a position it prunes must have no
+path covering the empty squares
+"""
+import pytest
+
+from knight_graph import KnightGraph
+from region_check import RegionCheck
+
+from brute_force import board_neighbors, has_path
+from positions import random_positions
+
+def to_mask(sqs):
+    mask = 0
+    for sq in sqs:
+        mask |= 1 << sq
+    return mask
+
+
+@pytest.mark.parametrize("nrow, ncol, closed_tours",
+                         [(5, 5, False), (6, 6, False), (6, 6, True), (5, 6, True)])
+def test_prunes_only_dead_positions(nrow, ncol, closed_tours):
+    graph = KnightGraph.get(nrow=nrow, ncol=ncol)
+    neighbors = board_neighbors(nrow, ncol)
+    check = RegionCheck(graph, closed_tours=closed_tours, articulation_interval=1)
+    nsq = nrow*ncol
+    npruned = 0
+    for path, empty in random_positions(nrow, ncol, 4, 16, 120, seed=nsq):
+        start_sq, cur_sq = path[0], path[-1]
+        occupied = to_mask(range(nsq)) & ~to_mask(empty)
+        ends = set(neighbors[start_sq]) if closed_tours else None
+        if not check.is_feasible(occupied, cur_sq, start_sq=start_sq):
+            npruned += 1
+            assert not has_path(neighbors, empty, cur_sq, ends)
+    assert npruned > 0
+    assert check.narticulation_check > 0
+
+
+def test_split_region():
+    """ Empty square the knight can't reach
+    """
+    graph = KnightGraph.get(nrow=3, ncol=4)
+    check = RegionCheck(graph)
+    # Only corners a1 (0) and d3 (11) empty, knight on b3 (9)
+    # b3 reaches a1, but d3's neighbors b2 and c1 are occupied
+    occupied = graph.full_mask & ~(1 << 0) & ~(1 << 11)
+    assert not check.is_feasible(occupied, 9)
+    assert check.nprune_connect == 1
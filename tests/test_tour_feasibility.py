@@ -0,0 +1,58 @@
+# test_tour_feasibility.py
+"""
+TourFeasibility against brute force tour search on small boards
+"""
+import pytest
+
+from tour_feasibility import TourFeasibility
+
+from brute_force import has_tour
+
+small_boards = [(m, n) for m in range(1, 7) for n in range(m, 9) if m*n <= 24]
+
+@pytest.mark.parametrize("nrow, ncol", small_boards)
+@pytest.mark.parametrize("closed_tours", [False, True])
+def test_board_size(nrow, ncol, closed_tours):
+    """ Ruled out exactly when there is no tour, either way round
+    """
+    reason = TourFeasibility.impossible_reason(nrow, ncol, closed_tours=closed_tours)
+    assert (reason is None) == has_tour(nrow, ncol, closed_tours=closed_tours)
+    transposed = TourFeasibility.impossible_reason(ncol, nrow, closed_tours=closed_tours)
+    assert (transposed is None) == (reason is None)
+
+
+@pytest.mark.parametrize("nrow, ncol", [(3, 4), (4, 3), (3, 10)])
+def test_no_closed_3_by_n(nrow, ncol):
+    """ 3x4 (and 4x3) have open tours but no closed ones, 3x10 has both
+    """
+    closed_reason = TourFeasibility.impossible_reason(nrow, ncol, closed_tours=True)
+    assert (closed_reason is None) == has_tour(nrow, ncol, closed_tours=True)
+    assert TourFeasibility.impossible_reason(nrow, ncol) is None
+
+
+@pytest.mark.parametrize("ncol", [4, 5, 6])
+def test_no_closed_4_by_n(ncol):
+    reason = TourFeasibility.impossible_reason(4, ncol, closed_tours=True)
+    assert reason is not None
+    assert not has_tour(4, ncol, closed_tours=True)
+
+
+def test_3_by_3():
+    """ The center can't be reached, so no tours at all
+    """
+    assert TourFeasibility.impossible_reason(3, 3) is not None
+    assert TourFeasibility.impossible_reason(3, 3, closed_tours=True) is not None
+    assert not has_tour(3, 3)
+
+
+@pytest.mark.parametrize("nrow, ncol", [(3, 7), (1, 1)])
+def test_start_color(nrow, ncol):
+    """ A start ruled out by square color has no open tour
+    """
+    for sq in range(nrow*ncol):
+        loc = (sq % ncol, sq // ncol)
+        reason = TourFeasibility.impossible_reason(nrow, ncol, loc=loc)
+        if reason is not None:
+            assert not has_tour(nrow, ncol, start_sq=sq)
+        if has_tour(nrow, ncol, start_sq=sq):
+            assert reason is None